@@ -1,3 +1,4 @@
+import os
 import sys
 import math
 from OpenGL.GL import (
@@ -9,19 +10,21 @@ from OpenGL.GL import (
     GL_QUADS,
     GL_SCISSOR_TEST,
     GL_TRIANGLES,
-    glBegin,
     glClear,
     glClearColor,
-    glColor3f,
     glDisable,
     glEnable,
-    glEnd,
     glLoadIdentity,
     glMatrixMode,
     glScissor,
-    glVertex2f,
     glViewport,
 )
+
+# glBegin, glVertex, glColor and glEnd are accumulated in Python, and
+# drawn with one call per glEnd, by the module in src/glutils
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from glutils.immediate import glBegin, glColor3f, glEnd, glVertex2f
+from glutils.framescheduler import FrameScheduler
 import glfw
 import numpy as np
 from collections.abc import Callable
@@ -254,17 +257,13 @@ def draw_block(center_of_square: tuple, block_size: float) -> None:
 
 TARGET_FRAMERATE: int = 60
 
-time_at_beginning_of_previous_frame: float = glfw.get_time()
+# sleeps until shortly before each frame is due, instead of spinning
+frame_scheduler: FrameScheduler = FrameScheduler(TARGET_FRAMERATE)
 
 current_x = 0
 
 while not glfw.window_should_close(window):
-    while (
-        glfw.get_time() < time_at_beginning_of_previous_frame + 1.0 / TARGET_FRAMERATE
-):
-        pass
-
-    time_at_beginning_of_previous_frame = glfw.get_time()
+    frame_scheduler.wait_for_next_frame()
 
     glfw.poll_events()
 
@@ -20,6 +20,7 @@
 
 # Liam Zalubas
 from __future__ import annotations  # to appease Python 3.7-3.9
+import os
 import sys
 import math
 from OpenGL.GL import (
@@ -32,13 +33,15 @@ from OpenGL.GL import (
     GL_DEPTH_BUFFER_BIT,
     glViewport,
     glClearColor,
-    glColor3f,
-    glBegin,
     GL_QUADS,
-    glVertex2f,
-    glEnd,
 )
 
+# glBegin, glVertex, glColor and glEnd are accumulated in Python, and
+# drawn with one call per glEnd, by the module in src/glutils
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from glutils.immediate import glBegin, glColor3f, glEnd, glVertex2f
+from glutils.framescheduler import FrameScheduler
+
 from OpenGL.GLU import gluOrtho2D
 
 import glfw
@@ -226,17 +229,13 @@ def handle_inputs() -> None:
 
 TARGET_FRAMERATE: int = 60
 
-time_at_beginning_of_previous_frame: float = glfw.get_time()
+# sleeps until shortly before each frame is due, instead of spinning
+frame_scheduler: FrameScheduler = FrameScheduler(TARGET_FRAMERATE)
 
 # doc-region-begin 6d86d07154c99ed6e1c3feab73545d184153f9ae
 while not glfw.window_should_close(window):
     # doc-region-end 6d86d07154c99ed6e1c3feab73545d184153f9ae
-    while (
-        glfw.get_time() < time_at_beginning_of_previous_frame + 1.0 / TARGET_FRAMERATE
-    ):
-        pass
-
-    time_at_beginning_of_previous_frame = glfw.get_time()
+    frame_scheduler.wait_for_next_frame()
 
     glfw.poll_events()
 
@@ -20,6 +20,7 @@
 
 
 from __future__ import annotations  # to appease Python 3.7-3.9
+import os
 import sys
 import math
 from OpenGL.GL import (
@@ -31,21 +32,23 @@ from OpenGL.GL import (
     GL_PROJECTION,
     GL_QUADS,
     GL_SCISSOR_TEST,
-    glBegin,
     glClear,
     glClearColor,
     glClearDepth,
-    glColor3f,
     glDepthFunc,
     glDisable,
     glEnable,
-    glEnd,
     glLoadIdentity,
     glMatrixMode,
     glScissor,
-    glVertex3f,
     glViewport,
 )
+
+# glBegin, glVertex, glColor and glEnd are accumulated in Python, and
+# drawn with one call per glEnd, by the module in src/glutils
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from glutils.immediate import glBegin, glColor3f, glEnd, glVertex3f
+from glutils.framescheduler import FrameScheduler
 import glfw
 
 from dataclasses import dataclass, field
@@ -366,14 +369,11 @@ def handle_inputs() -> None:
 
 TARGET_FRAMERATE: int = 60
 
-time_at_beginning_of_previous_frame: float = glfw.get_time()
+# sleeps until shortly before each frame is due, instead of spinning
+frame_scheduler: FrameScheduler = FrameScheduler(TARGET_FRAMERATE)
 
 while not glfw.window_should_close(window):
-    while (
-        glfw.get_time() < time_at_beginning_of_previous_frame + 1.0 / TARGET_FRAMERATE
-    ):
-        pass
-    time_at_beginning_of_previous_frame = glfw.get_time()
+    frame_scheduler.wait_for_next_frame()
 
     glfw.poll_events()
 
@@ -24,6 +24,7 @@ import matplotlib.pyplot as plt
 import math
 import sys
 import itertools
+import logging
 import imageio
 
 import plotutils.generategridlines as generategridlines
@@ -118,7 +119,7 @@ def accumulate_transformation(procedures, backwards=False):
 
 import doctest
 
-modules = [mplt, sys.modules[__name__]]
+modules = [mplt, generategridlines, sys.modules[__name__]]
 for m in modules:
     try:
         doctest.testmod(m, raise_on_error=True)
@@ -183,7 +184,10 @@ def create_graphs(
     unit_x=10.0,
     unit_y=10.0,
 ):
-    """Creates an animated dif of the geometry, through a sequence of transformations"""
+    """Creates an animated dif of the geometry, through a sequence of transformations.
+
+    Returns, per frame, how many gridline segments were clipped away
+    entirely, which is also logged at the debug level."""
 
     fig, axes = plt.subplots()
     axes.set_xlim([-graph_bounds[0], graph_bounds[0]])
@@ -199,23 +203,44 @@ def create_graphs(
     else:
         procs.append(idProc)
 
-    # create a single frame of the animated gif
+    # create a single frame of the animated gif, along with how many of
+    # the gridlines were removed as they're entirely outside of the graph
     def create_single_frame(accumfn, stepsRemaining, fn, frame_number):
         for round_number in [1] if backwards else [1, 2]:
             fig, axes = plt.subplots()
             axes.set_xlim([-graph_bounds[0], graph_bounds[0]])
             axes.set_ylim([-graph_bounds[1], graph_bounds[1]])
 
-            # plot transformed basis
-            for xs, ys, thickness in generategridlines.generategridlines(
-                graph_bounds, interval=gridline_interval
-            ):
+            # plot transformed basis.  the gridlines extend well past
+            # the graph bounds so that they still cover the graph after
+            # being transformed, so clip them to what is visible
+            gridlines = list(
+                generategridlines.generategridlines(
+                    graph_bounds, interval=gridline_interval
+                )
+            )
+            segments = []
+            for xs, ys, thickness in gridlines:
                 if backwards and stepsRemaining > 1:
                     transformed_xs, transformed_ys = accumfn(xs, ys)
                 elif not backwards and round_number == 1 and frame_number != 1:
                     transformed_xs, transformed_ys = fn(xs, ys)
                 else:
                     transformed_xs, transformed_ys = xs, ys
+                segments.append([*transformed_xs, *transformed_ys])
+            x0, x1, y0, y1 = np.array(segments, dtype=np.float64).T
+            visible, clipped_xs, clipped_ys = generategridlines.clip_segments(
+                x0,
+                y0,
+                x1,
+                y1,
+                xlim=(-graph_bounds[0], graph_bounds[0]),
+                ylim=(-graph_bounds[1], graph_bounds[1]),
+            )
+            thicknesses = np.array([thickness for _, _, thickness in gridlines])
+            for transformed_xs, transformed_ys, thickness in zip(
+                clipped_xs, clipped_ys, thicknesses[visible]
+            ):
                 plt.plot(
                     transformed_xs,
                     transformed_ys,
@@ -264,7 +289,7 @@ def create_graphs(
             image = np.array(fig.canvas.renderer.buffer_rgba())
             plt.close(fig)
 
-            yield image
+            yield image, int(np.count_nonzero(~visible))
 
     # create a single frame
     animated_images_list = [
@@ -276,13 +301,21 @@ def create_graphs(
         )
     ]
 
-    flattened_animated_images_list = list(itertools.chain(*animated_images_list))
+    flattened_frames = list(itertools.chain(*animated_images_list))
+    flattened_animated_images_list = [image for image, _ in flattened_frames]
+    removed_segments = [removed for _, removed in flattened_frames]
+    logging.debug(
+        str.format(
+            "{}: removed gridline segments per frame {}", filename, removed_segments
+        )
+    )
 
     imageio.mimsave(
         "./" + filename + ".gif", flattened_animated_images_list, duration=1000, loop=0
     )
     for number, image in enumerate(flattened_animated_images_list):
         imageio.imsave("./" + filename + "-" + str(number) + ".png", image)
+    return removed_segments
 
 
 create_graphs(
@@ -0,0 +1,214 @@
+# Copyright (c) 2018-2024 William Emerison Six
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import numpy as np
+import matplotlib.pyplot as plt
+import ipywidgets as widgets
+from matplotlib.collections import LineCollection
+
+import plotutils.generategridlines as generategridlines
+
+
+def affine_transformation(fn):
+    """Find the 3x3 matrix of the affine transformation that fn performs.
+
+    The functions in mpltransformations only ever rotate, scale, and
+    translate, so transforming the origin and the two basis vectors is
+    enough to know what they do to every other point.
+
+    >>> import math
+    >>> import plotutils.mpltransformations as mplt
+    >>> affine_transformation(mplt.translate(1.0, 2.0))
+    array([[1., 0., 1.],
+           [0., 1., 2.],
+           [0., 0., 1.]])
+    >>> np.round(affine_transformation(mplt.rotate(math.radians(90.0))), 6)
+    array([[ 0., -1.,  0.],
+           [ 1.,  0.,  0.],
+           [ 0.,  0.,  1.]])
+    """
+    xs, ys = fn((0.0, 1.0, 0.0), (0.0, 0.0, 1.0))
+    xs, ys = np.array(xs, dtype=np.float64), np.array(ys, dtype=np.float64)
+    return np.array(
+        [
+            [xs[1] - xs[0], xs[2] - xs[0], xs[0]],
+            [ys[1] - ys[0], ys[2] - ys[0], ys[0]],
+            [0.0, 0.0, 1.0],
+        ]
+    )
+
+
+def step_transformations(procedures, backwards=False):
+    """For each step of the slider, the transformation of the gridlines
+    and the transformation of the geometry.
+
+    Reading forwards, the geometry accumulates every procedure so far, and the
+    gridlines show only the procedure being applied at that step, relative to
+    world space.  Reading backwards, the gridlines are the local space of
+    the geometry, so both are transformed by the same accumulated matrix.
+
+    >>> import plotutils.mpltransformations as mplt
+    >>> steps = step_transformations([mplt.translate(5, 0),
+    ...                               mplt.translate(0, 10)])
+    >>> [geometry[:2, 2] for _, geometry in steps]
+    [array([0., 0.]), array([5., 0.]), array([ 5., 10.])]
+    >>> [grid[:2, 2] for grid, _ in steps]
+    [array([0., 0.]), array([5., 0.]), array([ 0., 10.])]
+    >>> steps = step_transformations([mplt.translate(5, 0),
+    ...                               mplt.translate(0, 10)],
+    ...                              backwards=True)
+    >>> [geometry[:2, 2] for _, geometry in steps]
+    [array([0., 0.]), array([ 0., 10.]), array([ 5., 10.])]
+    """
+    matrices = [affine_transformation(fn) for fn in procedures]
+    steps = [(np.identity(3), np.identity(3))]
+    accumulated = np.identity(3)
+    if not backwards:
+        for matrix in matrices:
+            accumulated = matrix @ accumulated
+            steps.append((matrix, accumulated))
+    else:
+        for matrix in reversed(matrices):
+            accumulated = accumulated @ matrix
+            steps.append((accumulated, accumulated))
+    return steps
+
+
+def explore(
+    geometry,
+    procedures,
+    title="",
+    backwards=False,
+    graph_bounds=(100, 100),
+    gridline_interval=5,
+    unit_x=10.0,
+    unit_y=10.0,
+):
+    """Scrub through the transformations of the geometry with a slider.
+
+    Takes the same arguments as create_graphs in generate_plots.py, but
+    instead of writing out gifs, draws onto one persistent figure.  Only
+    the transformed artists are redrawn when the slider moves, blitted over
+    a saved copy of the static background, so use an interactive backend,
+    such as "%matplotlib notebook" or "%matplotlib widget".
+    """
+    fig, axes = plt.subplots()
+    axes.set_xlim([-graph_bounds[0], graph_bounds[0]])
+    axes.set_ylim([-graph_bounds[1], graph_bounds[1]])
+    # make sure the x and y axis are equally proportional in screen space
+    axes.set_aspect("equal", adjustable="box")
+
+    steps = step_transformations(procedures, backwards)
+
+    # every gridline is one segment, so put all of the endpoints into
+    # one array of homogeneous coordinates, to be transformed at once
+    gridlines = list(
+        generategridlines.generategridlines(graph_bounds, interval=gridline_interval)
+    )
+    thicknesses = np.array([thickness for _, _, thickness in gridlines])
+    grid_points = np.ones((3, 2 * len(gridlines)))
+    grid_points[0] = np.ravel([xs for xs, _, _ in gridlines])
+    grid_points[1] = np.ravel([ys for _, ys, _ in gridlines])
+
+    basis_points = np.array(
+        [
+            [0.0, unit_x, 0.0],
+            [0.0, 0.0, unit_y],
+            [1.0, 1.0, 1.0],
+        ]
+    )
+
+    geometry_points = np.ones((3, len(geometry.points[0])))
+    geometry_points[0] = geometry.points[0]
+    geometry_points[1] = geometry.points[1]
+
+    # animated artists are left out of a normal draw, so that the
+    # background can be saved without them
+    grid_lines = LineCollection([], colors=[(0.1, 0.2, 0.5)], alpha=0.3, animated=True)
+    axes.add_collection(grid_lines)
+    (x_axis,) = axes.plot([], [], "-", lw=4.0, color=(0.0, 0.0, 1.0), animated=True)
+    (y_axis,) = axes.plot([], [], "-", lw=4.0, color=(1.0, 0.0, 1.0), animated=True)
+    (geometry_line,) = axes.plot([], [], lw=2, color=geometry.color, animated=True)
+    title_text = axes.set_title("", animated=True)
+    animated_artists = [grid_lines, x_axis, y_axis, geometry_line, title_text]
+
+    background = None
+
+    def draw_animated_artists():
+        for artist in animated_artists:
+            fig.draw_artist(artist)
+
+    # a resize or a full redraw invalidates the saved background
+    def on_draw(event):
+        nonlocal background
+        background = fig.canvas.copy_from_bbox(fig.bbox)
+        draw_animated_artists()
+
+    fig.canvas.mpl_connect("draw_event", on_draw)
+
+    def update_artists(step):
+        grid_transformation, geometry_transformation = steps[step]
+
+        x0, x1 = np.reshape(grid_transformation[0] @ grid_points, (2, -1), order="F")
+        y0, y1 = np.reshape(grid_transformation[1] @ grid_points, (2, -1), order="F")
+        visible, xs, ys = generategridlines.clip_segments(
+            x0,
+            y0,
+            x1,
+            y1,
+            xlim=(-graph_bounds[0], graph_bounds[0]),
+            ylim=(-graph_bounds[1], graph_bounds[1]),
+        )
+        grid_lines.set_segments(np.stack([xs, ys], axis=-1))
+        grid_lines.set_linewidths(thicknesses[visible])
+
+        origin, x_unit, y_unit = (grid_transformation @ basis_points).T
+        x_axis.set_data([origin[0], x_unit[0]], [origin[1], x_unit[1]])
+        y_axis.set_data([origin[0], y_unit[0]], [origin[1], y_unit[1]])
+
+        transformed_geometry = geometry_transformation @ geometry_points
+        geometry_line.set_data(transformed_geometry[0], transformed_geometry[1])
+        if step == len(procedures):
+            geometry_line.set_linestyle("-")
+            geometry_line.set_marker("")
+        else:
+            geometry_line.set_linestyle("None")
+            geometry_line.set_marker(".")
+
+        title_text.set_text(str.format("{}\nStep {}", title, str(step + 1)))
+
+    def show_step(step):
+        update_artists(step)
+        if background is None:
+            fig.canvas.draw()
+            return
+        fig.canvas.restore_region(background)
+        draw_animated_artists()
+        fig.canvas.blit(fig.bbox)
+        fig.canvas.flush_events()
+
+    update_artists(0)
+    fig.canvas.draw()
+
+    slider = widgets.IntSlider(
+        value=0, min=0, max=len(procedures), step=1, description="Step"
+    )
+    slider.observe(lambda change: show_step(change["new"]), names="value")
+    return slider
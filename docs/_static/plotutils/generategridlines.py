@@ -46,3 +46,58 @@ def generategridlines(graphBounds, interval=1):
             -graphBounds[0] * extraLinesMultiplier,
             graphBounds[0] * extraLinesMultiplier,
         ], [y, y], thickness
+
+
+def clip_segments(x0, y0, x1, y1, xlim, ylim):
+    """Clip line segments to the rectangle xlim by ylim, using Liang-Barsky.
+
+    All of the segments are clipped at once, each argument being an array
+    with one entry per segment.  Returns a mask of which segments are at least
+    partially visible, and the xs and ys of only the visible segments,
+    shaped so that each row can be passed to plt.plot
+
+    >>> visible, xs, ys = clip_segments(np.array([-10.0, 20.0]),
+    ...                                 np.array([0.0, 20.0]),
+    ...                                 np.array([10.0, 30.0]),
+    ...                                 np.array([0.0, 30.0]),
+    ...                                 xlim=(-5.0, 5.0),
+    ...                                 ylim=(-5.0, 5.0))
+    >>> visible
+    array([ True, False])
+    >>> xs
+    array([[-5.,  5.]])
+    >>> ys
+    array([[0., 0.]])
+    >>> visible, xs, ys = clip_segments(np.array([-10.0]),
+    ...                                 np.array([-10.0]),
+    ...                                 np.array([10.0]),
+    ...                                 np.array([10.0]),
+    ...                                 xlim=(-5.0, 5.0),
+    ...                                 ylim=(-2.0, 2.0))
+    >>> xs
+    array([[-2.,  2.]])
+    >>> ys
+    array([[-2.,  2.]])
+    """
+    dx = x1 - x0
+    dy = y1 - y0
+
+    # one row per edge of the rectangle; left, right, bottom, top
+    p = np.stack([-dx, dx, -dy, dy])
+    q = np.stack([x0 - xlim[0], xlim[1] - x0, y0 - ylim[0], ylim[1] - y0])
+
+    # a segment parallel to an edge, and outside of it, can never be visible
+    parallel_and_outside = np.any((p == 0.0) & (q < 0.0), axis=0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = q / p
+    t_enter = np.max(np.where(p < 0.0, r, 0.0), axis=0)
+    t_exit = np.min(np.where(p > 0.0, r, 1.0), axis=0)
+
+    visible = ~parallel_and_outside & (t_enter <= t_exit)
+
+    t_enter, t_exit = t_enter[visible], t_exit[visible]
+    x0, y0, dx, dy = x0[visible], y0[visible], dx[visible], dy[visible]
+    xs = np.stack([x0 + t_enter * dx, x0 + t_exit * dx], axis=1)
+    ys = np.stack([y0 + t_enter * dy, y0 + t_exit * dy], axis=1)
+    return visible, xs, ys
@@ -0,0 +1,96 @@
+# ---
+# jupyter:
+#   jupytext:
+#     formats: py:percent
+#     text_representation:
+#       extension: .py
+#       format_name: percent
+#   kernelspec:
+#     display_name: Python 3
+#     language: python
+#     name: python3
+# ---
+
+# Copyright (c) 2018-2024 William Emerison Six
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# %% [markdown]
+# # Transformation Explorer
+#
+# Open with "jupytext --to notebook transformationexplorer.py", or
+# directly in Jupyter with jupytext installed.  Drag the slider to step
+# through the same transformations that generate_plots.py writes to gifs.
+
+# %%
+# %matplotlib notebook
+
+import math
+from collections import namedtuple
+
+import numpy as np
+
+import plotutils.explorer as explorer
+import plotutils.mpltransformations as mplt
+
+Geometry = namedtuple("Geometry", "points color")
+
+paddle1 = Geometry(
+    points=list(
+        zip(
+            *np.array(
+                [
+                    [-10.0, -30.0],
+                    [10.0, -30.0],
+                    [10.0, 30.0],
+                    [-10.0, 30.0],
+                    [-10.0, -30.0],
+                ]
+            )
+        )
+    ),
+    color=(0.578123, 0.0, 1.0),
+)
+
+# %% [markdown]
+# ## Rotation, Relative to World Space
+
+# %%
+explorer.explore(
+    title="Rotation, Relative to World Space",
+    geometry=paddle1,
+    procedures=[
+        mplt.rotate(math.radians(45.0)),
+        mplt.translate(-90.0, 20.0),
+    ],
+)
+
+# %% [markdown]
+# ## Rotation, Relative to Local Space
+
+# %%
+explorer.explore(
+    title="Rotation, Relative to Local Space",
+    geometry=paddle1,
+    procedures=[
+        mplt.rotate(math.radians(45.0)),
+        mplt.translate(-90.0, 20.0),
+    ],
+    backwards=True,
+)
@@ -20,29 +20,38 @@
 
 #version 330 core
 
-layout (location = 0) in vec3 position;
-
 uniform mat4 mMatrix;
-uniform mat4 vMatrix;
-uniform mat4 pMatrix;
 uniform float u_distance;
 uniform float u_thickness;
 
-out VS_OUT {
-  vec4 color;
-  float thickness;
-} vs_out;
+layout (std140) uniform FrameUniforms {
+  mat4 vMatrix;
+  mat4 pMatrix;
+  float fov;
+  float aspectRatio;
+  float nearZ;
+  float farZ;
+  float time;
+};
+
+// linked with glutils/thicklines.vert, which draws each line as a quad
+vec4 clip_position(vec3 position)
+{
+   return pMatrix * vMatrix * mMatrix * vec4(position,1.0);
+}
 
+vec4 line_color()
+{
+   return vec4(1.0,1.0,1.0,1.0);
+}
 
-void main()
+float line_thickness()
 {
-   gl_Position = pMatrix * vMatrix * mMatrix * vec4(position,1.0);
-   vs_out.color = vec4(1.0,1.0,1.0,1.0);
    if (u_distance > 200)
-      vs_out.thickness = 1;
+      return 1.0;
    else if (u_distance > 100)
-      vs_out.thickness = 2;
+      return 2.0;
    else if (u_distance > 75)
-      vs_out.thickness = 3;
-   else vs_out.thickness = u_thickness;
+      return 3.0;
+   else return u_thickness;
 }
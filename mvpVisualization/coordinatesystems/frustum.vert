@@ -20,19 +20,31 @@
 
 #version 330 core
 
-layout (location = 0) in vec3 position;
-
 uniform mat4 mMatrix;
-uniform mat4 vMatrix;
-uniform mat4 pMatrix;
+uniform float u_thickness;
+
+layout (std140) uniform FrameUniforms {
+  mat4 vMatrix;
+  mat4 pMatrix;
+  float fov;
+  float aspectRatio;
+  float nearZ;
+  float farZ;
+  float time;
+};
 
-out VS_OUT {
-  vec4 color;
-} vs_out;
+// linked with glutils/thicklines.vert, which draws each line as a quad
+vec4 clip_position(vec3 position)
+{
+   return pMatrix * vMatrix * mMatrix * vec4(position,1.0);
+}
 
+vec4 line_color()
+{
+   return vec4(1.0,1.0,1.0,1.0);
+}
 
-void main()
+float line_thickness()
 {
-   gl_Position = pMatrix * vMatrix * mMatrix * vec4(position,1.0);
-   vs_out.color = vec4(1.0,1.0,1.0,1.0);
+   return u_thickness;
 }
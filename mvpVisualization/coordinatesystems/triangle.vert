@@ -24,8 +24,16 @@ layout (location = 0) in vec3 position;
 layout (location = 1) in vec3 color_in;
 
 uniform mat4 mMatrix;
-uniform mat4 vMatrix;
-uniform mat4 pMatrix;
+
+layout (std140) uniform FrameUniforms {
+  mat4 vMatrix;
+  mat4 pMatrix;
+  float fov;
+  float aspectRatio;
+  float nearZ;
+  float farZ;
+  float time;
+};
 
 out VS_OUT {
   vec4 color;
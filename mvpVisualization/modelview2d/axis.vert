@@ -21,75 +21,26 @@
 #version 330 core
 
 layout (location = 0) in vec3 position;
-
-uniform mat4 mMatrix;
-uniform mat4 vMatrix;
-uniform mat4 pMatrix;
-uniform float fov;
-uniform float aspectRatio;
-uniform float nearZ;
-uniform float farZ;
-uniform vec3 color;
-uniform float time;
+// one per instance, an instance being one of the arrows
+in mat4 mMatrix;
+in vec3 color;
+
+layout (std140) uniform FrameUniforms {
+  mat4 vMatrix;
+  mat4 pMatrix;
+  float fov;
+  float aspectRatio;
+  float nearZ;
+  float farZ;
+  float time;
+};
 
 out VS_OUT {
   vec4 color;
 } vs_out;
 
-vec4 project(vec4 cameraSpace){
-
-    float top = (-nearZ) * tan(fov * 3.14159265358979323846 / 360.0);
-    float right = top * aspectRatio;
-
-    float scaleXRatio = max(1.0, (time - 90.0)/5.0);
-    float scaleYRatio = max(1.0, (time - 95.0)/5.0);
-    float traslate_to_originRatio = max(1.0, (time - 100.0)/5.0);
-    float scaleToNDCRatio = max(1.0, (time - 105.0)/5.0);
-
-    mat4 scale_x = transpose(mat4(
-                                  nearZ/cameraSpace.z, 0.0, 0.0, 0.0,
-                                  0.0,                 1.0, 0.0, 0.0,
-                                  0.0,                 0.0, 1.0, 0.0,
-                                  0.0,                 0.0, 0.0, 1.0));
-    mat4 scale_y = transpose(mat4(
-                                  1.0, 0.0,                 0.0, 0.0,
-                                  0.0, nearZ/cameraSpace.z, 0.0, 0.0,
-                                  0.0, 0.0,                 1.0, 0.0,
-                                  0.0, 0.0,                 0.0, 1.0));
-    mat4 translate_to_origin = transpose(mat4(
-         1.0, 0.0, 0.0, 0.0,
-         0.0, 1.0, 0.0, 0.0,
-         0.0, 0.0, 1.0, -((farZ + nearZ) / 2.0),
-         0.0, 0.0, 0.0, 1.0));
-    mat4 scale_to_ndc = transpose(mat4(
-         1.0/right,     0.0,           0.0,                  0.0,
-         0.0,           1.0/top,       0.0,                  0.0,
-         0.0,           0.0,           2.0/(nearZ - farZ),   0.0,
-         0.0,           0.0,           0.0,                  1.0));
-
-    //use transpose to put the matrix in column major order
-    if (time < 90){
-      scale_x = mat4(1.0);
-    }
-    if (time < 95){
-      scale_y =  mat4(1.0);
-    }
-    if (time < 100){
-      translate_to_origin = mat4(1.0);
-    }
-    if (time < 105){
-      scale_to_ndc =  mat4(1.0);
-    }
-
-//ortho
-
-
-     return scale_to_ndc * translate_to_origin * scale_y * scale_x * cameraSpace;
-}
-
-
 void main()
 {
-  gl_Position = pMatrix * vMatrix * project(mMatrix * vec4(position,1.0));
+  gl_Position = pMatrix * vMatrix * mMatrix * vec4(position,1.0);
    vs_out.color = vec4(color,1.0);
 }
@@ -21,56 +21,26 @@
 #version 330 core
 
 layout (location = 0) in vec3 position;
-
-uniform mat4 mMatrix;
-uniform mat4 vMatrix;
-uniform mat4 pMatrix;
-uniform float fov;
-uniform float aspectRatio;
-uniform float nearZ;
-uniform float farZ;
-uniform vec3 color;
-uniform float time;
+// one per instance, an instance being one of the arrows
+in mat4 mMatrix;
+in vec3 color;
+
+layout (std140) uniform FrameUniforms {
+  mat4 vMatrix;
+  mat4 pMatrix;
+  float fov;
+  float aspectRatio;
+  float nearZ;
+  float farZ;
+  float time;
+};
 
 out VS_OUT {
   vec4 color;
 } vs_out;
 
-vec4 project(vec4 cameraSpace){
-
-    float translateRatio = min((time - 90.0)/5.0, 1.0);
-    mat4 translate_to_origin = transpose(mat4(
-         1.0, 0.0, 0.0, 0.0,
-         0.0, 1.0, 0.0, 0.0,
-         0.0, 0.0, 1.0, 145.0/2 * translateRatio,
-         0.0, 0.0, 0.0, 1.0));
-    float scaleRatio = min((time - 95.0)/5.0, 1.0);
-    float xVal = 1.0 + (1.0/50.0 - 1.0) * scaleRatio;
-    float yVal = 1.0 + (1.0/50.0 - 1.0) * scaleRatio;
-    float zVal = 1.0 + (2.0/145.0 - 1) * scaleRatio;
-    mat4 scale_to_ndc = transpose(mat4(
-         xVal,     0.0,     0.0,    0.0,
-         0.0,      yVal,    0.0,    0.0,
-         0.0,      0.0,     zVal,   0.0,
-         0.0,      0.0,     0.0,    1.0));
-
-    //use transpose to put the matrix in column major order
-    if (time < 90){
-      translate_to_origin = mat4(1.0);
-    }
-    if (time < 95){
-      scale_to_ndc =  mat4(1.0);
-    }
-
-//ortho
-
-
-     return scale_to_ndc * translate_to_origin * cameraSpace;
-}
-
-
 void main()
 {
-  gl_Position = pMatrix * vMatrix * project(mMatrix * vec4(position,1.0));
+  gl_Position = pMatrix * vMatrix * mMatrix * vec4(position,1.0);
    vs_out.color = vec4(color,1.0);
 }
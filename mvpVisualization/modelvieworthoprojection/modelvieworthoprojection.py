@@ -29,8 +29,6 @@ from dataclasses import dataclass, field
 import glfw
 import imgui
 import numpy as np
-import OpenGL.GL.shaders as shaders
-import pyMatrixStack as ms
 from imgui.integrations.glfw import GlfwRenderer
 from OpenGL.GL import (
     GL_ARRAY_BUFFER,
@@ -38,46 +36,49 @@ from OpenGL.GL import (
     GL_DEPTH_BUFFER_BIT,
     GL_DEPTH_TEST,
     GL_FLOAT,
-    GL_FRAGMENT_SHADER,
     GL_LESS,
     GL_LINES,
     GL_STATIC_DRAW,
-    GL_TRIANGLES,
     GL_TRUE,
-    GL_VERTEX_SHADER,
-    glBindBuffer,
-    glBindVertexArray,
     glBufferData,
     glClear,
     glClearColor,
     glClearDepth,
     glDeleteBuffers,
-    glDeleteProgram,
     glDeleteVertexArrays,
     glDepthFunc,
-    glDrawArrays,
     glEnable,
     glEnableVertexAttribArray,
     glGenBuffers,
     glGenVertexArrays,
     glGetAttribLocation,
-    glGetUniformLocation,
-    glUniform1f,
-    glUniform3f,
-    glUniformMatrix4fv,
-    glUseProgram,
     glVertexAttribPointer,
-    glViewport,
 )
 from numpy import ndarray
 
 # NEW - for shader location
 pwd = os.path.dirname(os.path.abspath(__file__))
 
+# the modules shared between the demos are in src/glutils
+sys.path.append(os.path.join(pwd, "..", "..", "src"))
+import glutils.batching as batching
+import glutils.fastgl as fastgl
+import glutils.fixedtimestep as fixedtimestep
+import glutils.framescheduler as framescheduler
+import glutils.geometry as geometry
+import glutils.glstate as glstate
+import glutils.inputlog as inputlog
+import glutils.inputstate as inputstate
+import glutils.matrixstack as ms
+import glutils.meshes as meshes
+import glutils.programs as programs
+import glutils.renderondemand as renderondemand
+import glutils.renderqueue as renderqueue
+import glutils.uniformblocks as uniformblocks
+
 # NEW - for shaders
 glfloat_size = 4
 floatsPerVertex = 3
-floatsPerColor = 3
 
 if not glfw.init():
     sys.exit()
@@ -99,6 +100,8 @@ if not window:
 
 # Make the window's context current
 glfw.make_context_current(window)
+# call the per draw OpenGL functions without PyOpenGL's wrappers
+fastgl.load(glfw.get_proc_address)
 imgui.create_context()
 impl = GlfwRenderer(window)
 
@@ -133,6 +136,14 @@ glDepthFunc(GL_LESS)
 glEnable(GL_DEPTH_TEST)
 
 
+# the paddles and the square are drawn together, with one draw call
+batch = batching.BatchRenderer()
+
+# the ground, the NDC cube and the frustum are drawn sorted by state,
+# at render_queue.flush
+render_queue = renderqueue.RenderQueue()
+
+
 @dataclass
 class Paddle:
     r: float
@@ -155,141 +166,31 @@ class Paddle:
         )
     )
     # fmt: on
-    vao: int = 0
-    vbo: int = 0
     shader: int = 0
 
     def prepare_to_render(self) -> None:
-        # GL_QUADS aren't available anymore, only triangles
-        # need 6 vertices instead of 4
-        vertices = self.vertices
-        self.numberOfVertices = np.size(vertices) // floatsPerVertex
-        # fmt: off
-        color = np.array(
-            [
-                self.r, self.g, self.b,
-                self.r, self.g, self.b,
-                self.r, self.g, self.b,
-                self.r, self.g, self.b,
-                self.r, self.g, self.b,
-                self.r, self.g, self.b,
-            ],
-            dtype=np.float32,
-        )
-        # fmt: on
-        self.numberOfColors = np.size(color) // floatsPerColor
-
-        self.vao = glGenVertexArrays(1)
-        glBindVertexArray(self.vao)
-
         # initialize shaders
-
-        with open(os.path.join(pwd, "triangle.vert"), "r") as f:
-            vs = shaders.compileShader(f.read(), GL_VERTEX_SHADER)
-
-        with open(os.path.join(pwd, "triangle.frag"), "r") as f:
-            fs = shaders.compileShader(f.read(), GL_FRAGMENT_SHADER)
-
-        self.shader = shaders.compileProgram(vs, fs)
-
-        self.mMatrixLoc = glGetUniformLocation(self.shader, "mMatrix")
-        self.vMatrixLoc = glGetUniformLocation(self.shader, "vMatrix")
-        self.pMatrixLoc = glGetUniformLocation(self.shader, "pMatrix")
-
-        # send the modelspace data to the GPU
-        self.vbo = glGenBuffers(1)
-        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
-
-        position = glGetAttribLocation(self.shader, "position")
-        glEnableVertexAttribArray(position)
-
-        glVertexAttribPointer(
-            position, floatsPerVertex, GL_FLOAT, False, 0, ctypes.c_void_p(0)
-        )
-
-        glBufferData(
-            GL_ARRAY_BUFFER,
-            glfloat_size * np.size(vertices),
-            vertices,
-            GL_STATIC_DRAW,
+        self.shader = programs.get_program(
+            os.path.join(pwd, "triangle.vert"),
+            os.path.join(pwd, "triangle.frag"),
         )
 
-        # send the modelspace data to the GPU
-        vboColor = glGenBuffers(1)
-        glBindBuffer(GL_ARRAY_BUFFER, vboColor)
-
-        colorAttribLoc = glGetAttribLocation(self.shader, "color_in")
-        glEnableVertexAttribArray(colorAttribLoc)
-        glVertexAttribPointer(
-            colorAttribLoc,
-            floatsPerColor,
-            GL_FLOAT,
-            False,
-            0,
-            ctypes.c_void_p(0),
-        )
-
-        glBufferData(
-            GL_ARRAY_BUFFER,
-            glfloat_size * np.size(color),
-            color,
-            GL_STATIC_DRAW,
+        # GL_QUADS aren't available anymore, only triangles
+        # need 6 vertices instead of 4
+        self.modelspace_vertices = np.reshape(self.vertices, (-1, floatsPerVertex))
+        self.colors = np.tile(
+            [self.r, self.g, self.b], (len(self.modelspace_vertices), 1)
         )
 
-        # reset VAO/VBO to default
-        glBindVertexArray(0)
-        glBindBuffer(GL_ARRAY_BUFFER, 0)
-
-    # destructor
-    def __del__(self):
-        glDeleteVertexArrays(1, [self.vao])
-        glDeleteBuffers(1, [self.vbo])
-        glDeleteProgram(self.shader)
-
-    def render(self, time):
-        glUseProgram(self.shader)
-        glBindVertexArray(self.vao)
-
-        # pass projection parameters to the shader
-        fov_loc = glGetUniformLocation(self.shader, "fov")
-        glUniform1f(fov_loc, 45.0)
-        aspect_loc = glGetUniformLocation(self.shader, "aspectRatio")
-        glUniform1f(aspect_loc, 1.0)
-        nearZ_loc = glGetUniformLocation(self.shader, "nearZ")
-        glUniform1f(nearZ_loc, -5.0)
-        farZ_loc = glGetUniformLocation(self.shader, "farZ")
-        glUniform1f(farZ_loc, -150.00)
-
-        time_loc = glGetUniformLocation(self.shader, "time")
-        glUniform1f(time_loc, animation_time)
-
-        # ascontiguousarray puts the array in column major order
-        glUniformMatrix4fv(
-            self.mMatrixLoc,
-            1,
-            GL_TRUE,
-            np.ascontiguousarray(
-                ms.get_current_matrix(ms.MatrixStack.model), dtype=np.float32
-            ),
-        )
-        glUniformMatrix4fv(
-            self.vMatrixLoc,
-            1,
-            GL_TRUE,
-            np.ascontiguousarray(
-                ms.get_current_matrix(ms.MatrixStack.view), dtype=np.float32
-            ),
-        )
-        glUniformMatrix4fv(
-            self.pMatrixLoc,
-            1,
-            GL_TRUE,
-            np.ascontiguousarray(
-                ms.get_current_matrix(ms.MatrixStack.projection), dtype=np.float32
-            ),
+    def render(self, time: float) -> None:
+        # transformed into world space on the CPU, and drawn along with
+        # the other paddles and the square, at batch.flush
+        batch.submit(
+            self.shader,
+            self.modelspace_vertices,
+            ms.get_current_matrix(ms.MatrixStack.model),
+            self.colors,
         )
-        glDrawArrays(GL_TRIANGLES, 0, self.numberOfVertices)
-        glBindVertexArray(0)
 
 
 paddle1 = Paddle(
@@ -341,24 +242,7 @@ class Ground:
         pass
 
     def vertices(self) -> ndarray:
-        # glColor3f(0.1,0.1,0.1)
-        verts = []
-        for x in range(-200, 201, 20):
-            for z in range(-200, 201, 20):
-                verts.append(float(-x))
-                verts.append(float(-50.0))
-                verts.append(float(z))
-                verts.append(float(x))
-                verts.append(float(-50.0))
-                verts.append(float(z))
-                verts.append(float(x))
-                verts.append(float(-50.0))
-                verts.append(float(-z))
-                verts.append(float(x))
-                verts.append(float(-50.0))
-                verts.append(float(z))
-
-        return np.array(verts, dtype=np.float32)
+        return geometry.ground_grid(extent=200, spacing=20)
 
     def prepare_to_render(self) -> None:
         # GL_QUADS aren't available anymore, only triangles
@@ -367,25 +251,17 @@ class Ground:
         self.numberOfVertices = np.size(vertices) // floatsPerVertex
 
         self.vao = glGenVertexArrays(1)
-        glBindVertexArray(self.vao)
+        glstate.bind_vertex_array(self.vao)
 
         # initialize shaders
-
-        with open(os.path.join(pwd, "ground.vert"), "r") as f:
-            vs = shaders.compileShader(f.read(), GL_VERTEX_SHADER)
-
-        with open(os.path.join(pwd, "ground.frag"), "r") as f:
-            fs = shaders.compileShader(f.read(), GL_FRAGMENT_SHADER)
-
-        self.shader = shaders.compileProgram(vs, fs)
-
-        self.mMatrixLoc = glGetUniformLocation(self.shader, "mMatrix")
-        self.vMatrixLoc = glGetUniformLocation(self.shader, "vMatrix")
-        self.pMatrixLoc = glGetUniformLocation(self.shader, "pMatrix")
+        self.shader = programs.get_program(
+            os.path.join(pwd, "ground.vert"),
+            os.path.join(pwd, "ground.frag"),
+        )
 
         # send the modelspace data to the GPU
         self.vbo = glGenBuffers(1)
-        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glstate.bind_buffer(GL_ARRAY_BUFFER, self.vbo)
 
         position = glGetAttribLocation(self.shader, "position")
         glEnableVertexAttribArray(position)
@@ -405,56 +281,25 @@ class Ground:
         # TODO, send color to the shader
 
         # reset VAO/VBO to default
-        glBindVertexArray(0)
-        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glstate.bind_vertex_array(0)
+        glstate.bind_buffer(GL_ARRAY_BUFFER, 0)
 
     # destructor
     def __del__(self):
         glDeleteVertexArrays(1, [self.vao])
         glDeleteBuffers(1, [self.vbo])
-        glDeleteProgram(self.shader)
 
     def render(self, time: float) -> None:
-        glUseProgram(self.shader)
-        glBindVertexArray(self.vao)
-
-        # pass projection parameters to the shader
-        fov_loc = glGetUniformLocation(self.shader, "fov")
-        glUniform1f(fov_loc, 45.0)
-        aspect_loc = glGetUniformLocation(self.shader, "aspectRatio")
-        glUniform1f(aspect_loc, 1.0)
-        nearZ_loc = glGetUniformLocation(self.shader, "nearZ")
-        glUniform1f(nearZ_loc, -5.0)
-        farZ_loc = glGetUniformLocation(self.shader, "farZ")
-        glUniform1f(farZ_loc, -150.00)
-
-        # ascontiguousarray puts the array in column major order
-        glUniformMatrix4fv(
-            self.mMatrixLoc,
-            1,
-            GL_TRUE,
-            np.ascontiguousarray(
-                ms.get_current_matrix(ms.MatrixStack.model), dtype=np.float32
+        render_queue.submit(
+            self.shader,
+            self.vao,
+            GL_LINES,
+            self.numberOfVertices,
+            uniforms={"mMatrix": ms.get_current_matrix(ms.MatrixStack.model)},
+            depth=renderqueue.view_depth(
+                ms.get_current_matrix(ms.MatrixStack.modelview)
             ),
         )
-        glUniformMatrix4fv(
-            self.vMatrixLoc,
-            1,
-            GL_TRUE,
-            np.ascontiguousarray(
-                ms.get_current_matrix(ms.MatrixStack.view), dtype=np.float32
-            ),
-        )
-        glUniformMatrix4fv(
-            self.pMatrixLoc,
-            1,
-            GL_TRUE,
-            np.ascontiguousarray(
-                ms.get_current_matrix(ms.MatrixStack.projection), dtype=np.float32
-            ),
-        )
-        glDrawArrays(GL_LINES, 0, self.numberOfVertices)
-        glBindVertexArray(0)
 
 
 ground = Ground()
@@ -466,104 +311,25 @@ class Axis:
         pass
 
     def vertices(self) -> ndarray:
-        # glColor3f(0.1,0.1,0.1)
-        verts = []
-        verts.append(float(0.0))
-        verts.append(float(0.0))
-        verts.append(float(0.0))
-
-        verts.append(float(0.0))
-        verts.append(float(1.0))
-        verts.append(float(0.0))
-
-        # arrow
-        verts.append(float(0.0))
-        verts.append(float(1.0))
-        verts.append(float(0.0))
-
-        verts.append(float(0.25))
-        verts.append(float(0.75))
-        verts.append(float(0.0))
-
-        verts.append(float(0.0))
-        verts.append(float(1.0))
-        verts.append(float(0.0))
-
-        verts.append(float(-0.25))
-        verts.append(float(0.75))
-        verts.append(float(0.0))
-
-        return np.array(verts, dtype=np.float32)
+        return geometry.axis_arrow()
 
     def prepare_to_render(self) -> None:
         # GL_QUADS aren't available anymore, only triangles
         # need 6 vertices instead of 4
         vertices = self.vertices()
-        self.numberOfVertices = np.size(vertices) // floatsPerVertex
-
-        self.vao = glGenVertexArrays(1)
-        glBindVertexArray(self.vao)
 
         # initialize shaders
-
-        with open(os.path.join(pwd, "axis.vert"), "r") as f:
-            vs = shaders.compileShader(f.read(), GL_VERTEX_SHADER)
-
-        with open(os.path.join(pwd, "axis.frag"), "r") as f:
-            fs = shaders.compileShader(f.read(), GL_FRAGMENT_SHADER)
-
-        self.shader = shaders.compileProgram(vs, fs)
-
-        self.mMatrixLoc = glGetUniformLocation(self.shader, "mMatrix")
-        self.vMatrixLoc = glGetUniformLocation(self.shader, "vMatrix")
-        self.pMatrixLoc = glGetUniformLocation(self.shader, "pMatrix")
-        self.colorLoc = glGetUniformLocation(self.shader, "color")
-
-        # send the modelspace data to the GPU
-        self.vbo = glGenBuffers(1)
-        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
-
-        position = glGetAttribLocation(self.shader, "position")
-        glEnableVertexAttribArray(position)
-
-        glVertexAttribPointer(
-            position, floatsPerVertex, GL_FLOAT, False, 0, ctypes.c_void_p(0)
-        )
-
-        glBufferData(
-            GL_ARRAY_BUFFER,
-            glfloat_size * np.size(vertices),
-            vertices,
-            GL_STATIC_DRAW,
+        self.shader = programs.get_program(
+            os.path.join(pwd, "axis.vert"),
+            os.path.join(pwd, "axis.frag"),
         )
 
-        # send the modelspace data to the GPU
-        # TODO, send color to the shader
-
-        # reset VAO/VBO to default
-        glBindVertexArray(0)
-        glBindBuffer(GL_ARRAY_BUFFER, 0)
-
-    # destructor
-    def __del__(self):
-        glDeleteVertexArrays(1, [self.vao])
-        glDeleteBuffers(1, [self.vbo])
-        glDeleteProgram(self.shader)
+        # the arrows share the modelspace data on the GPU, and are
+        # drawn together, by one instanced draw call
+        self.arrows = meshes.get_instanced_mesh(vertices, self.shader, GL_LINES)
 
     def render(self, time: float, grayed_out: bool = False) -> None:
-        glUseProgram(self.shader)
-        glBindVertexArray(self.vao)
-
-        # pass projection parameters to the shader
-        fov_loc = glGetUniformLocation(self.shader, "fov")
-        glUniform1f(fov_loc, 45.0)
-        aspect_loc = glGetUniformLocation(self.shader, "aspectRatio")
-        glUniform1f(aspect_loc, 1.0)
-        nearZ_loc = glGetUniformLocation(self.shader, "nearZ")
-        glUniform1f(nearZ_loc, -5.0)
-        farZ_loc = glGetUniformLocation(self.shader, "farZ")
-        glUniform1f(farZ_loc, -150.00)
-        # TODO, set the color
+        glstate.use_program(self.shader)
 
         with ms.push_matrix(ms.MatrixStack.model):
             # x axis
@@ -572,39 +338,11 @@ class Axis:
 
                 if enlarged_axis:
                     ms.scale(ms.MatrixStack.model, 10.0, 10.0, 10.0)
-                glUniform3f(self.colorLoc, 1.0, 0.0, 0.0)
+                color = (1.0, 0.0, 0.0)
                 if grayed_out:
-                    glUniform3f(self.colorLoc, 0.5, 0.5, 0.5)
-
-                # ascontiguousarray puts the array in column major order
-                glUniformMatrix4fv(
-                    self.mMatrixLoc,
-                    1,
-                    GL_TRUE,
-                    np.ascontiguousarray(
-                        ms.get_current_matrix(ms.MatrixStack.model),
-                        dtype=np.float32,
-                    ),
-                )
-                glUniformMatrix4fv(
-                    self.vMatrixLoc,
-                    1,
-                    GL_TRUE,
-                    np.ascontiguousarray(
-                        ms.get_current_matrix(ms.MatrixStack.view),
-                        dtype=np.float32,
-                    ),
-                )
-                glUniformMatrix4fv(
-                    self.pMatrixLoc,
-                    1,
-                    GL_TRUE,
-                    np.ascontiguousarray(
-                        ms.get_current_matrix(ms.MatrixStack.projection),
-                        dtype=np.float32,
-                    ),
-                )
-                glDrawArrays(GL_LINES, 0, self.numberOfVertices)
+                    color = (0.5, 0.5, 0.5)
+
+                self.arrows.add(ms.get_current_matrix(ms.MatrixStack.model), color)
 
             # z
             # glColor3f(0.0,0.0,1.0) # blue z
@@ -614,74 +352,21 @@ class Axis:
 
                 if enlarged_axis:
                     ms.scale(ms.MatrixStack.model, 10.0, 10.0, 10.0)
-                glUniform3f(self.colorLoc, 0.0, 0.0, 1.0)
+                color = (0.0, 0.0, 1.0)
                 if grayed_out:
-                    glUniform3f(self.colorLoc, 0.5, 0.5, 0.5)
-                # ascontiguousarray puts the array in column major order
-                glUniformMatrix4fv(
-                    self.mMatrixLoc,
-                    1,
-                    GL_TRUE,
-                    np.ascontiguousarray(
-                        ms.get_current_matrix(ms.MatrixStack.model),
-                        dtype=np.float32,
-                    ),
-                )
-                glUniformMatrix4fv(
-                    self.vMatrixLoc,
-                    1,
-                    GL_TRUE,
-                    np.ascontiguousarray(
-                        ms.get_current_matrix(ms.MatrixStack.view),
-                        dtype=np.float32,
-                    ),
-                )
-                glUniformMatrix4fv(
-                    self.pMatrixLoc,
-                    1,
-                    GL_TRUE,
-                    np.ascontiguousarray(
-                        ms.get_current_matrix(ms.MatrixStack.projection),
-                        dtype=np.float32,
-                    ),
-                )
-                glDrawArrays(GL_LINES, 0, self.numberOfVertices)
+                    color = (0.5, 0.5, 0.5)
+                self.arrows.add(ms.get_current_matrix(ms.MatrixStack.model), color)
 
             # y
             if enlarged_axis:
                 ms.scale(ms.MatrixStack.model, 10.0, 10.0, 10.0)
-            glUniform3f(self.colorLoc, 0.0, 1.0, 0.0)
+            color = (0.0, 1.0, 0.0)
             # glColor3f(0.0,1.0,0.0) # green y
             if grayed_out:
-                glUniform3f(self.colorLoc, 0.5, 0.5, 0.5)
-            # ascontiguousarray puts the array in column major order
-            glUniformMatrix4fv(
-                self.mMatrixLoc,
-                1,
-                GL_TRUE,
-                np.ascontiguousarray(
-                    ms.get_current_matrix(ms.MatrixStack.model), dtype=np.float32
-                ),
-            )
-            glUniformMatrix4fv(
-                self.vMatrixLoc,
-                1,
-                GL_TRUE,
-                np.ascontiguousarray(
-                    ms.get_current_matrix(ms.MatrixStack.view), dtype=np.float32
-                ),
-            )
-            glUniformMatrix4fv(
-                self.pMatrixLoc,
-                1,
-                GL_TRUE,
-                np.ascontiguousarray(
-                    ms.get_current_matrix(ms.MatrixStack.projection),
-                    dtype=np.float32,
-                ),
-            )
-            glDrawArrays(GL_LINES, 0, self.numberOfVertices)
-            glBindVertexArray(0)
+                color = (0.5, 0.5, 0.5)
+            self.arrows.add(ms.get_current_matrix(ms.MatrixStack.model), color)
+
+        self.arrows.draw()
 
 
 axis = Axis()
@@ -693,106 +378,7 @@ class NDCCube:
         pass
 
     def vertices(self) -> ndarray:
-        # glColor3f(0.1,0.1,0.1)
-        verts = []
-        verts.append(-1.0)
-        verts.append(-1.0)
-        verts.append(-1.0)
-
-        verts.append(1.0)
-        verts.append(-1.0)
-        verts.append(-1.0)
-
-        verts.append(1.0)
-        verts.append(-1.0)
-        verts.append(-1.0)
-
-        verts.append(1.0)
-        verts.append(1.0)
-        verts.append(-1.0)
-
-        verts.append(1.0)
-        verts.append(1.0)
-        verts.append(-1.0)
-
-        verts.append(-1.0)
-        verts.append(1.0)
-        verts.append(-1.0)
-
-        verts.append(-1.0)
-        verts.append(1.0)
-        verts.append(-1.0)
-
-        verts.append(-1.0)
-        verts.append(-1.0)
-        verts.append(-1.0)
-
-        verts.append(-1.0)
-        verts.append(-1.0)
-        verts.append(1.0)
-
-        verts.append(1.0)
-        verts.append(-1.0)
-        verts.append(1.0)
-
-        verts.append(1.0)
-        verts.append(-1.0)
-        verts.append(1.0)
-
-        verts.append(1.0)
-        verts.append(1.0)
-        verts.append(1.0)
-
-        verts.append(1.0)
-        verts.append(1.0)
-        verts.append(1.0)
-
-        verts.append(-1.0)
-        verts.append(1.0)
-        verts.append(1.0)
-
-        verts.append(-1.0)
-        verts.append(1.0)
-        verts.append(1.0)
-
-        verts.append(-1.0)
-        verts.append(-1.0)
-        verts.append(1.0)
-
-        # connect the squares
-        verts.append(1.0)
-        verts.append(1.0)
-        verts.append(-1.0)
-
-        verts.append(1.0)
-        verts.append(1.0)
-        verts.append(1.0)
-
-        verts.append(1.0)
-        verts.append(-1.0)
-        verts.append(-1.0)
-
-        verts.append(1.0)
-        verts.append(-1.0)
-        verts.append(1.0)
-
-        verts.append(-1.0)
-        verts.append(1.0)
-        verts.append(-1.0)
-
-        verts.append(-1.0)
-        verts.append(1.0)
-        verts.append(1.0)
-
-        verts.append(-1.0)
-        verts.append(-1.0)
-        verts.append(-1.0)
-
-        verts.append(-1.0)
-        verts.append(-1.0)
-        verts.append(1.0)
-
-        return np.array(verts, dtype=np.float32)
+        return geometry.ndc_cube_edges()
 
     def prepare_to_render(self) -> None:
         # GL_QUADS aren't available anymore, only triangles
@@ -801,25 +387,17 @@ class NDCCube:
         self.numberOfVertices = np.size(vertices) // floatsPerVertex
 
         self.vao = glGenVertexArrays(1)
-        glBindVertexArray(self.vao)
+        glstate.bind_vertex_array(self.vao)
 
         # initialize shaders
-
-        with open(os.path.join(pwd, "cube.vert"), "r") as f:
-            vs = shaders.compileShader(f.read(), GL_VERTEX_SHADER)
-
-        with open(os.path.join(pwd, "cube.frag"), "r") as f:
-            fs = shaders.compileShader(f.read(), GL_FRAGMENT_SHADER)
-
-        self.shader = shaders.compileProgram(vs, fs)
-
-        self.mMatrixLoc = glGetUniformLocation(self.shader, "mMatrix")
-        self.vMatrixLoc = glGetUniformLocation(self.shader, "vMatrix")
-        self.pMatrixLoc = glGetUniformLocation(self.shader, "pMatrix")
+        self.shader = programs.get_program(
+            os.path.join(pwd, "cube.vert"),
+            os.path.join(pwd, "cube.frag"),
+        )
 
         # send the modelspace data to the GPU
         self.vbo = glGenBuffers(1)
-        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glstate.bind_buffer(GL_ARRAY_BUFFER, self.vbo)
 
         position = glGetAttribLocation(self.shader, "position")
         glEnableVertexAttribArray(position)
@@ -839,56 +417,25 @@ class NDCCube:
         # TODO, send color to the shader
 
         # reset VAO/VBO to default
-        glBindVertexArray(0)
-        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glstate.bind_vertex_array(0)
+        glstate.bind_buffer(GL_ARRAY_BUFFER, 0)
 
     # destructor
     def __del__(self):
         glDeleteVertexArrays(1, [self.vao])
         glDeleteBuffers(1, [self.vbo])
-        glDeleteProgram(self.shader)
 
     def render(self, time: float) -> None:
-        glUseProgram(self.shader)
-        glBindVertexArray(self.vao)
-
-        # pass projection parameters to the shader
-        fov_loc = glGetUniformLocation(self.shader, "fov")
-        glUniform1f(fov_loc, 45.0)
-        aspect_loc = glGetUniformLocation(self.shader, "aspectRatio")
-        glUniform1f(aspect_loc, 1.0)
-        nearZ_loc = glGetUniformLocation(self.shader, "nearZ")
-        glUniform1f(nearZ_loc, -5.0)
-        farZ_loc = glGetUniformLocation(self.shader, "farZ")
-        glUniform1f(farZ_loc, -150.00)
-
-        # ascontiguousarray puts the array in column major order
-        glUniformMatrix4fv(
-            self.mMatrixLoc,
-            1,
-            GL_TRUE,
-            np.ascontiguousarray(
-                ms.get_current_matrix(ms.MatrixStack.model), dtype=np.float32
-            ),
-        )
-        glUniformMatrix4fv(
-            self.vMatrixLoc,
-            1,
-            GL_TRUE,
-            np.ascontiguousarray(
-                ms.get_current_matrix(ms.MatrixStack.view), dtype=np.float32
+        render_queue.submit(
+            self.shader,
+            self.vao,
+            GL_LINES,
+            self.numberOfVertices,
+            uniforms={"mMatrix": ms.get_current_matrix(ms.MatrixStack.model)},
+            depth=renderqueue.view_depth(
+                ms.get_current_matrix(ms.MatrixStack.modelview)
             ),
         )
-        glUniformMatrix4fv(
-            self.pMatrixLoc,
-            1,
-            GL_TRUE,
-            np.ascontiguousarray(
-                ms.get_current_matrix(ms.MatrixStack.projection), dtype=np.float32
-            ),
-        )
-        glDrawArrays(GL_LINES, 0, self.numberOfVertices)
-        glBindVertexArray(0)
 
 
 cube = NDCCube()
@@ -900,87 +447,7 @@ class Frustum:
         pass
 
     def vertices(self) -> ndarray:
-        verts = []
-        verts.append(-50.0)
-        verts.append(-50.0)
-        verts.append(-5.0)
-        verts.append(50.0)
-        verts.append(-50.0)
-        verts.append(-5.0)
-        verts.append(50.0)
-        verts.append(-50.0)
-        verts.append(-5.0)
-        verts.append(50.0)
-        verts.append(50.0)
-        verts.append(-5.0)
-        verts.append(50.0)
-        verts.append(50.0)
-        verts.append(-5.0)
-        verts.append(-50.0)
-        verts.append(50.0)
-        verts.append(-5.0)
-        verts.append(-50.0)
-        verts.append(50.0)
-        verts.append(-5.0)
-        verts.append(-50.0)
-        verts.append(-50.0)
-        verts.append(-5.0)
-
-        verts.append(-50.0)
-        verts.append(-50.0)
-        verts.append(-150.00)
-        verts.append(50.0)
-        verts.append(-50.0)
-        verts.append(-150.00)
-        verts.append(50.0)
-        verts.append(-50.0)
-        verts.append(-150.00)
-        verts.append(50.0)
-        verts.append(50.0)
-        verts.append(-150.00)
-        verts.append(50.0)
-        verts.append(50.0)
-        verts.append(-150.00)
-        verts.append(-50.0)
-        verts.append(50.0)
-        verts.append(-150.00)
-        verts.append(-50.0)
-        verts.append(50.0)
-        verts.append(-150.00)
-        verts.append(-50.0)
-        verts.append(-50.0)
-        verts.append(-150.00)
-
-        # connect the faces
-        verts.append(-50.0)
-        verts.append(-50.0)
-        verts.append(-5.0)
-        verts.append(-50.0)
-        verts.append(-50.0)
-        verts.append(-150.00)
-
-        verts.append(50.0)
-        verts.append(-50.0)
-        verts.append(-5.0)
-        verts.append(50.0)
-        verts.append(-50.0)
-        verts.append(-150.00)
-
-        verts.append(50.0)
-        verts.append(50.0)
-        verts.append(-5.0)
-        verts.append(50.0)
-        verts.append(50.0)
-        verts.append(-150.00)
-
-        verts.append(-50.0)
-        verts.append(50.0)
-        verts.append(-5.0)
-        verts.append(-50.0)
-        verts.append(50.0)
-        verts.append(-150.00)
-
-        return np.array(verts, dtype=np.float32)
+        return geometry.frustum_edges((50.0, 50.0), -5.0, (50.0, 50.0), -150.0)
 
     def prepare_to_render(self) -> None:
         # GL_QUADS aren't available anymore, only triangles
@@ -989,25 +456,17 @@ class Frustum:
         self.numberOfVertices = np.size(vertices) // floatsPerVertex
 
         self.vao = glGenVertexArrays(1)
-        glBindVertexArray(self.vao)
+        glstate.bind_vertex_array(self.vao)
 
         # initialize shaders
-
-        with open(os.path.join(pwd, "frustum.vert"), "r") as f:
-            vs = shaders.compileShader(f.read(), GL_VERTEX_SHADER)
-
-        with open(os.path.join(pwd, "frustum.frag"), "r") as f:
-            fs = shaders.compileShader(f.read(), GL_FRAGMENT_SHADER)
-
-        self.shader = shaders.compileProgram(vs, fs)
-
-        self.mMatrixLoc = glGetUniformLocation(self.shader, "mMatrix")
-        self.vMatrixLoc = glGetUniformLocation(self.shader, "vMatrix")
-        self.pMatrixLoc = glGetUniformLocation(self.shader, "pMatrix")
+        self.shader = programs.get_program(
+            os.path.join(pwd, "frustum.vert"),
+            os.path.join(pwd, "frustum.frag"),
+        )
 
         # send the modelspace data to the GPU
         self.vbo = glGenBuffers(1)
-        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glstate.bind_buffer(GL_ARRAY_BUFFER, self.vbo)
 
         position = glGetAttribLocation(self.shader, "position")
         glEnableVertexAttribArray(position)
@@ -1027,58 +486,25 @@ class Frustum:
         # TODO, send color to the shader
 
         # reset VAO/VBO to default
-        glBindVertexArray(0)
-        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glstate.bind_vertex_array(0)
+        glstate.bind_buffer(GL_ARRAY_BUFFER, 0)
 
     # destructor
     def __del__(self):
         glDeleteVertexArrays(1, [self.vao])
         glDeleteBuffers(1, [self.vbo])
-        glDeleteProgram(self.shader)
 
     def render(self, time):
-        glUseProgram(self.shader)
-        glBindVertexArray(self.vao)
-
-        # pass projection parameters to the shader
-        fov_loc = glGetUniformLocation(self.shader, "fov")
-        glUniform1f(fov_loc, 45.0)
-        aspect_loc = glGetUniformLocation(self.shader, "aspectRatio")
-        glUniform1f(aspect_loc, 1.0)
-        nearZ_loc = glGetUniformLocation(self.shader, "nearZ")
-        glUniform1f(nearZ_loc, -5.0)
-        farZ_loc = glGetUniformLocation(self.shader, "farZ")
-        glUniform1f(farZ_loc, -150.00)
-        time_loc = glGetUniformLocation(self.shader, "time")
-        glUniform1f(time_loc, animation_time)
-
-        # ascontiguousarray puts the array in column major order
-        glUniformMatrix4fv(
-            self.mMatrixLoc,
-            1,
-            GL_TRUE,
-            np.ascontiguousarray(
-                ms.get_current_matrix(ms.MatrixStack.model), dtype=np.float32
-            ),
-        )
-        glUniformMatrix4fv(
-            self.vMatrixLoc,
-            1,
-            GL_TRUE,
-            np.ascontiguousarray(
-                ms.get_current_matrix(ms.MatrixStack.view), dtype=np.float32
-            ),
-        )
-        glUniformMatrix4fv(
-            self.pMatrixLoc,
-            1,
-            GL_TRUE,
-            np.ascontiguousarray(
-                ms.get_current_matrix(ms.MatrixStack.projection), dtype=np.float32
+        render_queue.submit(
+            self.shader,
+            self.vao,
+            GL_LINES,
+            self.numberOfVertices,
+            uniforms={"mMatrix": ms.get_current_matrix(ms.MatrixStack.model)},
+            depth=renderqueue.view_depth(
+                ms.get_current_matrix(ms.MatrixStack.modelview)
             ),
         )
-        glDrawArrays(GL_LINES, 0, self.numberOfVertices)
-        glBindVertexArray(0)
 
 
 frustum = Frustum()
@@ -1099,53 +525,52 @@ square_rotation = math.radians(90.0)
 rotation_around_paddle1 = math.radians(30.0)
 
 
-def handle_inputs(previous_mouse_position) -> None:
+# what each key does, per second while it's held down
+actions = inputstate.ActionTable(
+    [
+        (glfw.KEY_E, "rotation_around_paddle1", 6.0),
+        (glfw.KEY_Q, "square_rotation", 6.0),
+        (glfw.KEY_RIGHT, "camera_rot_y", -math.radians(60.0)),
+        (glfw.KEY_LEFT, "camera_rot_y", math.radians(60.0)),
+        (glfw.KEY_UP, "camera_rot_x", -math.radians(60.0)),
+        (glfw.KEY_DOWN, "camera_rot_x", math.radians(60.0)),
+        (glfw.KEY_S, "paddle1_y", -600.0),
+        (glfw.KEY_W, "paddle1_y", 600.0),
+        (glfw.KEY_K, "paddle2_y", -600.0),
+        (glfw.KEY_I, "paddle2_y", 600.0),
+        (glfw.KEY_A, "paddle1_rotation", 6.0),
+        (glfw.KEY_D, "paddle1_rotation", -6.0),
+        (glfw.KEY_J, "paddle2_rotation", 6.0),
+        (glfw.KEY_L, "paddle2_rotation", -6.0),
+    ]
+)
+
+
+def handle_inputs(previous_mouse_position, dt: float) -> None:
+    amounts = actions.amounts(input_state.keys, dt)
+
     global rotation_around_paddle1
-    if glfw.get_key(window, glfw.KEY_E) == glfw.PRESS:
-        rotation_around_paddle1 += 0.1
+    rotation_around_paddle1 += amounts["rotation_around_paddle1"]
 
     global square_rotation
-    if glfw.get_key(window, glfw.KEY_Q) == glfw.PRESS:
-        square_rotation += 0.1
+    square_rotation += amounts["square_rotation"]
 
     global camera
 
-    move_multiple = 15.0
-    if glfw.get_key(window, glfw.KEY_RIGHT) == glfw.PRESS:
-        camera.rot_y -= math.radians(1.0) % 360.0
-    if glfw.get_key(window, glfw.KEY_LEFT) == glfw.PRESS:
-        camera.rot_y += math.radians(1.0) % 360.0
-    if glfw.get_key(window, glfw.KEY_UP) == glfw.PRESS:
-        camera.rot_x -= math.radians(1.0) % 360.0
-    if glfw.get_key(window, glfw.KEY_DOWN) == glfw.PRESS:
-        camera.rot_x += math.radians(1.0) % 360.0
+    camera.rot_y += amounts["camera_rot_y"]
+    camera.rot_x += amounts["camera_rot_x"]
 
     global paddle1, paddle2
 
-    if glfw.get_key(window, glfw.KEY_S) == glfw.PRESS:
-        paddle1.position[1] -= 10.0
-    if glfw.get_key(window, glfw.KEY_W) == glfw.PRESS:
-        paddle1.position[1] += 10.0
-    if glfw.get_key(window, glfw.KEY_K) == glfw.PRESS:
-        paddle2.position[1] -= 10.0
-    if glfw.get_key(window, glfw.KEY_I) == glfw.PRESS:
-        paddle2.position[1] += 10.0
-
-    global paddle_1_rotation, paddle_2_rotation
-
-    if glfw.get_key(window, glfw.KEY_A) == glfw.PRESS:
-        paddle1.rotation += 0.1
-    if glfw.get_key(window, glfw.KEY_D) == glfw.PRESS:
-        paddle1.rotation -= 0.1
-    if glfw.get_key(window, glfw.KEY_J) == glfw.PRESS:
-        paddle2.rotation += 0.1
-    if glfw.get_key(window, glfw.KEY_L) == glfw.PRESS:
-        paddle2.rotation -= 0.1
-
-    new_mouse_position = glfw.get_cursor_pos(window)
+    paddle1.position[1] += amounts["paddle1_y"]
+    paddle2.position[1] += amounts["paddle2_y"]
+    paddle1.rotation += amounts["paddle1_rotation"]
+    paddle2.rotation += amounts["paddle2_rotation"]
+
+    new_mouse_position = tuple(input_state.cursor)
     return_none = False
-    if glfw.PRESS == glfw.get_mouse_button(window, glfw.MOUSE_BUTTON_LEFT):
-        if not imguiio.want_capture_mouse:
+    if input_state.mouse_buttons[glfw.MOUSE_BUTTON_LEFT]:
+        if not input_state.ui_wants_mouse:
             if previous_mouse_position:
                 camera.rot_y -= 0.2 * math.radians(
                     new_mouse_position[0] - previous_mouse_position[0]
@@ -1171,8 +596,8 @@ virtual_camera_relative_offset = np.array([-0.0, 0.0, 0.0], dtype=np.float32)
 
 TARGET_FRAMERATE = 60  # fps
 
-# to try to standardize on 60 fps, compare times between frames
-time_at_beginning_of_previous_frame = glfw.get_time()
+# sleeps until shortly before each frame is due, instead of spinning
+frame_scheduler = framescheduler.FrameScheduler(TARGET_FRAMERATE)
 
 animation_time = 0.0
 animation_time_multiplier = 1.0
@@ -1201,22 +626,79 @@ def highlighted_button(text: str, start_time: int, time: float) -> bool:
 previous_mouse_position = None
 
 
+# the block of uniforms which every vertex shader shares
+frame_uniforms = uniformblocks.FrameUniforms()
+
+# the input and the animation advance in steps of 1/60th of a second,
+# however many frames are drawn, and what changes is drawn in between
+# its values at the last two steps
+simulation = fixedtimestep.FixedTimestep(TARGET_FRAMERATE)
+this_module = sys.modules[__name__]
+interpolation = fixedtimestep.Interpolation(
+    (this_module, "animation_time"),
+    (this_module, "square_rotation"),
+    (this_module, "rotation_around_paddle1"),
+    (paddle1, "position"),
+    (paddle1, "rotation"),
+    (paddle2, "position"),
+    (paddle2, "rotation"),
+    (camera, "rot_x"),
+    (camera, "rot_y"),
+)
+
+# which keys are down, and where the mouse is, kept up to date by the
+# window's callbacks, instead of asking GLFW for each key every frame
+input_state = inputstate.InputState(window)
+
+# records the input, to replay the same session later, such as to
+# compare the frame times, when MODELVIEWPROJECTION_RECORD_INPUT is
+# set, or replays MODELVIEWPROJECTION_REPLAY_INPUT
+input_log = inputlog.InputLog(
+    input_state,
+    simulation,
+    (this_module, "animation_time"),
+    (this_module, "animation_paused"),
+    (this_module, "animation_time_multiplier"),
+    (camera, "r"),
+    (this_module, "enlarged_axis"),
+    (this_module, "virtual_camera_position"),
+    (this_module, "virtual_camera_rot_x"),
+    (this_module, "virtual_camera_rot_y"),
+)
+
+# draws a frame only after input, or while something moves.  Created
+# after imgui's and the other callbacks, which it calls as well.  A
+# replay draws every frame
+render_on_demand = renderondemand.RenderOnDemand(
+    window, enabled=renderondemand.default_enabled and not input_log.replaying
+)
+
 # Loop until the user closes the window
 while not glfw.window_should_close(window):
-    # poll the time to try to get a constant framerate
-    while (
-        glfw.get_time() < time_at_beginning_of_previous_frame + 1.0 / TARGET_FRAMERATE
-    ):
-        pass
-    # set for comparison on the next frame
-    time_at_beginning_of_previous_frame = glfw.get_time()
+    frame_scheduler.wait_for_next_frame()
+
+    # Poll for and process events, and if nothing could have changed,
+    # wait for more instead of drawing the same frame again, without
+    # simulating the time spent waiting
+    simulation.skip(render_on_demand.wait_for_events())
+    impl.process_inputs()
+    input_state.ui_wants_mouse = imguiio.want_capture_mouse
+
+    for _ in range(input_log.advance()):
+        interpolation.begin_step()
+        previous_mouse_position = handle_inputs(previous_mouse_position, simulation.dt)
+        if not animation_paused:
+            animation_time += simulation.dt * animation_time_multiplier
+
+    # what a widget sets after this is drawn without blending
+    interpolation.end_steps()
 
+    # keep drawing while the animation runs
     if not animation_paused:
-        animation_time += 1.0 / 60.0 * animation_time_multiplier
+        render_on_demand.request_frame()
 
-    # Poll for and process events
-    glfw.poll_events()
-    impl.process_inputs()
+    glstate.begin_frame()
+    render_queue.begin_frame()
 
     imgui.new_frame()
 
@@ -1416,12 +898,14 @@ while not glfw.window_should_close(window):
 
     imgui.end()
 
+    input_log.end_widgets()
+
     width, height = glfw.get_framebuffer_size(window)
-    glViewport(0, 0, width, height)
+    glstate.viewport(0, 0, width, height)
     glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
 
     # render scene
-    previous_mouse_position = handle_inputs(previous_mouse_position)
+    interpolation.apply(simulation.alpha)
 
     ms.set_to_identity_matrix(ms.MatrixStack.model)
     ms.set_to_identity_matrix(ms.MatrixStack.view)
@@ -1440,6 +924,14 @@ while not glfw.window_should_close(window):
     ms.rotate_x(ms.MatrixStack.view, camera.rot_x)
     ms.rotate_y(ms.MatrixStack.view, -camera.rot_y)
 
+    # the view, the projection, and the virtual camera don't change
+    # while drawing the frame, so send them to the GPU only once
+    frame_uniforms.upload(
+        view=ms.get_current_matrix(ms.MatrixStack.view),
+        projection=ms.get_current_matrix(ms.MatrixStack.projection),
+        time=animation_time,
+    )
+
     # draw NDC in global space, so that we can see the camera space
     # go to NDC
     with ms.push_matrix(ms.MatrixStack.model):
@@ -1515,7 +1007,6 @@ while not glfw.window_should_close(window):
         if animation_time > 0.0 and animation_time < 15.0:
             axis.render(animation_time)
         if animation_time > 15.0:
-            # ascontiguousarray puts the array in column major order
             paddle1.render(animation_time)
 
         # # draw the square
@@ -1574,12 +1065,17 @@ while not glfw.window_should_close(window):
         if animation_time > 45.0:
             paddle2.render(animation_time)
 
+    render_queue.flush()
+    batch.flush()
+
     imgui.render()
     impl.render(imgui.get_draw_data())
 
     # done with frame, flush and swap buffers
     # Swap front and back buffers
     glfw.swap_buffers(window)
+    interpolation.restore()
 
 
+input_log.close()
 glfw.terminate()
@@ -20,20 +20,29 @@
 
 #version 330 core
 
-layout (location = 0) in vec3 position;
-
 uniform mat4 mMatrix;
-uniform mat4 vMatrix;
-uniform mat4 pMatrix;
-uniform float fov;
-uniform float aspectRatio;
-uniform float nearZ;
-uniform float farZ;
-uniform float time;
+uniform float u_thickness;
+
+layout (std140) uniform FrameUniforms {
+  mat4 vMatrix;
+  mat4 pMatrix;
+  float fov;
+  float aspectRatio;
+  float nearZ;
+  float farZ;
+  float time;
+};
 
-out VS_OUT {
-  vec4 color;
-} vs_out;
+// position is a corner of the NDC cube.  Move it to the matching corner
+// of the frustum, z of -1 to the near plane and z of 1 to the far plane,
+// so that changing the fov, the aspect ratio, nearZ or farZ is only a
+// change of the uniforms
+vec3 frustum_corner(vec3 ndc_corner){
+    float z = mix(nearZ, farZ, (ndc_corner.z + 1.0) / 2.0);
+    float top = (-z) * tan(fov * 3.14159265358979323846 / 360.0);
+    float right = top * aspectRatio;
+    return vec3(ndc_corner.x * right, ndc_corner.y * top, z);
+}
 
 vec4 project(vec4 cameraSpace){
 
@@ -92,12 +101,21 @@ vec4 project(vec4 cameraSpace){
      return scale_to_ndc * translate_to_origin * scale_y * scale_x * cameraSpace;
 }
 
-
-void main()
+// linked with glutils/thicklines.vert, which draws each line as a quad
+vec4 clip_position(vec3 position)
 {
    // if you change the depth to be 1.0, and LEQUAL, instead of -1.0, and GREATER, and if
    // you change the nearZ farZ by negating them, then you could use the standard
    // projection matrix here:
-     gl_Position = pMatrix * vMatrix * project(mMatrix * vec4(position,1.0));
-   vs_out.color = vec4(1.0,1.0,1.0,1.0);
+   return pMatrix * vMatrix * project(mMatrix * vec4(frustum_corner(position),1.0));
+}
+
+vec4 line_color()
+{
+   return vec4(1.0,1.0,1.0,1.0);
+}
+
+float line_thickness()
+{
+   return u_thickness;
 }
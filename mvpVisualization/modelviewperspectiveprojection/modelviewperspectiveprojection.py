@@ -20,7 +20,6 @@
 
 
 import colorsys
-import ctypes
 import math
 import os
 import sys
@@ -29,57 +28,44 @@ from dataclasses import dataclass, field
 import glfw
 import imgui
 import numpy as np
-import OpenGL.GL.shaders as shaders
-import pyMatrixStack as ms
 from imgui.integrations.glfw import GlfwRenderer
 from OpenGL.GL import (
-    GL_ARRAY_BUFFER,
     GL_COLOR_BUFFER_BIT,
     GL_DEPTH_BUFFER_BIT,
     GL_DEPTH_TEST,
-    GL_FLOAT,
-    GL_FRAGMENT_SHADER,
-    GL_GEOMETRY_SHADER,
     GL_LESS,
-    GL_LINES,
-    GL_STATIC_DRAW,
-    GL_TRIANGLES,
     GL_TRUE,
-    GL_VERTEX_SHADER,
-    glBindBuffer,
-    glBindVertexArray,
-    glBufferData,
     glClear,
     glClearColor,
     glClearDepth,
-    glDeleteBuffers,
-    glDeleteProgram,
-    glDeleteVertexArrays,
     glDepthFunc,
-    glDrawArrays,
     glEnable,
-    glEnableVertexAttribArray,
-    glGenBuffers,
-    glGenVertexArrays,
-    glGetAttribLocation,
-    glGetUniformLocation,
-    glUniform1f,
-    glUniform2f,
-    glUniform3f,
-    glUniformMatrix4fv,
-    glUseProgram,
-    glVertexAttribPointer,
-    glViewport,
 )
 from numpy import ndarray
 
 # NEW - for shader location
 pwd = os.path.dirname(os.path.abspath(__file__))
 
+# the modules shared between the demos are in src/glutils
+sys.path.append(os.path.join(pwd, "..", "..", "src"))
+import glutils.batching as batching
+import glutils.fastgl as fastgl
+import glutils.fixedtimestep as fixedtimestep
+import glutils.framescheduler as framescheduler
+import glutils.geometry as geometry
+import glutils.glstate as glstate
+import glutils.inputlog as inputlog
+import glutils.inputstate as inputstate
+import glutils.lines as lines
+import glutils.matrixstack as ms
+import glutils.programs as programs
+import glutils.renderondemand as renderondemand
+import glutils.renderqueue as renderqueue
+import glutils.uniformblocks as uniformblocks
+
 # NEW - for shaders
 glfloat_size = 4
 floatsPerVertex = 3
-floatsPerColor = 3
 
 line_thickness = 2.0
 
@@ -103,6 +89,8 @@ if not window:
 
 # Make the window's context current
 glfw.make_context_current(window)
+# call the per draw OpenGL functions without PyOpenGL's wrappers
+fastgl.load(glfw.get_proc_address)
 imgui.create_context()
 impl = GlfwRenderer(window)
 
@@ -136,6 +124,14 @@ glDepthFunc(GL_LESS)
 glEnable(GL_DEPTH_TEST)
 
 
+# the paddles and the square are drawn together, with one draw call
+batch = batching.BatchRenderer()
+
+# the ground, the NDC cube and the frustum are drawn sorted by state,
+# at render_queue.flush
+render_queue = renderqueue.RenderQueue()
+
+
 @dataclass
 class Paddle:
     r: float
@@ -156,152 +152,31 @@ class Paddle:
         dtype=np.float32,
     ))
     # fmt: on
-    vao: int = 0
-    vbo: int = 0
     shader: int = 0
 
     def prepare_to_render(self) -> None:
-        # GL_QUADS aren't available anymore, only triangles
-        # need 6 vertices instead of 4
-        vertices = self.vertices
-        self.numberOfVertices = np.size(vertices) // floatsPerVertex
-        color = np.array(
-            [
-                self.r,
-                self.g,
-                self.b,
-                self.r,
-                self.g,
-                self.b,
-                self.r,
-                self.g,
-                self.b,
-                self.r,
-                self.g,
-                self.b,
-                self.r,
-                self.g,
-                self.b,
-                self.r,
-                self.g,
-                self.b,
-            ],
-            dtype=np.float32,
-        )
-        self.numberOfColors = np.size(color) // floatsPerColor
-
-        self.vao = glGenVertexArrays(1)
-        glBindVertexArray(self.vao)
-
         # initialize shaders
-
-        with open(os.path.join(pwd, "triangle.vert"), "r") as f:
-            vs = shaders.compileShader(f.read(), GL_VERTEX_SHADER)
-
-        with open(os.path.join(pwd, "triangle.frag"), "r") as f:
-            fs = shaders.compileShader(f.read(), GL_FRAGMENT_SHADER)
-
-        self.shader = shaders.compileProgram(vs, fs)
-
-        self.mMatrixLoc = glGetUniformLocation(self.shader, "mMatrix")
-        self.vMatrixLoc = glGetUniformLocation(self.shader, "vMatrix")
-        self.pMatrixLoc = glGetUniformLocation(self.shader, "pMatrix")
-
-        # send the modelspace data to the GPU
-        self.vbo = glGenBuffers(1)
-        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
-
-        position = glGetAttribLocation(self.shader, "position")
-        glEnableVertexAttribArray(position)
-
-        glVertexAttribPointer(
-            position, floatsPerVertex, GL_FLOAT, False, 0, ctypes.c_void_p(0)
-        )
-
-        glBufferData(
-            GL_ARRAY_BUFFER,
-            glfloat_size * np.size(vertices),
-            vertices,
-            GL_STATIC_DRAW,
-        )
-
-        # send the modelspace data to the GPU
-        vboColor = glGenBuffers(1)
-        glBindBuffer(GL_ARRAY_BUFFER, vboColor)
-
-        colorAttribLoc = glGetAttribLocation(self.shader, "color_in")
-        glEnableVertexAttribArray(colorAttribLoc)
-        glVertexAttribPointer(
-            colorAttribLoc,
-            floatsPerColor,
-            GL_FLOAT,
-            False,
-            0,
-            ctypes.c_void_p(0),
+        self.shader = programs.get_program(
+            os.path.join(pwd, "triangle.vert"),
+            os.path.join(pwd, "triangle.frag"),
         )
 
-        glBufferData(
-            GL_ARRAY_BUFFER,
-            glfloat_size * np.size(color),
-            color,
-            GL_STATIC_DRAW,
+        # GL_QUADS aren't available anymore, only triangles
+        # need 6 vertices instead of 4
+        self.modelspace_vertices = np.reshape(self.vertices, (-1, floatsPerVertex))
+        self.colors = np.tile(
+            [self.r, self.g, self.b], (len(self.modelspace_vertices), 1)
         )
 
-        # reset VAO/VBO to default
-        glBindVertexArray(0)
-        glBindBuffer(GL_ARRAY_BUFFER, 0)
-
-    # destructor
-    def __del__(self):
-        glDeleteVertexArrays(1, [self.vao])
-        glDeleteBuffers(1, [self.vbo])
-        glDeleteProgram(self.shader)
-
     def render(self, time: float) -> None:
-        glUseProgram(self.shader)
-        glBindVertexArray(self.vao)
-
-        # pass projection parameters to the shader
-        fov_loc = glGetUniformLocation(self.shader, "fov")
-        glUniform1f(fov_loc, 45.0)
-        aspect_loc = glGetUniformLocation(self.shader, "aspectRatio")
-        glUniform1f(aspect_loc, 1.0)
-        nearZ_loc = glGetUniformLocation(self.shader, "nearZ")
-        glUniform1f(nearZ_loc, -5.0)
-        farZ_loc = glGetUniformLocation(self.shader, "farZ")
-        glUniform1f(farZ_loc, -150.00)
-
-        time_loc = glGetUniformLocation(self.shader, "time")
-        glUniform1f(time_loc, animation_time)
-
-        # ascontiguousarray puts the array in column major order
-        glUniformMatrix4fv(
-            self.mMatrixLoc,
-            1,
-            GL_TRUE,
-            np.ascontiguousarray(
-                ms.get_current_matrix(ms.MatrixStack.model), dtype=np.float32
-            ),
+        # transformed into world space on the CPU, and drawn along with
+        # the other paddles and the square, at batch.flush
+        batch.submit(
+            self.shader,
+            self.modelspace_vertices,
+            ms.get_current_matrix(ms.MatrixStack.model),
+            self.colors,
         )
-        glUniformMatrix4fv(
-            self.vMatrixLoc,
-            1,
-            GL_TRUE,
-            np.ascontiguousarray(
-                ms.get_current_matrix(ms.MatrixStack.view), dtype=np.float32
-            ),
-        )
-        glUniformMatrix4fv(
-            self.pMatrixLoc,
-            1,
-            GL_TRUE,
-            np.ascontiguousarray(
-                ms.get_current_matrix(ms.MatrixStack.projection),
-                dtype=np.float32,
-            ),
-        )
-        glDrawArrays(GL_TRIANGLES, 0, self.numberOfVertices)
-        glBindVertexArray(0)
 
 
 paddle1 = Paddle(
@@ -352,123 +227,31 @@ class Ground:
         pass
 
     def vertices(self) -> ndarray:
-        # glColor3f(0.1,0.1,0.1)
-        verts = []
-        for x in range(-200, 201, 20):
-            for z in range(-200, 201, 20):
-                verts.extend([float(-x), -50.0, float(z)])
-                verts.extend([float(x), -50.0, float(z)])
-                verts.extend([float(x), -50.0, float(-z)])
-                verts.extend([float(x), -50.0, float(z)])
-
-        return np.array(verts, dtype=np.float32)
+        return geometry.ground_grid(extent=200, spacing=20)
 
     def prepare_to_render(self) -> None:
-        # GL_QUADS aren't available anymore, only triangles
-        # need 6 vertices instead of 4
-        vertices = self.vertices()
-        self.numberOfVertices = np.size(vertices) // floatsPerVertex
-
-        self.vao = glGenVertexArrays(1)
-        glBindVertexArray(self.vao)
-
         # initialize shaders
-
-        with open(os.path.join(pwd, "ground.vert"), "r") as f:
-            vs = shaders.compileShader(f.read(), GL_VERTEX_SHADER)
-
-        with open(os.path.join(pwd, "ground.frag"), "r") as f:
-            fs = shaders.compileShader(f.read(), GL_FRAGMENT_SHADER)
-
-        with open(os.path.join(pwd, "ground.geom"), "r") as f:
-            gs = shaders.compileShader(f.read(), GL_GEOMETRY_SHADER)
-
-        self.shader = shaders.compileProgram(vs, gs, fs)
-
-        self.mMatrixLoc = glGetUniformLocation(self.shader, "mMatrix")
-        self.vMatrixLoc = glGetUniformLocation(self.shader, "vMatrix")
-        self.pMatrixLoc = glGetUniformLocation(self.shader, "pMatrix")
-
-        self.thicknessLoc = glGetUniformLocation(self.shader, "u_thickness")
-        self.viewportLoc = glGetUniformLocation(self.shader, "u_viewport_size")
-
-        # send the modelspace data to the GPU
-        self.vbo = glGenBuffers(1)
-        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
-
-        position = glGetAttribLocation(self.shader, "position")
-        glEnableVertexAttribArray(position)
-
-        glVertexAttribPointer(
-            position, floatsPerVertex, GL_FLOAT, False, 0, ctypes.c_void_p(0)
-        )
-
-        glBufferData(
-            GL_ARRAY_BUFFER,
-            glfloat_size * np.size(vertices),
-            vertices,
-            GL_STATIC_DRAW,
+        self.shader = programs.get_program(
+            os.path.join(pwd, "ground.vert"),
+            lines.vertex_shader_path,
+            os.path.join(pwd, "ground.frag"),
         )
 
-        # send the modelspace data to the GPU
-        # TODO, send color to the shader
-
-        # reset VAO/VBO to default
-        glBindVertexArray(0)
-        glBindBuffer(GL_ARRAY_BUFFER, 0)
-
-    # destructor
-    def __del__(self):
-        glDeleteVertexArrays(1, [self.vao])
-        glDeleteBuffers(1, [self.vbo])
-        glDeleteProgram(self.shader)
+        # send the modelspace data to the GPU, each line drawn as a quad
+        self.lines = lines.ThickLines(self.vertices(), self.shader)
 
     def render(self, time: float) -> None:
-        glUseProgram(self.shader)
-        glBindVertexArray(self.vao)
-
-        # pass projection parameters to the shader
-        fov_loc = glGetUniformLocation(self.shader, "fov")
-        glUniform1f(fov_loc, 45.0)
-        aspect_loc = glGetUniformLocation(self.shader, "aspectRatio")
-        glUniform1f(aspect_loc, 1.0)
-        nearZ_loc = glGetUniformLocation(self.shader, "nearZ")
-        glUniform1f(nearZ_loc, -5.0)
-        farZ_loc = glGetUniformLocation(self.shader, "farZ")
-        glUniform1f(farZ_loc, -150.00)
-
-        # ascontiguousarray puts the array in column major order
-        glUniformMatrix4fv(
-            self.mMatrixLoc,
-            1,
-            GL_TRUE,
-            np.ascontiguousarray(
-                ms.get_current_matrix(ms.MatrixStack.model), dtype=np.float32
+        self.lines.submit(
+            render_queue,
+            uniforms={
+                "mMatrix": ms.get_current_matrix(ms.MatrixStack.model),
+                "u_thickness": line_thickness,
+                "u_viewport_size": (width, height),
+            },
+            depth=renderqueue.view_depth(
+                ms.get_current_matrix(ms.MatrixStack.modelview)
             ),
         )
-        glUniformMatrix4fv(
-            self.vMatrixLoc,
-            1,
-            GL_TRUE,
-            np.ascontiguousarray(
-                ms.get_current_matrix(ms.MatrixStack.view), dtype=np.float32
-            ),
-        )
-        glUniformMatrix4fv(
-            self.pMatrixLoc,
-            1,
-            GL_TRUE,
-            np.ascontiguousarray(
-                ms.get_current_matrix(ms.MatrixStack.projection),
-                dtype=np.float32,
-            ),
-        )
-
-        glUniform1f(self.thicknessLoc, line_thickness)
-        glUniform2f(self.viewportLoc, width, height)
-
-        glDrawArrays(GL_LINES, 0, self.numberOfVertices)
-        glBindVertexArray(0)
 
         if show_ground_axis:
             with ms.PushMatrix(ms.MatrixStack.model):
@@ -486,97 +269,26 @@ class Axis:
         pass
 
     def vertices(self) -> ndarray:
-        # glColor3f(0.1,0.1,0.1)
-        verts = []
-        verts.extend([0.0, 0.0, 0.0])
-        verts.extend([0.0, 1.0, 0.0])
-
-        # arrow
-        verts.extend([0.0, 1.0, 0.0])
-
-        verts.extend([0.25, 0.75, 0.0])
-
-        verts.extend([0.0, 1.0, 0.0])
-
-        verts.extend([-0.25, 0.75, 0.0])
-
-        return np.array(verts, dtype=np.float32)
+        return geometry.axis_arrow()
 
     def prepare_to_render(self) -> None:
         # GL_QUADS aren't available anymore, only triangles
         # need 6 vertices instead of 4
         vertices = self.vertices()
-        self.numberOfVertices = np.size(vertices) // floatsPerVertex
-
-        self.vao = glGenVertexArrays(1)
-        glBindVertexArray(self.vao)
 
         # initialize shaders
-
-        with open(os.path.join(pwd, "axis.vert"), "r") as f:
-            vs = shaders.compileShader(f.read(), GL_VERTEX_SHADER)
-
-        with open(os.path.join(pwd, "axis.frag"), "r") as f:
-            fs = shaders.compileShader(f.read(), GL_FRAGMENT_SHADER)
-
-        with open(os.path.join(pwd, "axis.geom"), "r") as f:
-            gs = shaders.compileShader(f.read(), GL_GEOMETRY_SHADER)
-
-        self.shader = shaders.compileProgram(vs, gs, fs)
-
-        self.mMatrixLoc = glGetUniformLocation(self.shader, "mMatrix")
-        self.vMatrixLoc = glGetUniformLocation(self.shader, "vMatrix")
-        self.pMatrixLoc = glGetUniformLocation(self.shader, "pMatrix")
-        self.colorLoc = glGetUniformLocation(self.shader, "color")
-
-        self.thicknessLoc = glGetUniformLocation(self.shader, "u_thickness")
-        self.viewportLoc = glGetUniformLocation(self.shader, "u_viewport_size")
-
-        # send the modelspace data to the GPU
-        self.vbo = glGenBuffers(1)
-        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
-
-        position = glGetAttribLocation(self.shader, "position")
-        glEnableVertexAttribArray(position)
-
-        glVertexAttribPointer(
-            position, floatsPerVertex, GL_FLOAT, False, 0, ctypes.c_void_p(0)
-        )
-
-        glBufferData(
-            GL_ARRAY_BUFFER,
-            glfloat_size * np.size(vertices),
-            vertices,
-            GL_STATIC_DRAW,
+        self.shader = programs.get_program(
+            os.path.join(pwd, "axis.vert"),
+            lines.vertex_shader_path,
+            os.path.join(pwd, "axis.frag"),
         )
 
-        # send the modelspace data to the GPU
-        # TODO, send color to the shader
-
-        # reset VAO/VBO to default
-        glBindVertexArray(0)
-        glBindBuffer(GL_ARRAY_BUFFER, 0)
-
-    # destructor
-    def __del__(self):
-        glDeleteVertexArrays(1, [self.vao])
-        glDeleteBuffers(1, [self.vbo])
-        glDeleteProgram(self.shader)
+        # the arrows share the modelspace data on the GPU, and are
+        # drawn together, by one instanced draw call
+        self.arrows = lines.InstancedThickLines(vertices, self.shader)
 
     def render(self, time: float, grayed_out: bool = False) -> None:
-        glUseProgram(self.shader)
-        glBindVertexArray(self.vao)
-
-        # pass projection parameters to the shader
-        fov_loc = glGetUniformLocation(self.shader, "fov")
-        glUniform1f(fov_loc, 45.0)
-        aspect_loc = glGetUniformLocation(self.shader, "aspectRatio")
-        glUniform1f(aspect_loc, 1.0)
-        nearZ_loc = glGetUniformLocation(self.shader, "nearZ")
-        glUniform1f(nearZ_loc, -5.0)
-        farZ_loc = glGetUniformLocation(self.shader, "farZ")
-        glUniform1f(farZ_loc, -150.00)
-        # TODO, set the color
+        glstate.use_program(self.shader)
 
         with ms.push_matrix(ms.MatrixStack.model):
             # x axis
@@ -585,42 +297,11 @@ class Axis:
 
                 if enlarged_axis:
                     ms.scale(ms.MatrixStack.model, 10.0, 10.0, 10.0)
-                glUniform3f(self.colorLoc, 1.0, 0.0, 0.0)
+                color = (1.0, 0.0, 0.0)
                 if grayed_out:
-                    glUniform3f(self.colorLoc, 0.5, 0.5, 0.5)
-
-                # ascontiguousarray puts the array in column major order
-                glUniformMatrix4fv(
-                    self.mMatrixLoc,
-                    1,
-                    GL_TRUE,
-                    np.ascontiguousarray(
-                        ms.get_current_matrix(ms.MatrixStack.model),
-                        dtype=np.float32,
-                    ),
-                )
-                glUniformMatrix4fv(
-                    self.vMatrixLoc,
-                    1,
-                    GL_TRUE,
-                    np.ascontiguousarray(
-                        ms.get_current_matrix(ms.MatrixStack.view),
-                        dtype=np.float32,
-                    ),
-                )
-                glUniformMatrix4fv(
-                    self.pMatrixLoc,
-                    1,
-                    GL_TRUE,
-                    np.ascontiguousarray(
-                        ms.get_current_matrix(ms.MatrixStack.projection),
-                        dtype=np.float32,
-                    ),
-                )
-                glUniform1f(self.thicknessLoc, line_thickness)
-                glUniform2f(self.viewportLoc, width, height)
+                    color = (0.5, 0.5, 0.5)
 
-                glDrawArrays(GL_LINES, 0, self.numberOfVertices)
+                self.arrows.add(ms.get_current_matrix(ms.MatrixStack.model), color)
 
             # z
             # glColor3f(0.0,0.0,1.0) # blue z
@@ -630,80 +311,23 @@ class Axis:
 
                 if enlarged_axis:
                     ms.scale(ms.MatrixStack.model, 10.0, 10.0, 10.0)
-                glUniform3f(self.colorLoc, 0.0, 0.0, 1.0)
+                color = (0.0, 0.0, 1.0)
                 if grayed_out:
-                    glUniform3f(self.colorLoc, 0.5, 0.5, 0.5)
-                # ascontiguousarray puts the array in column major order
-                glUniformMatrix4fv(
-                    self.mMatrixLoc,
-                    1,
-                    GL_TRUE,
-                    np.ascontiguousarray(
-                        ms.get_current_matrix(ms.MatrixStack.model),
-                        dtype=np.float32,
-                    ),
-                )
-                glUniformMatrix4fv(
-                    self.vMatrixLoc,
-                    1,
-                    GL_TRUE,
-                    np.ascontiguousarray(
-                        ms.get_current_matrix(ms.MatrixStack.view),
-                        dtype=np.float32,
-                    ),
-                )
-                glUniformMatrix4fv(
-                    self.pMatrixLoc,
-                    1,
-                    GL_TRUE,
-                    np.ascontiguousarray(
-                        ms.get_current_matrix(ms.MatrixStack.projection),
-                        dtype=np.float32,
-                    ),
-                )
-
-                glUniform1f(self.thicknessLoc, line_thickness)
-                glUniform2f(self.viewportLoc, width, height)
-                glDrawArrays(GL_LINES, 0, self.numberOfVertices)
+                    color = (0.5, 0.5, 0.5)
+                self.arrows.add(ms.get_current_matrix(ms.MatrixStack.model), color)
 
             # y
             if enlarged_axis:
                 ms.scale(ms.MatrixStack.model, 10.0, 10.0, 10.0)
-            glUniform3f(self.colorLoc, 0.0, 1.0, 0.0)
+            color = (0.0, 1.0, 0.0)
             # glColor3f(0.0,1.0,0.0) # green y
             if grayed_out:
-                glUniform3f(self.colorLoc, 0.5, 0.5, 0.5)
-            # ascontiguousarray puts the array in column major order
-            glUniformMatrix4fv(
-                self.mMatrixLoc,
-                1,
-                GL_TRUE,
-                np.ascontiguousarray(
-                    ms.get_current_matrix(ms.MatrixStack.model),
-                    dtype=np.float32,
-                ),
-            )
-            glUniformMatrix4fv(
-                self.vMatrixLoc,
-                1,
-                GL_TRUE,
-                np.ascontiguousarray(
-                    ms.get_current_matrix(ms.MatrixStack.view), dtype=np.float32
-                ),
-            )
-            glUniformMatrix4fv(
-                self.pMatrixLoc,
-                1,
-                GL_TRUE,
-                np.ascontiguousarray(
-                    ms.get_current_matrix(ms.MatrixStack.projection),
-                    dtype=np.float32,
-                ),
-            )
-            glUniform1f(self.thicknessLoc, line_thickness)
-            glUniform2f(self.viewportLoc, width, height)
-            glDrawArrays(GL_LINES, 0, self.numberOfVertices)
-            glBindVertexArray(0)
+                color = (0.5, 0.5, 0.5)
+            self.arrows.add(ms.get_current_matrix(ms.MatrixStack.model), color)
+
+        self.shader.set_float("u_thickness", line_thickness)
+        self.shader.set_vec2("u_viewport_size", width, height)
+        self.arrows.draw()
 
 
 axis = Axis()
@@ -715,141 +339,33 @@ class NDCCube:
         pass
 
     def vertices(self) -> ndarray:
-        # glColor3f(0.1,0.1,0.1)
-        verts = []
-        verts.extend([-1.0, -1.0, -1.0])
-        verts.extend([1.0, -1.0, -1.0])
-        verts.extend([1.0, -1.0, -1.0])
-        verts.extend([1.0, 1.0, -1.0])
-        verts.extend([1.0, 1.0, -1.0])
-        verts.extend([-1.0, 1.0, -1.0])
-        verts.extend([-1.0, 1.0, -1.0])
-        verts.extend([-1.0, -1.0, -1.0])
-        verts.extend([-1.0, -1.0, 1.0])
-        verts.extend([1.0, -1.0, 1.0])
-        verts.extend([1.0, -1.0, 1.0])
-        verts.extend([1.0, 1.0, 1.0])
-        verts.extend([1.0, 1.0, 1.0])
-        verts.extend([-1.0, 1.0, 1.0])
-        verts.extend([-1.0, 1.0, 1.0])
-        verts.extend([-1.0, -1.0, 1.0])
-
-        # connect the squares
-        verts.extend([1.0, 1.0, -1.0])
-        verts.extend([1.0, 1.0, 1.0])
-        verts.extend([1.0, -1.0, -1.0])
-        verts.extend([1.0, -1.0, 1.0])
-        verts.extend([-1.0, 1.0, -1.0])
-        verts.extend([-1.0, 1.0, 1.0])
-        verts.extend([-1.0, -1.0, -1.0])
-        verts.extend([-1.0, -1.0, 1.0])
-
-        return np.array(verts, dtype=np.float32)
+        return geometry.ndc_cube_edges()
 
     def prepare_to_render(self) -> None:
-        # GL_QUADS aren't available anymore, only triangles
-        # need 6 vertices instead of 4
-        vertices = self.vertices()
-        self.numberOfVertices = np.size(vertices) // floatsPerVertex
-
-        self.vao = glGenVertexArrays(1)
-        glBindVertexArray(self.vao)
-
         # initialize shaders
-
-        with open(os.path.join(pwd, "cube.vert"), "r") as f:
-            vs = shaders.compileShader(f.read(), GL_VERTEX_SHADER)
-
-        with open(os.path.join(pwd, "cube.frag"), "r") as f:
-            fs = shaders.compileShader(f.read(), GL_FRAGMENT_SHADER)
-
-        with open(os.path.join(pwd, "cube.geom"), "r") as f:
-            gs = shaders.compileShader(f.read(), GL_GEOMETRY_SHADER)
-
-        self.shader = shaders.compileProgram(vs, gs, fs)
-
-        self.mMatrixLoc = glGetUniformLocation(self.shader, "mMatrix")
-        self.vMatrixLoc = glGetUniformLocation(self.shader, "vMatrix")
-        self.pMatrixLoc = glGetUniformLocation(self.shader, "pMatrix")
-
-        self.thicknessLoc = glGetUniformLocation(self.shader, "u_thickness")
-        self.viewportLoc = glGetUniformLocation(self.shader, "u_viewport_size")
-
-        # send the modelspace data to the GPU
-        self.vbo = glGenBuffers(1)
-        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
-
-        position = glGetAttribLocation(self.shader, "position")
-        glEnableVertexAttribArray(position)
-
-        glVertexAttribPointer(
-            position, floatsPerVertex, GL_FLOAT, False, 0, ctypes.c_void_p(0)
+        self.shader = programs.get_program(
+            os.path.join(pwd, "cube.vert"),
+            lines.vertex_shader_path,
+            os.path.join(pwd, "cube.frag"),
         )
 
-        glBufferData(
-            GL_ARRAY_BUFFER,
-            glfloat_size * np.size(vertices),
-            vertices,
-            GL_STATIC_DRAW,
-        )
-
-        # send the modelspace data to the GPU
-        # TODO, send color to the shader
-
-        # reset VAO/VBO to default
-        glBindVertexArray(0)
-        glBindBuffer(GL_ARRAY_BUFFER, 0)
-
-    # destructor
-    def __del__(self):
-        glDeleteVertexArrays(1, [self.vao])
-        glDeleteBuffers(1, [self.vbo])
-        glDeleteProgram(self.shader)
+        # send the modelspace data to the GPU, once, shared with the
+        # frustum, which draws the same edges.  Each line is drawn as
+        # a quad
+        self.lines = lines.ThickLines(self.vertices(), self.shader)
 
     def render(self, time: float) -> None:
-        glUseProgram(self.shader)
-        glBindVertexArray(self.vao)
-
-        # pass projection parameters to the shader
-        fov_loc = glGetUniformLocation(self.shader, "fov")
-        glUniform1f(fov_loc, 45.0)
-        aspect_loc = glGetUniformLocation(self.shader, "aspectRatio")
-        glUniform1f(aspect_loc, 1.0)
-        nearZ_loc = glGetUniformLocation(self.shader, "nearZ")
-        glUniform1f(nearZ_loc, -5.0)
-        farZ_loc = glGetUniformLocation(self.shader, "farZ")
-        glUniform1f(farZ_loc, -150.00)
-
-        # ascontiguousarray puts the array in column major order
-        glUniformMatrix4fv(
-            self.mMatrixLoc,
-            1,
-            GL_TRUE,
-            np.ascontiguousarray(
-                ms.get_current_matrix(ms.MatrixStack.model), dtype=np.float32
+        self.lines.submit(
+            render_queue,
+            uniforms={
+                "mMatrix": ms.get_current_matrix(ms.MatrixStack.model),
+                "u_thickness": line_thickness,
+                "u_viewport_size": (width, height),
+            },
+            depth=renderqueue.view_depth(
+                ms.get_current_matrix(ms.MatrixStack.modelview)
             ),
         )
-        glUniformMatrix4fv(
-            self.vMatrixLoc,
-            1,
-            GL_TRUE,
-            np.ascontiguousarray(
-                ms.get_current_matrix(ms.MatrixStack.view), dtype=np.float32
-            ),
-        )
-        glUniformMatrix4fv(
-            self.pMatrixLoc,
-            1,
-            GL_TRUE,
-            np.ascontiguousarray(
-                ms.get_current_matrix(ms.MatrixStack.projection),
-                dtype=np.float32,
-            ),
-        )
-        glUniform1f(self.thicknessLoc, line_thickness)
-        glUniform2f(self.viewportLoc, width, height)
-        glDrawArrays(GL_LINES, 0, self.numberOfVertices)
-        glBindVertexArray(0)
 
 
 cube = NDCCube()
@@ -866,174 +382,31 @@ class Frustum:
         self.far_z = far_z
 
         # initialize shaders
-        self.vao = glGenVertexArrays(1)
-        glBindVertexArray(self.vao)
-
-        with open(os.path.join(pwd, "frustum.vert"), "r") as f:
-            vs = shaders.compileShader(f.read(), GL_VERTEX_SHADER)
-
-        with open(os.path.join(pwd, "frustum.frag"), "r") as f:
-            fs = shaders.compileShader(f.read(), GL_FRAGMENT_SHADER)
-
-        with open(os.path.join(pwd, "frustum.geom"), "r") as f:
-            gs = shaders.compileShader(f.read(), GL_GEOMETRY_SHADER)
-
-        self.shader = shaders.compileProgram(vs, gs, fs)
-
-        self.mMatrixLoc = glGetUniformLocation(self.shader, "mMatrix")
-        self.vMatrixLoc = glGetUniformLocation(self.shader, "vMatrix")
-        self.pMatrixLoc = glGetUniformLocation(self.shader, "pMatrix")
-
-        self.thicknessLoc = glGetUniformLocation(self.shader, "u_thickness")
-        self.viewportLoc = glGetUniformLocation(self.shader, "u_viewport_size")
-
-    def prepare_to_render(self) -> None:
-        def create_vertices_of_frustum() -> np.array:
-            vertices = []
-
-            # front face
-            front_top: float = -self.near_z * math.tan(math.radians(self.fov) / 2.0)
-            front_right: float = front_top * self.aspect_ratio
-
-            front_left = -front_right
-            front_bottom = -front_top
-
-            vertices.extend([front_left, front_top, self.near_z])
-            vertices.extend([front_right, front_top, self.near_z])
-
-            vertices.extend([front_right, front_top, self.near_z])
-            vertices.extend([front_right, front_bottom, self.near_z])
-
-            vertices.extend([front_right, front_bottom, self.near_z])
-            vertices.extend([front_left, front_bottom, self.near_z])
-
-            vertices.extend([front_left, front_bottom, self.near_z])
-            vertices.extend([front_left, front_top, self.near_z])
-
-            # back face
-            back_top: float = -self.far_z * math.tan(math.radians(self.fov) / 2.0)
-            back_right: float = back_top * self.aspect_ratio
-
-            back_left = -back_right
-            back_bottom = -back_top
-
-            vertices.extend([back_left, back_top, self.far_z])
-            vertices.extend([back_right, back_top, self.far_z])
-
-            vertices.extend([back_right, back_top, self.far_z])
-            vertices.extend([back_right, back_bottom, self.far_z])
-
-            vertices.extend([back_right, back_bottom, self.far_z])
-            vertices.extend([back_left, back_bottom, self.far_z])
-
-            vertices.extend([back_left, back_bottom, self.far_z])
-            vertices.extend([back_left, back_top, self.far_z])
-
-            # connect the faces
-            vertices.extend([front_left, front_top, self.near_z])
-            vertices.extend([back_left, back_top, self.far_z])
-
-            vertices.extend([front_right, front_top, self.near_z])
-            vertices.extend([back_right, back_top, self.far_z])
-
-            vertices.extend([front_left, front_bottom, self.near_z])
-            vertices.extend([back_left, back_bottom, self.far_z])
-
-            vertices.extend([front_right, front_bottom, self.near_z])
-            vertices.extend([back_right, back_bottom, self.far_z])
-
-            # turn vertices into numpy array
-            return np.array(vertices, dtype=np.float32)
-
-        vertices = create_vertices_of_frustum()
-
-        # GL_QUADS aren't available anymore, only triangles
-        # need 6 vertices instead of 4
-        self.numberOfVertices = np.size(vertices) // floatsPerVertex
-
-        if hasattr(self, "vbo"):
-            glDeleteBuffers(1, [self.vbo])
-        glBindVertexArray(self.vao)
-
-        # send the modelspace data to the GPU
-        self.vbo = glGenBuffers(1)
-        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
-
-        position = glGetAttribLocation(self.shader, "position")
-        glEnableVertexAttribArray(position)
-
-        glVertexAttribPointer(
-            position, floatsPerVertex, GL_FLOAT, False, 0, ctypes.c_void_p(0)
-        )
-
-        glBufferData(
-            GL_ARRAY_BUFFER,
-            glfloat_size * np.size(vertices),
-            vertices,
-            GL_STATIC_DRAW,
+        self.shader = programs.get_program(
+            os.path.join(pwd, "frustum.vert"),
+            lines.vertex_shader_path,
+            os.path.join(pwd, "frustum.frag"),
         )
 
-        # send the modelspace data to the GPU
-        # TODO, send color to the shader
-
-        # reset VAO/VBO to default
-        glBindVertexArray(0)
-        glBindBuffer(GL_ARRAY_BUFFER, 0)
-
-    # destructor
-    def __del__(self):
-        glDeleteVertexArrays(1, [self.vao])
-        glDeleteBuffers(1, [self.vbo])
-        glDeleteProgram(self.shader)
+    def prepare_to_render(self) -> None:
+        # the edges of the NDC cube, which frustum.vert moves to the
+        # corners of the frustum, from the fov, aspect_ratio, near_z and
+        # far_z sent with the FrameUniforms.  Moving the sliders only
+        # changes those uniforms, the buffer is never rebuilt
+        self.lines = lines.ThickLines(cube.vertices(), self.shader)
 
     def render(self, time: float) -> None:
-        glUseProgram(self.shader)
-        glBindVertexArray(self.vao)
-
-        # pass projection parameters to the shader
-        fov_loc = glGetUniformLocation(self.shader, "fov")
-        glUniform1f(fov_loc, self.fov)
-        aspect_loc = glGetUniformLocation(self.shader, "aspectRatio")
-        glUniform1f(aspect_loc, self.aspect_ratio)
-        nearZ_loc = glGetUniformLocation(self.shader, "nearZ")
-        glUniform1f(nearZ_loc, self.near_z)
-        farZ_loc = glGetUniformLocation(self.shader, "farZ")
-        glUniform1f(farZ_loc, self.far_z)
-        time_loc = glGetUniformLocation(self.shader, "time")
-        glUniform1f(time_loc, animation_time)
-
-        # ascontiguousarray puts the array in column major order
-        glUniformMatrix4fv(
-            self.mMatrixLoc,
-            1,
-            GL_TRUE,
-            np.ascontiguousarray(
-                ms.get_current_matrix(ms.MatrixStack.model), dtype=np.float32
-            ),
-        )
-        glUniformMatrix4fv(
-            self.vMatrixLoc,
-            1,
-            GL_TRUE,
-            np.ascontiguousarray(
-                ms.get_current_matrix(ms.MatrixStack.view), dtype=np.float32
+        self.lines.submit(
+            render_queue,
+            uniforms={
+                "mMatrix": ms.get_current_matrix(ms.MatrixStack.model),
+                "u_thickness": line_thickness,
+                "u_viewport_size": (width, height),
+            },
+            depth=renderqueue.view_depth(
+                ms.get_current_matrix(ms.MatrixStack.modelview)
             ),
         )
-        glUniformMatrix4fv(
-            self.pMatrixLoc,
-            1,
-            GL_TRUE,
-            np.ascontiguousarray(
-                ms.get_current_matrix(ms.MatrixStack.projection),
-                dtype=np.float32,
-            ),
-        )
-
-        glUniform1f(self.thicknessLoc, line_thickness)
-        glUniform2f(self.viewportLoc, width, height)
-
-        glDrawArrays(GL_LINES, 0, self.numberOfVertices)
-        glBindVertexArray(0)
 
 
 frustum = Frustum(fov=45.0, aspect_ratio=16.0 / 9.0, near_z=-10.0, far_z=-500.0)
@@ -1054,53 +427,52 @@ square_rotation = math.radians(90.0)
 rotation_around_paddle1 = math.radians(30.0)
 
 
-def handle_inputs(previous_mouse_position) -> None:
+# what each key does, per second while it's held down
+actions = inputstate.ActionTable(
+    [
+        (glfw.KEY_E, "rotation_around_paddle1", 6.0),
+        (glfw.KEY_Q, "square_rotation", 6.0),
+        (glfw.KEY_RIGHT, "camera_rot_y", -math.radians(60.0)),
+        (glfw.KEY_LEFT, "camera_rot_y", math.radians(60.0)),
+        (glfw.KEY_UP, "camera_rot_x", -math.radians(60.0)),
+        (glfw.KEY_DOWN, "camera_rot_x", math.radians(60.0)),
+        (glfw.KEY_S, "paddle1_y", -600.0),
+        (glfw.KEY_W, "paddle1_y", 600.0),
+        (glfw.KEY_K, "paddle2_y", -600.0),
+        (glfw.KEY_I, "paddle2_y", 600.0),
+        (glfw.KEY_A, "paddle1_rotation", 6.0),
+        (glfw.KEY_D, "paddle1_rotation", -6.0),
+        (glfw.KEY_J, "paddle2_rotation", 6.0),
+        (glfw.KEY_L, "paddle2_rotation", -6.0),
+    ]
+)
+
+
+def handle_inputs(previous_mouse_position, dt: float) -> None:
+    amounts = actions.amounts(input_state.keys, dt)
+
     global rotation_around_paddle1
-    if glfw.get_key(window, glfw.KEY_E) == glfw.PRESS:
-        rotation_around_paddle1 += 0.1
+    rotation_around_paddle1 += amounts["rotation_around_paddle1"]
 
     global square_rotation
-    if glfw.get_key(window, glfw.KEY_Q) == glfw.PRESS:
-        square_rotation += 0.1
+    square_rotation += amounts["square_rotation"]
 
     global camera
 
-    move_multiple = 15.0
-    if glfw.get_key(window, glfw.KEY_RIGHT) == glfw.PRESS:
-        camera.rot_y -= math.radians(1.0) % 360.0
-    if glfw.get_key(window, glfw.KEY_LEFT) == glfw.PRESS:
-        camera.rot_y += math.radians(1.0) % 360.0
-    if glfw.get_key(window, glfw.KEY_UP) == glfw.PRESS:
-        camera.rot_x -= math.radians(1.0) % 360.0
-    if glfw.get_key(window, glfw.KEY_DOWN) == glfw.PRESS:
-        camera.rot_x += math.radians(1.0) % 360.0
+    camera.rot_y += amounts["camera_rot_y"]
+    camera.rot_x += amounts["camera_rot_x"]
 
     global paddle1, paddle2
 
-    if glfw.get_key(window, glfw.KEY_S) == glfw.PRESS:
-        paddle1.position[1] -= 10.0
-    if glfw.get_key(window, glfw.KEY_W) == glfw.PRESS:
-        paddle1.position[1] += 10.0
-    if glfw.get_key(window, glfw.KEY_K) == glfw.PRESS:
-        paddle2.position[1] -= 10.0
-    if glfw.get_key(window, glfw.KEY_I) == glfw.PRESS:
-        paddle2.position[1] += 10.0
-
-    global paddle_1_rotation, paddle_2_rotation
-
-    if glfw.get_key(window, glfw.KEY_A) == glfw.PRESS:
-        paddle1.rotation += 0.1
-    if glfw.get_key(window, glfw.KEY_D) == glfw.PRESS:
-        paddle1.rotation -= 0.1
-    if glfw.get_key(window, glfw.KEY_J) == glfw.PRESS:
-        paddle2.rotation += 0.1
-    if glfw.get_key(window, glfw.KEY_L) == glfw.PRESS:
-        paddle2.rotation -= 0.1
-
-    new_mouse_position = glfw.get_cursor_pos(window)
+    paddle1.position[1] += amounts["paddle1_y"]
+    paddle2.position[1] += amounts["paddle2_y"]
+    paddle1.rotation += amounts["paddle1_rotation"]
+    paddle2.rotation += amounts["paddle2_rotation"]
+
+    new_mouse_position = tuple(input_state.cursor)
     return_none = False
-    if glfw.PRESS == glfw.get_mouse_button(window, glfw.MOUSE_BUTTON_LEFT):
-        if not imguiio.want_capture_mouse:
+    if input_state.mouse_buttons[glfw.MOUSE_BUTTON_LEFT]:
+        if not input_state.ui_wants_mouse:
             if previous_mouse_position:
                 camera.rot_y -= 0.2 * math.radians(
                     new_mouse_position[0] - previous_mouse_position[0]
@@ -1126,8 +498,8 @@ virtual_camera_relative_offset = np.array([-0.0, 0.0, 0.0], dtype=np.float32)
 
 TARGET_FRAMERATE = 60  # fps
 
-# to try to standardize on 60 fps, compare times between frames
-time_at_beginning_of_previous_frame = glfw.get_time()
+# sleeps until shortly before each frame is due, instead of spinning
+frame_scheduler = framescheduler.FrameScheduler(TARGET_FRAMERATE)
 
 animation_time = 0.0
 animation_time_multiplier = 1.0
@@ -1156,22 +528,84 @@ def highlighted_button(text: str, start_time: int, time: float) -> bool:
 # local variable for event loop
 previous_mouse_position = None
 
+# the block of uniforms which every vertex shader shares
+frame_uniforms = uniformblocks.FrameUniforms()
+
+# the input and the animation advance in steps of 1/60th of a second,
+# however many frames are drawn, and what changes is drawn in between
+# its values at the last two steps
+simulation = fixedtimestep.FixedTimestep(TARGET_FRAMERATE)
+this_module = sys.modules[__name__]
+interpolation = fixedtimestep.Interpolation(
+    (this_module, "animation_time"),
+    (this_module, "square_rotation"),
+    (this_module, "rotation_around_paddle1"),
+    (paddle1, "position"),
+    (paddle1, "rotation"),
+    (paddle2, "position"),
+    (paddle2, "rotation"),
+    (camera, "rot_x"),
+    (camera, "rot_y"),
+)
+
+# which keys are down, and where the mouse is, kept up to date by the
+# window's callbacks, instead of asking GLFW for each key every frame
+input_state = inputstate.InputState(window)
+
+# records the input, to replay the same session later, such as to
+# compare the frame times, when MODELVIEWPROJECTION_RECORD_INPUT is
+# set, or replays MODELVIEWPROJECTION_REPLAY_INPUT
+input_log = inputlog.InputLog(
+    input_state,
+    simulation,
+    (this_module, "animation_time"),
+    (this_module, "animation_paused"),
+    (this_module, "animation_time_multiplier"),
+    (camera, "r"),
+    (this_module, "enlarged_axis"),
+    (this_module, "show_ground_axis"),
+    (this_module, "virtual_camera_position"),
+    (this_module, "virtual_camera_rot_x"),
+    (this_module, "virtual_camera_rot_y"),
+    (frustum, "fov"),
+    (frustum, "aspect_ratio"),
+    (frustum, "near_z"),
+    (frustum, "far_z"),
+)
+
+# draws a frame only after input, or while something moves.  Created
+# after imgui's and the other callbacks, which it calls as well.  A
+# replay draws every frame
+render_on_demand = renderondemand.RenderOnDemand(
+    window, enabled=renderondemand.default_enabled and not input_log.replaying
+)
+
 # Loop until the user closes the window
 while not glfw.window_should_close(window):
-    # poll the time to try to get a constant framerate
-    while (
-        glfw.get_time() < time_at_beginning_of_previous_frame + 1.0 / TARGET_FRAMERATE
-    ):
-        pass
-    # set for comparison on the next frame
-    time_at_beginning_of_previous_frame = glfw.get_time()
+    frame_scheduler.wait_for_next_frame()
+
+    # Poll for and process events, and if nothing could have changed,
+    # wait for more instead of drawing the same frame again, without
+    # simulating the time spent waiting
+    simulation.skip(render_on_demand.wait_for_events())
+    impl.process_inputs()
+    input_state.ui_wants_mouse = imguiio.want_capture_mouse
 
+    for _ in range(input_log.advance()):
+        interpolation.begin_step()
+        previous_mouse_position = handle_inputs(previous_mouse_position, simulation.dt)
+        if not animation_paused:
+            animation_time += simulation.dt * animation_time_multiplier
+
+    # what a widget sets after this is drawn without blending
+    interpolation.end_steps()
+
+    # keep drawing while the animation runs
     if not animation_paused:
-        animation_time += 1.0 / 60.0 * animation_time_multiplier
+        render_on_demand.request_frame()
 
-    # Poll for and process events
-    glfw.poll_events()
-    impl.process_inputs()
+    glstate.begin_frame()
+    render_queue.begin_frame()
 
     imgui.new_frame()
 
@@ -1383,25 +817,16 @@ while not glfw.window_should_close(window):
         frustum.fov,
     ) = imgui.slider_float("Camera FOV", frustum.fov, 5.0, 60.0)
 
-    if clicked_virtual_camera_fov:
-        frustum.prepare_to_render()
-
     (
         clicked_virtual_camera_aspect_ratio,
         frustum.aspect_ratio,
     ) = imgui.slider_float("Camera AspectRatio", frustum.aspect_ratio, 0.1, 3.0)
 
-    if clicked_virtual_camera_aspect_ratio:
-        frustum.prepare_to_render()
-
     (
         clicked_virtual_camera_near_z,
         frustum.near_z,
     ) = imgui.slider_float("Camera near_z", frustum.near_z, -200.0, -1.0)
 
-    if clicked_virtual_camera_near_z:
-        frustum.prepare_to_render()
-
     (
         clicked_virtual_camera_far_z,
         frustum.far_z,
@@ -1409,9 +834,6 @@ while not glfw.window_should_close(window):
         "Camera far_z", frustum.far_z, frustum.near_z, frustum.near_z - 500.0
     )
 
-    if clicked_virtual_camera_far_z:
-        frustum.prepare_to_render()
-
     imgui.end()
 
     imgui.set_next_window_size(300, 175, imgui.FIRST_USE_EVER)
@@ -1429,12 +851,14 @@ while not glfw.window_should_close(window):
 
     imgui.end()
 
+    input_log.end_widgets()
+
     width, height = glfw.get_framebuffer_size(window)
-    glViewport(0, 0, width, height)
+    glstate.viewport(0, 0, width, height)
     glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
 
     # render scene
-    previous_mouse_position = handle_inputs(previous_mouse_position)
+    interpolation.apply(simulation.alpha)
 
     ms.set_to_identity_matrix(ms.MatrixStack.model)
     ms.set_to_identity_matrix(ms.MatrixStack.view)
@@ -1453,6 +877,18 @@ while not glfw.window_should_close(window):
     ms.rotate_x(ms.MatrixStack.view, camera.rot_x)
     ms.rotate_y(ms.MatrixStack.view, -camera.rot_y)
 
+    # the view, the projection, and the virtual camera don't change
+    # while drawing the frame, so send them to the GPU only once
+    frame_uniforms.upload(
+        view=ms.get_current_matrix(ms.MatrixStack.view),
+        projection=ms.get_current_matrix(ms.MatrixStack.projection),
+        fov=frustum.fov,
+        aspect_ratio=frustum.aspect_ratio,
+        near_z=frustum.near_z,
+        far_z=frustum.far_z,
+        time=animation_time,
+    )
+
     # draw NDC in global space, so that we can see the camera space
     # go to NDC
     with ms.PushMatrix(ms.MatrixStack.model):
@@ -1530,7 +966,6 @@ while not glfw.window_should_close(window):
         if animation_time > 0.0 and animation_time < 15.0:
             axis.render(animation_time)
         if animation_time > 15.0:
-            # ascontiguousarray puts the array in column major order
             paddle1.render(animation_time)
 
         # # draw the square
@@ -1589,12 +1024,17 @@ while not glfw.window_should_close(window):
         if animation_time > 45.0:
             paddle2.render(animation_time)
 
+    render_queue.flush()
+    batch.flush()
+
     imgui.render()
     impl.render(imgui.get_draw_data())
 
     # done with frame, flush and swap buffers
     # Swap front and back buffers
     glfw.swap_buffers(window)
+    interpolation.restore()
 
 
+input_log.close()
 glfw.terminate()
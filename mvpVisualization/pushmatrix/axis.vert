@@ -21,11 +21,19 @@
 #version 330 core
 
 layout (location = 0) in vec3 position;
+// one per instance, an instance being one of the arrows
+in mat4 mMatrix;
+in vec3 color;
 
-uniform mat4 mMatrix;
-uniform mat4 vMatrix;
-uniform mat4 pMatrix;
-uniform vec3 color;
+layout (std140) uniform FrameUniforms {
+  mat4 vMatrix;
+  mat4 pMatrix;
+  float fov;
+  float aspectRatio;
+  float nearZ;
+  float farZ;
+  float time;
+};
 
 out VS_OUT {
   vec4 color;
@@ -18,6 +18,7 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import os
 import sys
 from OpenGL.GL import (
     glMatrixMode,
@@ -29,16 +30,17 @@ from OpenGL.GL import (
     GL_DEPTH_BUFFER_BIT,
     glViewport,
     glClearColor,
-    glColor3f,
-    glBegin,
     GL_QUADS,
-    glVertex2f,
-    glEnd,
     glEnable,
     GL_SCISSOR_TEST,
     glScissor,
     glDisable,
 )
+
+# glBegin, glVertex, glColor and glEnd are accumulated in Python, and
+# drawn with one call per glEnd, by the module in src/glutils
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from glutils.immediate import glBegin, glColor3f, glEnd, glVertex2f
 import glfw
 
 if not glfw.init():
@@ -19,6 +19,7 @@
 # SOFTWARE.
 
 
+import os
 import sys
 from OpenGL.GL import (
     glMatrixMode,
@@ -30,16 +31,18 @@ from OpenGL.GL import (
     GL_DEPTH_BUFFER_BIT,
     glViewport,
     glClearColor,
-    glColor3f,
-    glBegin,
     GL_QUADS,
-    glVertex2f,
-    glEnd,
     glEnable,
     GL_SCISSOR_TEST,
     glScissor,
     glDisable,
 )
+
+# glBegin, glVertex, glColor and glEnd are accumulated in Python, and
+# drawn with one call per glEnd, by the module in src/glutils
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from glutils.immediate import glBegin, glColor3f, glEnd, glVertex2f
+from glutils.framescheduler import FrameScheduler
 import glfw
 
 from dataclasses import dataclass
@@ -165,17 +168,13 @@ def handle_movement_of_paddles() -> None:
 # doc-region-begin 2ef80e67f318610c9d846513e604bdff5d037285
 TARGET_FRAMERATE: int = 60
 
-time_at_beginning_of_previous_frame: float = glfw.get_time()
+# sleeps until shortly before each frame is due, instead of spinning
+frame_scheduler: FrameScheduler = FrameScheduler(TARGET_FRAMERATE)
 # doc-region-end 2ef80e67f318610c9d846513e604bdff5d037285
 
 # doc-region-begin 89e003b98e8ebecccb7ad30f6cd29e35a1a6e0f2
 while not glfw.window_should_close(window):
-    while (
-        glfw.get_time() < time_at_beginning_of_previous_frame + 1.0 / TARGET_FRAMERATE
-    ):
-        pass
-
-    time_at_beginning_of_previous_frame = glfw.get_time()
+    frame_scheduler.wait_for_next_frame()
     # doc-region-end 89e003b98e8ebecccb7ad30f6cd29e35a1a6e0f2
 
     # doc-region-begin c414af3df41f977118e25fb4e96de3194469a04a
@@ -20,6 +20,7 @@
 
 
 from __future__ import annotations  # to appease Python 3.7-3.9
+import os
 import sys
 from OpenGL.GL import (
     glMatrixMode,
@@ -31,16 +32,18 @@ from OpenGL.GL import (
     GL_DEPTH_BUFFER_BIT,
     glViewport,
     glClearColor,
-    glColor3f,
-    glBegin,
     GL_QUADS,
-    glVertex2f,
-    glEnd,
     glEnable,
     GL_SCISSOR_TEST,
     glScissor,
     glDisable,
 )
+
+# glBegin, glVertex, glColor and glEnd are accumulated in Python, and
+# drawn with one call per glEnd, by the module in src/glutils
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from glutils.immediate import glBegin, glColor3f, glEnd, glVertex2f
+from glutils.framescheduler import FrameScheduler
 import glfw
 
 from dataclasses import dataclass
@@ -173,16 +176,12 @@ def handle_movement_of_paddles() -> None:
 
 TARGET_FRAMERATE: int = 60
 
-time_at_beginning_of_previous_frame: float = glfw.get_time()
+# sleeps until shortly before each frame is due, instead of spinning
+frame_scheduler: FrameScheduler = FrameScheduler(TARGET_FRAMERATE)
 
 # doc-region-begin 1cacf5f226065bc4b85826f7642bf817a36b6540
 while not glfw.window_should_close(window):
-    while (
-        glfw.get_time() < time_at_beginning_of_previous_frame + 1.0 / TARGET_FRAMERATE
-    ):
-        pass
-
-    time_at_beginning_of_previous_frame = glfw.get_time()
+    frame_scheduler.wait_for_next_frame()
 
     glfw.poll_events()
 
@@ -64,6 +64,10 @@ from OpenGL.GLU import gluPerspective
 import OpenGL.GL.shaders as shaders
 import glfw
 
+# paces the event loop, by the module in src/glutils
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from glutils.framescheduler import FrameScheduler
+
 
 from dataclasses import dataclass, field
 
@@ -226,7 +230,8 @@ square_vertices: np.array = np.array(
 
 TARGET_FRAMERATE: int = 60
 
-time_at_beginning_of_previous_frame: float = glfw.get_time()
+# sleeps until shortly before each frame is due, instead of spinning
+frame_scheduler: FrameScheduler = FrameScheduler(TARGET_FRAMERATE)
 
 
 # doc-region-begin e6ff3c0ccea639bd5fb57a55ec548170b34c4bdf
@@ -246,11 +251,7 @@ glUseProgram(shader)
 # doc-region-end e6ff3c0ccea639bd5fb57a55ec548170b34c4bdf
 
 while not glfw.window_should_close(window):
-    while (
-        glfw.get_time() < time_at_beginning_of_previous_frame + 1.0 / TARGET_FRAMERATE
-    ):
-        pass
-    time_at_beginning_of_previous_frame = glfw.get_time()
+    frame_scheduler.wait_for_next_frame()
 
     glfw.poll_events()
 
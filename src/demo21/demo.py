@@ -27,10 +27,8 @@ from OpenGL.GL import (
     glClear,
     GL_COLOR_BUFFER_BIT,
     GL_DEPTH_BUFFER_BIT,
-    glViewport,
     glClearColor,
     glEnable,
-    glDisable,
     glClearDepth,
     glDepthFunc,
     GL_DEPTH_TEST,
@@ -41,11 +39,7 @@ from OpenGL.GL import (
     GL_SRC_ALPHA,
     GL_ONE_MINUS_SRC_ALPHA,
     glGenVertexArrays,
-    glBindVertexArray,
-    GL_VERTEX_SHADER,
-    GL_FRAGMENT_SHADER,
     glGenBuffers,
-    glBindBuffer,
     GL_ARRAY_BUFFER,
     glGetAttribLocation,
     glEnableVertexAttribArray,
@@ -53,15 +47,11 @@ from OpenGL.GL import (
     GL_FLOAT,
     glBufferData,
     GL_STATIC_DRAW,
-    glUseProgram,
-    glGetUniformLocation,
-    glUniformMatrix4fv,
-    glDrawArrays,
     GL_LINES,
+    GL_TRIANGLE_STRIP,
     GL_TRIANGLES,
     glDeleteVertexArrays,
     glDeleteBuffers,
-    glDeleteProgram,
 )
 
 from dataclasses import dataclass, field
@@ -69,9 +59,7 @@ from dataclasses import dataclass, field
 import ctypes
 
 # new - SHADERS
-import OpenGL.GL.shaders as shaders
 import glfw
-import pyMatrixStack as ms
 
 import imgui
 from imgui.integrations.glfw import GlfwRenderer
@@ -83,10 +71,26 @@ if not glfw.init():
 # NEW - for shader location
 pwd = os.path.dirname(os.path.abspath(__file__))
 
+# the modules shared between the demos are in src/glutils
+sys.path.append(os.path.join(pwd, ".."))
+import glutils.culling as culling
+import glutils.fastgl as fastgl
+import glutils.fixedtimestep as fixedtimestep
+import glutils.framescheduler as framescheduler
+import glutils.geometry as geometry
+import glutils.glstate as glstate
+import glutils.inputlog as inputlog
+import glutils.inputstate as inputstate
+import glutils.matrixstack as ms
+import glutils.meshes as meshes
+import glutils.programs as programs
+import glutils.renderondemand as renderondemand
+import glutils.scenegraph as scenegraph
+import glutils.transparency as transparency
+
 # NEW - for shaders
 glfloat_size = 4
 floatsPerVertex = 3
-floatsPerColor = 4
 
 
 glfw.window_hint(glfw.CONTEXT_VERSION_MAJOR, 3)
@@ -108,6 +112,8 @@ if not window:
 
 # Make the window's context current
 glfw.make_context_current(window)
+# call the per draw OpenGL functions without PyOpenGL's wrappers
+fastgl.load(glfw.get_proc_address)
 
 
 impl = GlfwRenderer(window)
@@ -156,101 +162,47 @@ class Paddle:
         )
     )
 
-    vao: int = 0
-    vbo: int = 0
-    shader: int = 0
+    instances: meshes.InstancedMesh = None
+    # in the scene graph
+    node: int = -1
 
     def prepare_to_render(self):
         # GL_QUADS aren't available anymore, only triangles
         # need 6 vertices instead of 4
-        vertices = self.vertices
-        self.numberOfVertices = np.size(vertices) // floatsPerVertex
-        # fmt: off
-        color = np.array(
-            [
-                self.r, self.g, self.b, 0.75,
-                self.r, self.g, self.b, 0.75,
-                self.r, self.g, self.b, 0.75,
-                self.r, self.g, self.b, 0.75,
-                self.r, self.g, self.b, 0.75,
-                self.r, self.g, self.b, 0.75,
-            ],
-            dtype=np.float32,
-        )
-        # fmt: on
-
-        self.numberOfColors = np.size(color) // floatsPerColor
-
-        self.vao = glGenVertexArrays(1)
-        glBindVertexArray(self.vao)
 
         # initialize shaders
-
-        with open(os.path.join(pwd, "triangle.vert"), "r") as f:
-            vs = shaders.compileShader(f.read(), GL_VERTEX_SHADER)
-
-        with open(os.path.join(pwd, "triangle.frag"), "r") as f:
-            fs = shaders.compileShader(f.read(), GL_FRAGMENT_SHADER)
-
-        self.shader = shaders.compileProgram(vs, fs)
-
-        # send the modelspace data to the GPU
-        self.vbo = glGenBuffers(1)
-        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
-
-        position = glGetAttribLocation(self.shader, "position")
-        glEnableVertexAttribArray(position)
-
-        glVertexAttribPointer(
-            position, floatsPerVertex, GL_FLOAT, False, 0, ctypes.c_void_p(0)
+        shader = programs.get_program(
+            os.path.join(pwd, "triangle.vert"),
+            os.path.join(pwd, "triangle.frag"),
         )
 
-        glBufferData(
-            GL_ARRAY_BUFFER, glfloat_size * np.size(vertices), vertices, GL_STATIC_DRAW
-        )
-
-        # send the modelspace data to the GPU
-        vboColor = glGenBuffers(1)
-        glBindBuffer(GL_ARRAY_BUFFER, vboColor)
-
-        colorAttribLoc = glGetAttribLocation(self.shader, "color_in")
-        glEnableVertexAttribArray(colorAttribLoc)
-        glVertexAttribPointer(
-            colorAttribLoc, floatsPerColor, GL_FLOAT, False, 0, ctypes.c_void_p(0)
+        # every object with the same vertices shares the modelspace data
+        # on the GPU, and is drawn by the same instanced draw call
+        self.instances = meshes.get_instanced_mesh(
+            self.vertices,
+            shader,
+            GL_TRIANGLES,
+            matrix_attribute="mvpMatrix",
+            color_attribute="color_in",
         )
 
-        glBufferData(
-            GL_ARRAY_BUFFER, glfloat_size * np.size(color), color, GL_STATIC_DRAW
+    def render(self, view_projection):
+        # translucent, so drawn back to front with the other translucent
+        # objects, once the scene has been submitted
+        transparent.add(
+            self.instances,
+            view_projection @ scene.world_matrix(self.node),
+            (self.r, self.g, self.b, 0.75),
         )
 
-        # reset VAO/VBO to default
-        glBindVertexArray(0)
-        glBindBuffer(GL_ARRAY_BUFFER, 0)
 
-    # destructor
-    def __del__(self):
-        glDeleteVertexArrays(1, [self.vao])
-        glDeleteBuffers(1, [self.vbo])
-        glDeleteProgram(self.shader)
-
-    def render(self):
-        glUseProgram(self.shader)
-        glBindVertexArray(self.vao)
-
-        mvpMatrixLoc = glGetUniformLocation(self.shader, "mvpMatrix")
-        # ascontiguousarray puts the array in column major order
-        glUniformMatrix4fv(
-            mvpMatrixLoc,
-            1,
-            GL_TRUE,
-            np.ascontiguousarray(
-                ms.get_current_matrix(ms.MatrixStack.modelviewprojection),
-                dtype=np.float32,
-            ),
-        )
-        glDrawArrays(GL_TRIANGLES, 0, self.numberOfVertices)
-        glBindVertexArray(0)
+# the paddles, the square and the camera, whose matrices are only
+# recomputed when they move
+scene = scenegraph.SceneGraph()
 
+# the paddles and the square are blended, and so are drawn after
+# everything else, from the farthest to the nearest
+transparent = transparency.TransparentPass()
 
 paddle1 = Paddle(r=0.578123, g=0.0, b=1.0, position=np.array([-90.0, 0.0, 0.0]))
 paddle1.prepare_to_render()
@@ -261,6 +213,9 @@ paddle2.prepare_to_render()
 @dataclass
 class Square(Paddle):
     rotation_around_paddle1: float = 0.0
+    # the node between paddle1's and the square's, which rotates around
+    # paddle1
+    node_around_paddle1: int = -1
     vertices: np.array = field(
         default_factory=lambda: np.array(
             [
@@ -280,6 +235,15 @@ square = Square(r=0.0, g=0.0, b=1.0, position=[0.0, 0.0, 0.0])
 
 square.prepare_to_render()
 
+paddle1.node = scene.add()
+# since the square is below paddle1 in the graph, its transformations
+# are relative to paddle1's space
+square.node_around_paddle1 = scene.add(
+    parent=paddle1.node, translation=(0.0, 0.0, -10.0)
+)
+square.node = scene.add(parent=square.node_around_paddle1, translation=(20.0, 0.0, 0.0))
+paddle2.node = scene.add()
+
 number_of_controllers = glfw.joystick_present(glfw.JOYSTICK_1)
 
 
@@ -293,54 +257,57 @@ class Camera:
 
 
 camera = Camera(x=0.0, y=0.0, z=400.0, rot_y=0.0, rot_x=0.0)
+camera_node = scene.add()
 
 
 class Ground:
     def __init__(self):
-        pass
+        # the grid is drawn by grid.frag, on one quad under the camera,
+        # instead of from thousands of vertices of lines, which are only
+        # sent to the GPU if procedural is turned off
+        self.procedural = True
+        self.vao = None
+        # how far apart the lines are, and how far from the camera the
+        # procedural grid fades out
+        self.spacing = 20.0
+        self.fade_distance = 1500.0
 
     def vertices(self):
-        # glColor3f(0.1,0.1,0.1)
-        verts = []
-        for x in range(-600, 601, 20):
-            for z in range(-600, 601, 20):
-                verts.append(float(-x))
-                verts.append(float(-50.0))
-                verts.append(float(z))
-                verts.append(float(x))
-                verts.append(float(-50.0))
-                verts.append(float(z))
-                verts.append(float(x))
-                verts.append(float(-50.0))
-                verts.append(float(-z))
-                verts.append(float(x))
-                verts.append(float(-50.0))
-                verts.append(float(z))
-
-        return np.array(verts, dtype=np.float32)
+        return geometry.ground_grid(extent=600, spacing=20)
+
+    def bounds(self):
+        # the corners of the grid of lines, for culling
+        return np.array(
+            [[-600.0, -50.0, -600.0], [600.0, -50.0, 600.0]], dtype=np.float32
+        )
 
     def prepare_to_render(self):
+        self.grid_shader = programs.get_program(
+            os.path.join(pwd, "grid.vert"),
+            os.path.join(pwd, "grid.frag"),
+        )
+        # the quad has no vertex data, but the core profile requires a
+        # VAO to be bound to draw
+        self.grid_vao = glGenVertexArrays(1)
+
+    def prepare_lines(self):
         # GL_QUADS aren't available anymore, only triangles
         # need 6 vertices instead of 4
         vertices = self.vertices()
         self.numberOfVertices = np.size(vertices) // floatsPerVertex
 
         self.vao = glGenVertexArrays(1)
-        glBindVertexArray(self.vao)
+        glstate.bind_vertex_array(self.vao)
 
         # initialize shaders
-
-        with open(os.path.join(pwd, "ground.vert"), "r") as f:
-            vs = shaders.compileShader(f.read(), GL_VERTEX_SHADER)
-
-        with open(os.path.join(pwd, "ground.frag"), "r") as f:
-            fs = shaders.compileShader(f.read(), GL_FRAGMENT_SHADER)
-
-        self.shader = shaders.compileProgram(vs, fs)
+        self.shader = programs.get_program(
+            os.path.join(pwd, "ground.vert"),
+            os.path.join(pwd, "ground.frag"),
+        )
 
         # send the modelspace data to the GPU
         self.vbo = glGenBuffers(1)
-        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glstate.bind_buffer(GL_ARRAY_BUFFER, self.vbo)
 
         position = glGetAttribLocation(self.shader, "position")
         glEnableVertexAttribArray(position)
@@ -357,87 +324,112 @@ class Ground:
         # TODO, send color to the shader
 
         # reset VAO/VBO to default
-        glBindVertexArray(0)
-        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glstate.bind_vertex_array(0)
+        glstate.bind_buffer(GL_ARRAY_BUFFER, 0)
 
     # destructor
     def __del__(self):
-        glDeleteVertexArrays(1, [self.vao])
-        glDeleteBuffers(1, [self.vbo])
-        glDeleteProgram(self.shader)
-
-    def render(self):
-        glUseProgram(self.shader)
-        glBindVertexArray(self.vao)
+        glDeleteVertexArrays(1, [self.grid_vao])
+        if self.vao is not None:
+            glDeleteVertexArrays(1, [self.vao])
+            glDeleteBuffers(1, [self.vbo])
+
+    def render(self, view_projection):
+        if self.procedural:
+            glstate.use_program(self.grid_shader)
+            glstate.bind_vertex_array(self.grid_vao)
+
+            self.grid_shader.set_mat4(
+                "mvpMatrix", view_projection @ scene.world_matrix(self.node)
+            )
+            self.grid_shader.set_vec2("u_center", camera.x, camera.z)
+            self.grid_shader.set_float("u_spacing", self.spacing)
+            self.grid_shader.set_float("u_fade_distance", self.fade_distance)
+            # the grid's anti-aliased edges and its fade are only in its
+            # alpha, so it's blended whatever the Blend checkbox says
+            blend = glstate.is_enabled(GL_BLEND)
+            glstate.enable(GL_BLEND)
+            fastgl.glDrawArrays(GL_TRIANGLE_STRIP, 0, 4)
+            if not blend:
+                glstate.disable(GL_BLEND)
+            return
+
+        if self.vao is None:
+            self.prepare_lines()
+        glstate.use_program(self.shader)
+        glstate.bind_vertex_array(self.vao)
 
         # pass projection parameters to the shader
-        mvpMatrixLoc = glGetUniformLocation(self.shader, "mvpMatrix")
-        # ascontiguousarray puts the array in column major order
-        glUniformMatrix4fv(
-            mvpMatrixLoc,
-            1,
-            GL_TRUE,
-            np.ascontiguousarray(
-                ms.get_current_matrix(ms.MatrixStack.modelviewprojection),
-                dtype=np.float32,
-            ),
+        self.shader.set_mat4(
+            "mvpMatrix", view_projection @ scene.world_matrix(self.node)
         )
-        glDrawArrays(GL_LINES, 0, self.numberOfVertices)
-        glBindVertexArray(0)
+        fastgl.glDrawArrays(GL_LINES, 0, self.numberOfVertices)
 
 
 ground = Ground()
 ground.prepare_to_render()
+# the ground never moves, so its matrix is only computed once
+ground.node = scene.add()
+
+
+# what each key does, per second while it's held down
+actions = inputstate.ActionTable(
+    [
+        (glfw.KEY_E, "rotation_around_paddle1", 6.0),
+        (glfw.KEY_Q, "square_rotation", 6.0),
+        (glfw.KEY_RIGHT, "camera_rot_y", -1.8),
+        (glfw.KEY_LEFT, "camera_rot_y", 1.8),
+        (glfw.KEY_PAGE_UP, "camera_rot_x", 1.8),
+        (glfw.KEY_PAGE_DOWN, "camera_rot_x", -1.8),
+        (glfw.KEY_UP, "camera_backward", -900.0),
+        (glfw.KEY_DOWN, "camera_backward", 900.0),
+        (glfw.KEY_S, "paddle1_y", -600.0),
+        (glfw.KEY_W, "paddle1_y", 600.0),
+        (glfw.KEY_K, "paddle2_y", -600.0),
+        (glfw.KEY_I, "paddle2_y", 600.0),
+        (glfw.KEY_A, "paddle1_rotation", 6.0),
+        (glfw.KEY_D, "paddle1_rotation", -6.0),
+        (glfw.KEY_J, "paddle2_rotation", 6.0),
+        (glfw.KEY_L, "paddle2_rotation", -6.0),
+    ]
+)
 
 
-def handle_inputs():
-    if glfw.get_key(window, glfw.KEY_E) == glfw.PRESS:
-        square.rotation_around_paddle1 += 0.1
+def handle_inputs(dt: float):
+    amounts = actions.amounts(input_state.keys, dt)
 
-    if glfw.get_key(window, glfw.KEY_Q) == glfw.PRESS:
-        square.rotation += 0.1
+    square.rotation_around_paddle1 += amounts["rotation_around_paddle1"]
+    square.rotation += amounts["square_rotation"]
 
     global camera
 
-    move_multiple = 15.0
-    if glfw.get_key(window, glfw.KEY_RIGHT) == glfw.PRESS:
-        camera.rot_y -= 0.03
-    if glfw.get_key(window, glfw.KEY_LEFT) == glfw.PRESS:
-        camera.rot_y += 0.03
-    if glfw.get_key(window, glfw.KEY_PAGE_UP) == glfw.PRESS:
-        camera.rot_x += 0.03
-    if glfw.get_key(window, glfw.KEY_PAGE_DOWN) == glfw.PRESS:
-        camera.rot_x -= 0.03
+    camera.rot_y += amounts["camera_rot_y"]
+    camera.rot_x += amounts["camera_rot_x"]
     # //TODO -  explaing movement on XZ-plane
     # //TODO -  show camera movement in graphviz
-    if glfw.get_key(window, glfw.KEY_UP) == glfw.PRESS:
-        camera.x -= move_multiple * math.sin(camera.rot_y)
-        camera.z -= move_multiple * math.cos(camera.rot_y)
-    if glfw.get_key(window, glfw.KEY_DOWN) == glfw.PRESS:
-        camera.x += move_multiple * math.sin(camera.rot_y)
-        camera.z += move_multiple * math.cos(camera.rot_y)
+    camera.x += amounts["camera_backward"] * math.sin(camera.rot_y)
+    camera.z += amounts["camera_backward"] * math.cos(camera.rot_y)
 
     global paddle1, paddle2
 
-    if glfw.get_key(window, glfw.KEY_S) == glfw.PRESS:
-        paddle1.position[1] -= 10.0
-    if glfw.get_key(window, glfw.KEY_W) == glfw.PRESS:
-        paddle1.position[1] += 10.0
-    if glfw.get_key(window, glfw.KEY_K) == glfw.PRESS:
-        paddle2.position[1] -= 10.0
-    if glfw.get_key(window, glfw.KEY_I) == glfw.PRESS:
-        paddle2.position[1] += 10.0
+    paddle1.position[1] += amounts["paddle1_y"]
+    paddle2.position[1] += amounts["paddle2_y"]
+    paddle1.rotation += amounts["paddle1_rotation"]
+    paddle2.rotation += amounts["paddle2_rotation"]
 
-    global paddle_1_rotation, paddle_2_rotation
+    if input_state.joystick_present:
+        axes = input_state.joystick_axes
+        if math.fabs(axes[0]) > 0.1:
+            camera.x += 600.0 * dt * axes[0] * math.cos(camera.rot_y)
+            camera.z -= 600.0 * dt * axes[0] * math.sin(camera.rot_y)
+        if math.fabs(axes[1]) > 0.1:
+            camera.x += 600.0 * dt * axes[1] * math.sin(camera.rot_y)
+            camera.z += 600.0 * dt * axes[1] * math.cos(camera.rot_y)
 
-    if glfw.get_key(window, glfw.KEY_A) == glfw.PRESS:
-        paddle1.rotation += 0.1
-    if glfw.get_key(window, glfw.KEY_D) == glfw.PRESS:
-        paddle1.rotation -= 0.1
-    if glfw.get_key(window, glfw.KEY_J) == glfw.PRESS:
-        paddle2.rotation += 0.1
-    if glfw.get_key(window, glfw.KEY_L) == glfw.PRESS:
-        paddle2.rotation -= 0.1
+        if math.fabs(axes[3]) > 0.10:
+            camera.rot_x -= 1.8 * dt * axes[3]
+        if math.fabs(axes[2]) > 0.10:
+            camera.rot_y -= 1.8 * dt * axes[2]
 
 
 # fmt: off
@@ -451,24 +443,78 @@ square_vertices = np.array(
 # fmt: on
 
 
+# everything that's drawn, with its bounds, to skip what's off screen
+renderables = [ground, paddle1, square, paddle2]
+culler = culling.Culler()
+culler.add(ground.bounds())
+for paddle in renderables[1:]:
+    culler.add(paddle.vertices)
+renderable_nodes = [renderable.node for renderable in renderables]
+
+
 TARGET_FRAMERATE = 60  # fps
 
-# to try to standardize on 60 fps, compare times between frames
-time_at_beginning_of_previous_frame = glfw.get_time()
+# sleeps until shortly before each frame is due, instead of spinning
+frame_scheduler = framescheduler.FrameScheduler(TARGET_FRAMERATE)
+
+# the input advances in steps of 1/60th of a second, however many
+# frames are drawn, and what moves is drawn in between its positions at
+# the last two steps
+simulation = fixedtimestep.FixedTimestep(TARGET_FRAMERATE)
+interpolation = fixedtimestep.Interpolation(
+    (camera, "x"),
+    (camera, "z"),
+    (camera, "rot_x"),
+    (camera, "rot_y"),
+    (paddle1, "position"),
+    (paddle1, "rotation"),
+    (paddle2, "position"),
+    (paddle2, "rotation"),
+    (square, "rotation"),
+    (square, "rotation_around_paddle1"),
+)
+
+# which keys are down, and the joystick, kept up to date by the
+# window's callbacks, instead of asking GLFW for each key every frame
+input_state = inputstate.InputState(window)
+
+# records the input, to replay the same session later, such as to
+# compare the frame times, when MODELVIEWPROJECTION_RECORD_INPUT is
+# set, or replays MODELVIEWPROJECTION_REPLAY_INPUT
+this_module = sys.modules[__name__]
+input_log = inputlog.InputLog(
+    input_state,
+    simulation,
+    (this_module, "__enable_blend__"),
+    (ground, "procedural"),
+)
+
+# draws a frame only after input, or while something moves.  Created
+# after imgui's and the other callbacks, which it calls as well.  A
+# replay draws every frame
+render_on_demand = renderondemand.RenderOnDemand(
+    window, enabled=renderondemand.default_enabled and not input_log.replaying
+)
 
 # Loop until the user closes the window
 while not glfw.window_should_close(window):
-    # poll the time to try to get a constant framerate
-    while (
-        glfw.get_time() < time_at_beginning_of_previous_frame + 1.0 / TARGET_FRAMERATE
-    ):
-        pass
-    # set for comparison on the next frame
-    time_at_beginning_of_previous_frame = glfw.get_time()
-
-    # Poll for and process events
-    glfw.poll_events()
+    frame_scheduler.wait_for_next_frame()
+
+    # Poll for and process events, and if nothing could have changed,
+    # wait for more instead of drawing the same frame again, without
+    # simulating the time spent waiting
+    simulation.skip(render_on_demand.wait_for_events())
     impl.process_inputs()
+    input_state.poll_joystick()
+
+    for _ in range(input_log.advance()):
+        interpolation.begin_step()
+        handle_inputs(simulation.dt)
+
+    # what a widget sets after this is drawn without blending
+    interpolation.end_steps()
+
+    glstate.begin_frame()
 
     imgui.new_frame()
 
@@ -484,14 +530,21 @@ while not glfw.window_should_close(window):
 
     imgui.begin("Custom window", True)
 
-    changed, __enable_blend__ = imgui.checkbox(label="Blend", state=__enable_blend__)
+    _, __enable_blend__ = imgui.checkbox(label="Blend", state=__enable_blend__)
 
-    if changed:
-        if __enable_blend__:
-            glEnable(GL_BLEND)
-        else:
-            glDisable(GL_BLEND)
+    _, ground.procedural = imgui.checkbox(
+        label="Procedural ground", state=ground.procedural
+    )
 
+    imgui.text(str.format("Visible {}, culled {}", culler.visible, culler.culled))
+    imgui.text(
+        str.format(
+            "{} pacing: jitter {:.2f} ms, CPU {:.0f}%",
+            frame_scheduler.mode,
+            frame_scheduler.statistics["jitter_ms"],
+            frame_scheduler.statistics["cpu_percent"],
+        )
+    )
     imgui.text("Bar")
     imgui.text_colored("Eggs", 0.2, 1.0, 0.0)
 
@@ -504,8 +557,18 @@ while not glfw.window_should_close(window):
 
     imgui.end()
 
+    input_log.end_widgets()
+
+    # set every frame, as a replay sets __enable_blend__ without the
+    # checkbox being clicked
+    if __enable_blend__:
+        glstate.enable(GL_BLEND)
+    else:
+        glstate.disable(GL_BLEND)
+
     width, height = glfw.get_framebuffer_size(window)
-    glViewport(0, 0, width, height)
+    glstate.viewport(0, 0, width, height)
+    glstate.clear_color(0.0289, 0.071875, 0.0972, 1.0)  # r  # g  # b  # a
     glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
 
     ms.set_to_identity_matrix(ms.MatrixStack.model)
@@ -518,85 +581,44 @@ while not glfw.window_should_close(window):
     )
 
     # render scene
-    width, height = glfw.get_framebuffer_size(window)
-    glViewport(0, 0, width, height)
-    glClearColor(0.0289, 0.071875, 0.0972, 1.0)  # r  # g  # b  # a
-    glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-
-    handle_inputs()
-
-    axes_list = glfw.get_joystick_axes(glfw.JOYSTICK_1)
-    if len(axes_list) >= 1 and axes_list[0]:
-        if math.fabs(float(axes_list[0][0])) > 0.1:
-            camera.x += 10.0 * axes_list[0][0] * math.cos(camera.rot_y)
-            camera.z -= 10.0 * axes_list[0][0] * math.sin(camera.rot_y)
-        if math.fabs(float(axes_list[0][1])) > 0.1:
-            camera.x += 10.0 * axes_list[0][1] * math.sin(camera.rot_y)
-            camera.z += 10.0 * axes_list[0][1] * math.cos(camera.rot_y)
-
-        # print(axes_list[0][4])
-        if math.fabs(axes_list[0][3]) > 0.10:
-            camera.rot_x -= 3.0 * axes_list[0][3] * 0.01
-        if math.fabs(axes_list[0][2]) > 0.10:
-            camera.rot_y -= 3.0 * axes_list[0][2] * 0.01
-
-    # note - opengl matricies use degrees
-    ms.rotate_x(ms.MatrixStack.view, -camera.rot_x)
-    ms.rotate_y(ms.MatrixStack.view, -camera.rot_y)
-    ms.translate(ms.MatrixStack.view, -camera.x, -camera.y, -camera.z)
-
-    ground.render()
-
-    with ms.push_matrix(ms.MatrixStack.model):
-        # draw paddle 1
-        # Unlike in previous demos, because the transformations
-        # are on a stack, the fns on the model stack can
-        # be read forwards, where each operation translates/rotates/scales
-        # the current space
-        ms.translate(
-            ms.MatrixStack.model,
-            paddle1.position[0],
-            paddle1.position[1],
-            0.0,
-        )
-        ms.rotate_z(ms.MatrixStack.model, paddle1.rotation)
-        paddle1.render()
-
-        with ms.push_matrix(ms.MatrixStack.model):
-            # # draw the square
-
-            # since the modelstack is already in paddle1's space
-            # just add the transformations relative to it
-            # before paddle 2 is drawn, we need to remove
-            # the square's 3 model_space transformations
-
-            ms.translate(ms.MatrixStack.model, 0.0, 0.0, -10.0)
-            ms.rotate_z(ms.MatrixStack.model, square.rotation_around_paddle1)
-
-            ms.translate(ms.MatrixStack.model, 20.0, 0.0, 0.0)
-            ms.rotate_z(ms.MatrixStack.model, square.rotation)
+    interpolation.apply(simulation.alpha)
+
+    # move the nodes of the scene graph to where the objects are.  Only
+    # those which changed, and the nodes below them, are recomputed
+    scene.set_translation(camera_node, camera.x, camera.y, camera.z)
+    scene.set_rotation(camera_node, camera.rot_x, camera.rot_y, 0.0)
+    for paddle in (paddle1, paddle2):
+        scene.set_translation(paddle.node, paddle.position[0], paddle.position[1], 0.0)
+        scene.set_rotation(paddle.node, 0.0, 0.0, paddle.rotation)
+    scene.set_rotation(
+        square.node_around_paddle1, 0.0, 0.0, square.rotation_around_paddle1
+    )
+    scene.set_rotation(square.node, 0.0, 0.0, square.rotation)
+    scene.update()
 
-            square.render()
-        # back to padde 1 space
-    # get back to center of global space
+    view_projection = ms.get_current_matrix(
+        ms.MatrixStack.projection
+    ) @ scene.view_matrix(camera_node)
 
-    with ms.push_matrix(ms.MatrixStack.model):
-        # draw paddle 2
+    # test every object's bounds against the frustum at once
+    visible = culler.cull(view_projection, scene.world_matrices[renderable_nodes])
+    # the procedural grid follows the camera, so it's always in view
+    if ground.procedural:
+        visible[renderables.index(ground)] = True
+    for renderable, is_visible in zip(renderables, visible):
+        if is_visible:
+            renderable.render(view_projection)
 
-        ms.translate(
-            ms.MatrixStack.model,
-            paddle2.position[0],
-            paddle2.position[1],
-            0.0,
-        )
-        ms.rotate_z(ms.MatrixStack.model, paddle2.rotation)
-        paddle2.render()
+    # one draw call for each run of paddles, or of squares, in depth order
+    transparent.draw()
 
     imgui.render()
     impl.render(imgui.get_draw_data())
     # done with frame, flush and swap buffers
     # Swap front and back buffers
     glfw.swap_buffers(window)
+    interpolation.restore()
 
 
+input_log.close()
 glfw.terminate()
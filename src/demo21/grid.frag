@@ -1,4 +1,4 @@
-//Copyright (c) 2023 William Emerison Six
+//Copyright (c) 2018-2024 William Emerison Six
 //
 //Permission is hereby granted, free of charge, to any person obtaining a copy
 //of this software and associated documentation files (the "Software"), to deal
@@ -21,35 +21,31 @@
 
 #version 330 core
 
-layout (lines) in;
-layout (triangle_strip, max_vertices = 4) out;
+out vec4 color;
 
-uniform vec2 u_viewport_size;
-uniform float u_thickness;
+in vec3 modelspace_position;
 
-in VS_OUT {
-  vec4 color;
-} gs_in[];
+uniform vec2 u_center;
+uniform float u_spacing;
+uniform float u_fade_distance;
 
+void main()
+{
+   // how far the fragment is from the nearest line, in pixels, using how
+   // much the grid coordinate changes from one pixel to the next
+   vec2 coordinate = modelspace_position.xz / u_spacing;
+   vec2 pixels_to_line = abs(fract(coordinate - 0.5) - 0.5) / fwidth(coordinate);
 
-out vec4 fColor;
+   // a line one pixel wide, with an anti-aliased edge
+   float line = 1.0 - min(min(pixels_to_line.x, pixels_to_line.y), 1.0);
 
-void main(){
-     vec4 p1 = gl_in[0].gl_Position;
-     vec4 p2 = gl_in[1].gl_Position;
+   // fade out with the distance from the camera, before the quad ends
+   float fade = 1.0 - smoothstep(0.5 * u_fade_distance,
+                                 u_fade_distance,
+                                 distance(modelspace_position.xz, u_center));
 
-     fColor = gs_in[0].color;
-     vec2 dir = normalize((p2.xy / p2.w - p1.xy/p1.w) * u_viewport_size);
-     vec2 offset = vec2(-dir.y, dir.x) * u_thickness / u_viewport_size;
-
-     gl_Position = p1 + vec4(offset.xy * p1.w, 0.0, 0.0);
-     EmitVertex();
-     gl_Position = p1 - vec4(offset.xy * p1.w, 0.0, 0.0);
-     EmitVertex();
-     gl_Position = p2 + vec4(offset.xy * p2.w, 0.0, 0.0);
-     EmitVertex();
-     gl_Position = p2 - vec4(offset.xy * p2.w, 0.0, 0.0);
-     EmitVertex();
-     EndPrimitive();
-
-}
\ No newline at end of file
+   float alpha = line * fade;
+   if (alpha < 0.01)
+      discard;
+   color = vec4(0.5,0.5,0.5,alpha);
+}
@@ -1,4 +1,4 @@
-//Copyright (c) 2023 William Emerison Six
+//Copyright (c) 2018-2024 William Emerison Six
 //
 //Permission is hereby granted, free of charge, to any person obtaining a copy
 //of this software and associated documentation files (the "Software"), to deal
@@ -21,35 +21,24 @@
 
 #version 330 core
 
-layout (lines) in;
-layout (triangle_strip, max_vertices = 4) out;
-
-uniform vec2 u_viewport_size;
-uniform float u_thickness;
-
-in VS_OUT {
-  vec4 color;
-} gs_in[];
-
-
-out vec4 fColor;
-
-void main(){
-     vec4 p1 = gl_in[0].gl_Position;
-     vec4 p2 = gl_in[1].gl_Position;
-
-     fColor = gs_in[0].color;
-     vec2 dir = normalize((p2.xy / p2.w - p1.xy/p1.w) * u_viewport_size);
-     vec2 offset = vec2(-dir.y, dir.x) * u_thickness / u_viewport_size;
-
-     gl_Position = p1 + vec4(offset.xy * p1.w, 0.0, 0.0);
-     EmitVertex();
-     gl_Position = p1 - vec4(offset.xy * p1.w, 0.0, 0.0);
-     EmitVertex();
-     gl_Position = p2 + vec4(offset.xy * p2.w, 0.0, 0.0);
-     EmitVertex();
-     gl_Position = p2 - vec4(offset.xy * p2.w, 0.0, 0.0);
-     EmitVertex();
-     EndPrimitive();
-
-}
\ No newline at end of file
+// a quad, under the camera, on which grid.frag draws the lines of the grid
+
+uniform mat4 mvpMatrix;
+// the camera's x and z, in the ground's modelspace
+uniform vec2 u_center;
+// half of the width of the quad, beyond which the grid has faded out
+uniform float u_fade_distance;
+
+out vec3 modelspace_position;
+
+void main()
+{
+   // the corners of the triangle strip, from the index of the vertex, so
+   // that there are no vertices to send
+   vec2 corner = vec2(gl_VertexID % 2 == 0 ? -1.0 : 1.0,
+                      gl_VertexID < 2 ? -1.0 : 1.0);
+   modelspace_position = vec3(u_center.x + corner.x * u_fade_distance,
+                              -50.0,
+                              u_center.y + corner.y * u_fade_distance);
+   gl_Position = mvpMatrix * vec4(modelspace_position,1.0);
+}
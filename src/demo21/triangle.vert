@@ -23,7 +23,8 @@
 layout (location = 0) in vec3 position;
 layout (location = 1) in vec4 color_in;
 
-uniform mat4 mvpMatrix;
+// one per instance, instead of one per draw call
+layout (location = 2) in mat4 mvpMatrix;
 
 out VS_OUT {
   vec4 color;
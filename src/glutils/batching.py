@@ -0,0 +1,186 @@
+# Copyright (c) 2018-2024 William Emerison Six
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Merge the small, dynamic shapes of a frame into one draw call per
+program and blend state.
+
+A paddle is six vertices, so drawing each paddle and square with its
+own draw call spends far more time in Python and in the driver than on
+the GPU.  Instead, the shapes are submitted with the current model
+matrix during the frame, transformed into world space on the CPU with
+NumPy, and interleaved with their colors into a StreamingBuffer, which
+flush draws from.
+
+The vertex shader is the same one as before, as flush sets its model
+matrix to the identity.
+"""
+
+import ctypes
+
+import numpy as np
+from OpenGL.GL import (
+    GL_ARRAY_BUFFER,
+    GL_BLEND,
+    GL_FLOAT,
+    GL_FLOAT_VEC3,
+    GL_FLOAT_VEC4,
+    GL_TRIANGLES,
+    glDeleteVertexArrays,
+    glEnableVertexAttribArray,
+    glGenVertexArrays,
+    glVertexAttribPointer,
+)
+
+import glutils.fastgl as fastgl
+import glutils.glstate as glstate
+import glutils.streaming as streaming
+
+glfloat_size = 4
+
+components_of_type = {GL_FLOAT_VEC3: 3, GL_FLOAT_VEC4: 4}
+
+
+def transform_vertices(vertices, matrix):
+    """Apply a row major 4x4 matrix to an (n, 3) array of points.
+
+    >>> transform_vertices(np.array([[1.0, 2.0, 3.0]]),
+    ...                    [[1.0, 0.0, 0.0, 10.0],
+    ...                     [0.0, 1.0, 0.0, 20.0],
+    ...                     [0.0, 0.0, 1.0, 30.0],
+    ...                     [0.0, 0.0, 0.0, 1.0]])
+    array([[11., 22., 33.]], dtype=float32)
+    """
+    vertices = np.asarray(vertices, dtype=np.float32)
+    matrix = np.asarray(matrix, dtype=np.float32)
+    return vertices @ matrix[:3, :3].T + matrix[:3, 3]
+
+
+class BatchRenderer:
+    """Triangles submitted during the frame, drawn together at flush.
+
+    The programs take the vertices as "position" and the per vertex colors
+    as color_attribute, and have a model matrix uniform named
+    model_uniform, which flush sets to the identity.  Blending is expected
+    to be disabled outside of flush, as it is left disabled afterwards.
+    """
+
+    def __init__(
+        self,
+        color_attribute: str = "color_in",
+        model_uniform: str = "mMatrix",
+        bytes_per_frame: int = 1 << 20,
+    ) -> None:
+        self.color_attribute = color_attribute
+        self.model_uniform = model_uniform
+
+        # (blend, program) -> list of interleaved vertices
+        self._batches = {}
+        # program -> VAO, as the attribute locations differ between programs
+        self._vaos = {}
+        self.stream = streaming.StreamingBuffer(bytes_per_frame)
+
+        self._shapes_submitted = 0
+        # for the curious, what the last flush drew
+        self.shapes_drawn = 0
+        self.draw_calls = 0
+
+    # destructor
+    def __del__(self):
+        glDeleteVertexArrays(len(self._vaos), list(self._vaos.values()))
+
+    def submit(self, program, vertices, matrix, colors, blend: bool = False) -> None:
+        """Queue triangles in modelspace, to be drawn with the row major
+        model matrix, such as those from glutils.matrixstack.
+
+        colors is either one color, or one color per vertex.
+        """
+        vertices = np.reshape(vertices, (-1, 3))
+        colors = np.broadcast_to(
+            np.asarray(colors, dtype=np.float32),
+            (len(vertices), np.shape(colors)[-1]),
+        )
+        interleaved = np.hstack([transform_vertices(vertices, matrix), colors])
+        self._batches.setdefault((blend, program), []).append(interleaved)
+        self._shapes_submitted += 1
+
+    def _vao_for(self, program, floats_per_color: int):
+        if program not in self._vaos:
+            vao = glGenVertexArrays(1)
+            glstate.bind_vertex_array(vao)
+            glstate.bind_buffer(GL_ARRAY_BUFFER, self.stream.vbo)
+            stride = glfloat_size * (3 + floats_per_color)
+
+            position = program.attributes["position"][0]
+            glEnableVertexAttribArray(position)
+            glVertexAttribPointer(
+                position, 3, GL_FLOAT, False, stride, ctypes.c_void_p(0)
+            )
+
+            color = program.attributes[self.color_attribute][0]
+            glEnableVertexAttribArray(color)
+            glVertexAttribPointer(
+                color,
+                floats_per_color,
+                GL_FLOAT,
+                False,
+                stride,
+                ctypes.c_void_p(glfloat_size * 3),
+            )
+
+            glstate.bind_vertex_array(0)
+            glstate.bind_buffer(GL_ARRAY_BUFFER, 0)
+            self._vaos[program] = vao
+        return self._vaos[program]
+
+    def flush(self) -> None:
+        """Draw everything submitted since the last flush, opaque batches
+        first, one draw call per program and blend state."""
+        self.draw_calls = 0
+        self.stream.begin_frame()
+        # opaque batches first, so that the blend state changes at most once
+        for blend, program in sorted(self._batches, key=lambda k: (k[0], int(k[1]))):
+            vertices = np.ascontiguousarray(
+                np.concatenate(self._batches[(blend, program)]), dtype=np.float32
+            )
+            floats_per_color = components_of_type[
+                program.attributes[self.color_attribute][2]
+            ]
+
+            if blend:
+                glstate.enable(GL_BLEND)
+            else:
+                glstate.disable(GL_BLEND)
+
+            offset = self.stream.write(vertices)
+
+            glstate.use_program(program)
+            program.set_mat4(self.model_uniform, np.identity(4))
+            glstate.bind_vertex_array(self._vao_for(program, floats_per_color))
+            fastgl.glDrawArrays(
+                GL_TRIANGLES, offset // vertices.strides[0], len(vertices)
+            )
+            self.draw_calls += 1
+
+        self.stream.end_frame()
+
+        glstate.disable(GL_BLEND)
+        self._batches.clear()
+        self.shapes_drawn = self._shapes_submitted
+        self._shapes_submitted = 0
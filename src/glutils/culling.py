@@ -0,0 +1,132 @@
+# Copyright (c) 2018-2024 William Emerison Six
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Skip the objects which are entirely outside of the view frustum.
+
+Every object used to be drawn on every frame, even when all of its
+vertices were clipped away.  A Culler keeps a bounding sphere and an
+axis aligned bounding box, in modelspace, for each object that's added
+to it, computed once from the object's vertices.  cull takes the
+view-projection matrix and every object's model matrix, and tests all
+of them against the six planes of the frustum at once, first the cheap
+sphere test, then the tighter box test.
+
+The planes are extracted from the view-projection matrix, as described
+by Gribb and Hartmann in "Fast Extraction of Viewing Frustum Planes from
+the World-View-Projection Matrix".  A point p is inside of a plane
+(a, b, c, d) when a*x + b*y + c*z + d >= 0.
+"""
+
+import numpy as np
+
+
+def bounding_box(vertices):
+    """The minimum and maximum corners of the modelspace vertices.
+
+    >>> bounding_box([[-10.0, -30.0, 0.0], [10.0, 30.0, 0.0]])
+    (array([-10., -30.,   0.], dtype=float32), array([10., 30.,  0.], dtype=float32))
+    """
+    vertices = np.reshape(np.asarray(vertices, dtype=np.float32), (-1, 3))
+    return vertices.min(axis=0), vertices.max(axis=0)
+
+
+def bounding_sphere(vertices):
+    """A sphere around the vertices, centered on their bounding box.
+
+    >>> bounding_sphere([[-3.0, -4.0, 0.0], [3.0, 4.0, 0.0]])
+    (array([0., 0., 0.], dtype=float32), 5.0)
+    """
+    vertices = np.reshape(np.asarray(vertices, dtype=np.float32), (-1, 3))
+    minimum, maximum = bounding_box(vertices)
+    center = (minimum + maximum) / 2.0
+    radius = float(np.sqrt(np.max(np.sum((vertices - center) ** 2, axis=1))))
+    return center, radius
+
+
+def frustum_planes(view_projection):
+    """The left, right, bottom, top, near and far planes, in world space,
+    of a row major view-projection matrix, with unit length normals.
+
+    >>> frustum_planes(np.identity(4))[:, 3]
+    array([1., 1., 1., 1., 1., 1.])
+    """
+    m = np.asarray(view_projection, dtype=np.float64)
+    planes = np.array(
+        [
+            m[3] + m[0],
+            m[3] - m[0],
+            m[3] + m[1],
+            m[3] - m[1],
+            m[3] + m[2],
+            m[3] - m[2],
+        ]
+    )
+    return planes / np.linalg.norm(planes[:, :3], axis=1)[:, np.newaxis]
+
+
+class Culler:
+    """The modelspace bounds of objects, in the order they were added."""
+
+    def __init__(self) -> None:
+        self.centers = np.empty((0, 3), dtype=np.float32)
+        self.radii = np.empty(0, dtype=np.float32)
+        self.box_centers = np.empty((0, 3), dtype=np.float32)
+        self.box_extents = np.empty((0, 3), dtype=np.float32)
+
+        # for the curious, what the last call to cull found
+        self.visible = 0
+        self.culled = 0
+
+    def add(self, vertices) -> int:
+        """Precompute the bounds of an object's modelspace vertices, and
+        return its index in the results of cull."""
+        center, radius = bounding_sphere(vertices)
+        minimum, maximum = bounding_box(vertices)
+        self.centers = np.vstack([self.centers, center])
+        self.radii = np.append(self.radii, radius)
+        self.box_centers = np.vstack([self.box_centers, (minimum + maximum) / 2.0])
+        self.box_extents = np.vstack([self.box_extents, (maximum - minimum) / 2.0])
+        return len(self.radii) - 1
+
+    def cull(self, view_projection, model_matrices):
+        """Which objects are at least partly inside of the frustum, given
+        each object's row major model matrix, as an array of booleans."""
+        planes = frustum_planes(view_projection)
+        model_matrices = np.asarray(model_matrices)
+        linear = model_matrices[:, :3, :3]
+        translation = model_matrices[:, :3, 3]
+
+        # bounding spheres, whose radius grows with the largest scale
+        centers = np.einsum("nij,nj->ni", linear, self.centers) + translation
+        scales = np.linalg.norm(linear, axis=1).max(axis=1)
+        distances = centers @ planes[:, :3].T + planes[:, 3]
+        inside = np.all(distances >= -(self.radii * scales)[:, np.newaxis], axis=1)
+
+        # the world space boxes around the modelspace boxes, for the
+        # objects which the spheres didn't rule out
+        centers = np.einsum("nij,nj->ni", linear, self.box_centers) + translation
+        extents = np.einsum("nij,nj->ni", np.abs(linear), self.box_extents)
+        distances = centers @ planes[:, :3].T + planes[:, 3]
+        reach = extents @ np.abs(planes[:, :3]).T
+        inside &= np.all(distances >= -reach, axis=1)
+
+        self.visible = int(np.count_nonzero(inside))
+        self.culled = len(inside) - self.visible
+        return inside
@@ -0,0 +1,184 @@
+# Copyright (c) 2018-2024 William Emerison Six
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""The OpenGL functions called for every draw, without PyOpenGL's wrappers.
+
+PyOpenGL converts each argument, and checks glGetError after each call,
+which costs more than the call itself for the handful of functions that
+are called per object per frame.  load resolves those functions through
+the context's proc address loader, such as glfw.get_proc_address, and
+calls them through ctypes, with the argument types fixed up front.
+
+The module attributes are PyOpenGL's functions until load is called, and
+use_fast_path(False) switches back to them, so call them as
+fastgl.glDrawArrays(...), not from an import of the name, for the switch
+to apply.  On the fast path, OpenGL errors are not raised as exceptions.
+
+glUniformMatrix4fv takes a C contiguous float32 NumPy array on both
+paths; the fast path passes its data pointer straight through.
+
+Run this file to compare the cost per call of both paths.
+"""
+
+import ctypes
+import sys
+
+import OpenGL.GL as GL
+
+# OpenGL's calling convention on Windows is stdcall
+_function_type = ctypes.WINFUNCTYPE if sys.platform == "win32" else ctypes.CFUNCTYPE
+
+GLboolean = ctypes.c_ubyte
+GLenum = ctypes.c_uint
+GLfloat = ctypes.c_float
+GLint = ctypes.c_int
+GLsizei = ctypes.c_int
+GLuint = ctypes.c_uint
+
+# name -> argument types
+_prototypes = {
+    "glUseProgram": (GLuint,),
+    "glBindVertexArray": (GLuint,),
+    "glDrawArrays": (GLenum, GLint, GLsizei),
+    "glDrawArraysInstanced": (GLenum, GLint, GLsizei, GLsizei),
+    "glUniform1f": (GLint, GLfloat),
+    "glUniform3f": (GLint, GLfloat, GLfloat, GLfloat),
+    "glUniformMatrix4fv": (GLint, GLsizei, GLboolean, ctypes.c_void_p),
+}
+
+# name -> function called through ctypes, for the functions which loaded
+_fast = {}
+
+fast_path = False
+
+
+def _uniform_matrix4fv(location, count, transpose, value) -> None:
+    _fast["glUniformMatrix4fv"](location, count, transpose, value.ctypes.data)
+
+
+def load(get_proc_address) -> bool:
+    """Resolve the functions in the current context, and switch to the
+    fast path.  Returns whether every function was found; the ones which
+    weren't keep going through PyOpenGL."""
+    for name, argument_types in _prototypes.items():
+        address = get_proc_address(name)
+        if address:
+            _fast[name] = _function_type(None, *argument_types)(address)
+    use_fast_path(True)
+    return len(_fast) == len(_prototypes)
+
+
+def use_fast_path(enabled: bool) -> None:
+    global fast_path
+    fast_path = enabled
+    module = sys.modules[__name__]
+    for name in _prototypes:
+        function = getattr(GL, name)
+        if enabled and name in _fast:
+            function = _fast[name]
+            if name == "glUniformMatrix4fv":
+                function = _uniform_matrix4fv
+        setattr(module, name, function)
+
+
+glUseProgram = GL.glUseProgram
+glBindVertexArray = GL.glBindVertexArray
+glDrawArrays = GL.glDrawArrays
+glDrawArraysInstanced = GL.glDrawArraysInstanced
+glUniform1f = GL.glUniform1f
+glUniform3f = GL.glUniform3f
+glUniformMatrix4fv = GL.glUniformMatrix4fv
+
+
+def _benchmark(calls: int = 100_000) -> None:
+    import time
+
+    import glfw
+    import numpy as np
+    import OpenGL.GL.shaders as shaders
+
+    if not glfw.init():
+        sys.exit()
+    glfw.window_hint(glfw.VISIBLE, False)
+    glfw.window_hint(glfw.CONTEXT_VERSION_MAJOR, 3)
+    glfw.window_hint(glfw.CONTEXT_VERSION_MINOR, 3)
+    glfw.window_hint(glfw.OPENGL_PROFILE, glfw.OPENGL_CORE_PROFILE)
+    glfw.window_hint(glfw.OPENGL_FORWARD_COMPAT, GL.GL_TRUE)
+    window = glfw.create_window(64, 64, "fastgl", None, None)
+    if not window:
+        glfw.terminate()
+        sys.exit()
+    glfw.make_context_current(window)
+
+    program = shaders.compileProgram(
+        shaders.compileShader(
+            "#version 330 core\n"
+            "uniform mat4 m; uniform vec3 v; uniform float f;\n"
+            "void main() { gl_Position = m * vec4(v, f); }\n",
+            GL.GL_VERTEX_SHADER,
+        ),
+        shaders.compileShader(
+            "#version 330 core\n"
+            "out vec4 color;\n"
+            "void main() { color = vec4(1.0); }\n",
+            GL.GL_FRAGMENT_SHADER,
+        ),
+        validate=False,
+    )
+    m = GL.glGetUniformLocation(program, "m")
+    v = GL.glGetUniformLocation(program, "v")
+    f = GL.glGetUniformLocation(program, "f")
+    vao = int(GL.glGenVertexArrays(1))
+    matrix = np.identity(4, dtype=np.float32)
+
+    all_loaded = load(glfw.get_proc_address)
+    if not all_loaded:
+        print("some functions were not found, and stay on PyOpenGL")
+    module = sys.modules[__name__]
+    calls_to_time = {
+        "glUseProgram": lambda: module.glUseProgram(program),
+        "glBindVertexArray": lambda: module.glBindVertexArray(vao),
+        "glUniform1f": lambda: module.glUniform1f(f, 1.0),
+        "glUniform3f": lambda: module.glUniform3f(v, 1.0, 2.0, 3.0),
+        "glUniformMatrix4fv": lambda: module.glUniformMatrix4fv(
+            m, 1, GL.GL_TRUE, matrix
+        ),
+        "glDrawArrays": lambda: module.glDrawArrays(GL.GL_POINTS, 0, 1),
+    }
+
+    print(str.format("{:<20}{:>12}{:>12}", "microseconds", "PyOpenGL", "ctypes"))
+    GL.glUseProgram(program)
+    GL.glBindVertexArray(vao)
+    for name, call in calls_to_time.items():
+        per_call = []
+        for enabled in (False, True):
+            use_fast_path(enabled)
+            start = time.perf_counter()
+            for _ in range(calls):
+                call()
+            GL.glFinish()
+            per_call.append(1e6 * (time.perf_counter() - start) / calls)
+        print(str.format("{:<20}{:>12.3f}{:>12.3f}", name, *per_call))
+
+    glfw.terminate()
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,195 @@
+# Copyright (c) 2018-2024 William Emerison Six
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Move the objects the same amount per second, however many frames are
+drawn per second.
+
+The event loops used to handle the input, and advance the animation,
+once per frame, by amounts which assumed 60 frames per second, such as
+rotating a paddle by 0.1 radians while a key is held down.  A slow frame
+slowed everything down, and a faster monitor sped it up.
+
+A FixedTimestep accumulates the time that has passed, and advance says
+how many steps of exactly dt seconds to simulate this frame, which may
+be none, or several.  What's left over, as a fraction of a step, is
+alpha.
+
+Drawing the state as of the last step would stutter, as the frames
+don't line up with the steps, so an Interpolation keeps the values of
+some attributes as of the previous step.  apply sets each to
+interpolate(previous, current, alpha) for the drawing, and restore puts
+the current values back for the next step.  What's drawn lags the
+simulation by up to one step, in exchange for smooth motion.
+
+Something other than a step can set an attribute too, such as an imgui
+button which jumps animation_time to the start of a chapter.  Blending
+from the previous step's value would draw a point in between, which was
+never part of the animation, so end_steps remembers the values the
+steps left, and apply draws any attribute set after that as it is.
+
+This is described by Glenn Fiedler in "Fix Your Timestep!".
+"""
+
+import time
+
+import numpy as np
+
+
+def steps_to_simulate(
+    accumulated: float, elapsed: float, dt: float, max_elapsed: float
+):
+    """How many steps of dt fit in the accumulated time, plus the
+    elapsed time, capped at max_elapsed, and the time that's left over.
+
+    >>> steps_to_simulate(0.0, 0.625, 0.25, 1.0)
+    (2, 0.125)
+    >>> steps_to_simulate(0.125, 0.0625, 0.25, 1.0)
+    (0, 0.1875)
+    >>> steps_to_simulate(0.0, 10.0, 0.25, 1.0)
+    (4, 0.0)
+    """
+    accumulated += min(elapsed, max_elapsed)
+    steps = int(accumulated // dt)
+    return steps, accumulated - steps * dt
+
+
+def interpolate(previous, current, alpha: float):
+    """The value alpha of the way from previous to current.
+
+    >>> interpolate(1.0, 3.0, 0.25)
+    1.5
+    >>> interpolate(np.array([0.0, 10.0]), np.array([10.0, 10.0]), 0.5)
+    array([ 5., 10.])
+    """
+    return previous + (current - previous) * alpha
+
+
+class FixedTimestep:
+    """Simulation steps of dt seconds, steps_per_second times a second.
+
+    If a frame took longer than max_frame_time, such as when the window
+    was being dragged, the rest of the time is dropped, instead of
+    simulating so many steps that the next frame is late as well.
+    """
+
+    def __init__(self, steps_per_second: int = 60, max_frame_time: float = 0.25):
+        self.dt = 1.0 / steps_per_second
+        self.max_frame_time = max_frame_time
+        # the first frame simulates one step, so that there is a
+        # previous step to interpolate from
+        self.accumulated = self.dt
+        self.alpha = 0.0
+        self._time_of_previous_frame = time.perf_counter()
+
+        # for the curious, how many steps the last frame simulated
+        self.steps_last_frame = 0
+
+    def advance(self) -> int:
+        """How many steps to simulate this frame, given how much time has
+        passed since the last call."""
+        now = time.perf_counter()
+        steps, self.accumulated = steps_to_simulate(
+            self.accumulated,
+            now - self._time_of_previous_frame,
+            self.dt,
+            self.max_frame_time,
+        )
+        self._time_of_previous_frame = now
+        self.alpha = self.accumulated / self.dt
+        self.steps_last_frame = steps
+        return steps
+
+    def skip(self, seconds: float) -> None:
+        """Don't simulate these seconds of the time since the last frame,
+        such as those spent waiting for input with nothing moving."""
+        self._time_of_previous_frame += seconds
+
+
+class Interpolation:
+    """Attributes, given as (object, name), whose drawn values are
+    interpolated between the previous and the current step.
+
+    The values are floats or NumPy arrays.  Module level variables are
+    attributes of the module, sys.modules[__name__].
+
+    >>> import types
+    >>> paddle = types.SimpleNamespace(rotation=0.0)
+    >>> interpolation = Interpolation((paddle, "rotation"))
+    >>> interpolation.begin_step()
+    >>> paddle.rotation += 0.1
+    >>> interpolation.apply(0.5)
+    >>> paddle.rotation
+    0.05
+    >>> interpolation.restore()
+    >>> paddle.rotation
+    0.1
+
+    Set after the steps, such as by a widget, it's drawn as it is.
+
+    >>> interpolation.begin_step()
+    >>> paddle.rotation += 0.1
+    >>> interpolation.end_steps()
+    >>> paddle.rotation = 5.0
+    >>> interpolation.apply(0.5)
+    >>> paddle.rotation
+    5.0
+    """
+
+    def __init__(self, *attributes) -> None:
+        self.attributes = attributes
+        self._previous = [self._copy(obj, name) for obj, name in attributes]
+        self._current = list(self._previous)
+        self._stepped = None
+
+    def _copy(self, obj, name: str):
+        value = getattr(obj, name)
+        return np.array(value) if isinstance(value, np.ndarray) else value
+
+    def begin_step(self) -> None:
+        """Remember the values as of the previous step, before this step
+        changes them."""
+        self._previous = [self._copy(obj, name) for obj, name in self.attributes]
+
+    def end_steps(self) -> None:
+        """Remember the values as of the last step of this frame, before
+        anything else, such as a widget, can set them."""
+        self._stepped = [self._copy(obj, name) for obj, name in self.attributes]
+
+    def apply(self, alpha: float) -> None:
+        """Set each attribute alpha of the way from its value at the
+        previous step to its current value, until restore.  Those set
+        since end_steps aren't blended, but jump to their new value."""
+        self._current = [getattr(obj, name) for obj, name in self.attributes]
+        if self._stepped is not None:
+            self._previous = [
+                previous if np.array_equal(stepped, current) else self._copy(obj, name)
+                for (obj, name), previous, stepped, current in zip(
+                    self.attributes, self._previous, self._stepped, self._current
+                )
+            ]
+            self._stepped = None
+        for (obj, name), previous, current in zip(
+            self.attributes, self._previous, self._current
+        ):
+            setattr(obj, name, interpolate(previous, current, alpha))
+
+    def restore(self) -> None:
+        for (obj, name), current in zip(self.attributes, self._current):
+            setattr(obj, name, current)
@@ -0,0 +1,177 @@
+# Copyright (c) 2018-2024 William Emerison Six
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Wait for the next frame without keeping a CPU core busy.
+
+The event loops used to wait for the next frame by checking the time,
+over and over, until 1/60th of a second had passed since the previous
+frame, which kept one core at 100% just to wait.
+
+A FrameScheduler waits in one of these modes:
+
+    "hybrid"    sleep until shortly before the next frame is due, then
+                check the time for the rest, as the sleep may overshoot
+    "vsync"     don't wait here, swap_buffers waits for the monitor
+    "uncapped"  don't wait at all, to measure how fast a frame can be
+    "spin"      check the time until the next frame is due, as before
+
+The mode defaults to the environment variable
+MODELVIEWPROJECTION_FRAME_PACING, or to "hybrid".
+
+Run python -m glutils.framescheduler, from src, to compare the jitter
+of the frame times, and the CPU utilization, of each mode.
+"""
+
+import os
+import time
+
+import glfw
+import numpy as np
+
+modes = ("hybrid", "vsync", "uncapped", "spin")
+
+default_mode = os.environ.get("MODELVIEWPROJECTION_FRAME_PACING", "hybrid")
+
+
+class FrameScheduler:
+    """Paces the event loop at target_framerate.
+
+    Create it after the window's context is made current, as it sets the
+    swap interval, and call wait_for_next_frame at the beginning of each
+    frame.
+
+    spin_margin is how long before the frame is due that the sleep ends.
+    Sleeps on Linux and MacOS overshoot by well under a millisecond, but
+    on Windows they can overshoot by the 1 ms to 15 ms of the system's
+    timer resolution.
+    """
+
+    def __init__(
+        self,
+        target_framerate: int = 60,
+        mode: str = None,
+        spin_margin: float = 0.002,
+        report_interval: float = 1.0,
+    ) -> None:
+        mode = default_mode if mode is None else mode
+        if mode not in modes:
+            raise ValueError(
+                str.format("unknown frame pacing mode {!r}, not one of {}", mode, modes)
+            )
+        self.mode = mode
+        self.period = 1.0 / target_framerate
+        self.spin_margin = spin_margin
+        self.report_interval = report_interval
+
+        glfw.swap_interval(1 if mode == "vsync" else 0)
+
+        self._time_at_beginning_of_previous_frame = time.perf_counter()
+        self._intervals = []
+        self._lateness = []
+        self._report_started = self._time_at_beginning_of_previous_frame
+        self._cpu_time_at_report_start = time.process_time()
+
+        # for the curious, measured over the last report_interval seconds
+        self.statistics = {
+            "fps": 0.0,
+            "mean_frame_ms": 0.0,
+            "jitter_ms": 0.0,
+            "worst_frame_ms": 0.0,
+            "worst_lateness_ms": 0.0,
+            "cpu_percent": 0.0,
+        }
+
+    def wait_for_next_frame(self) -> None:
+        deadline = self._time_at_beginning_of_previous_frame + self.period
+        if self.mode == "hybrid":
+            remaining = deadline - time.perf_counter() - self.spin_margin
+            if remaining > 0.0:
+                time.sleep(remaining)
+        if self.mode in ("hybrid", "spin"):
+            while time.perf_counter() < deadline:
+                pass
+
+        now = time.perf_counter()
+        self._intervals.append(now - self._time_at_beginning_of_previous_frame)
+        self._lateness.append(now - deadline)
+        # as before, a late frame delays the ones after it, instead of
+        # having them rush to catch up
+        self._time_at_beginning_of_previous_frame = now
+
+        if now - self._report_started >= self.report_interval:
+            self._report(now)
+
+    def _report(self, now: float) -> None:
+        intervals = np.array(self._intervals)
+        cpu_time = time.process_time()
+        self.statistics["fps"] = len(intervals) / (now - self._report_started)
+        self.statistics["mean_frame_ms"] = 1000.0 * float(np.mean(intervals))
+        self.statistics["jitter_ms"] = 1000.0 * float(np.std(intervals))
+        self.statistics["worst_frame_ms"] = 1000.0 * float(np.max(intervals))
+        if self.mode in ("hybrid", "spin"):
+            self.statistics["worst_lateness_ms"] = 1000.0 * max(self._lateness)
+        # the time spent on the CPU by every thread of the process,
+        # including the driver's, so it can be over 100%
+        self.statistics["cpu_percent"] = (
+            100.0
+            * (cpu_time - self._cpu_time_at_report_start)
+            / (now - self._report_started)
+        )
+
+        self._intervals.clear()
+        self._lateness.clear()
+        self._report_started = now
+        self._cpu_time_at_report_start = cpu_time
+
+
+def _benchmark(seconds_per_mode: float = 3.0) -> None:
+    import sys
+
+    import OpenGL.GL as GL
+
+    if not glfw.init():
+        sys.exit()
+    window = glfw.create_window(320, 240, "frame scheduler", None, None)
+    if not window:
+        glfw.terminate()
+        sys.exit()
+    glfw.make_context_current(window)
+
+    for mode in modes:
+        scheduler = FrameScheduler(mode=mode, report_interval=seconds_per_mode)
+        # until the first report
+        while scheduler.statistics["fps"] == 0.0:
+            scheduler.wait_for_next_frame()
+            glfw.poll_events()
+            GL.glClear(GL.GL_COLOR_BUFFER_BIT)
+            glfw.swap_buffers(window)
+        print(
+            str.format("{:>9}: ", mode)
+            + ", ".join(
+                str.format("{} {:.2f}", name, value)
+                for name, value in scheduler.statistics.items()
+            )
+        )
+
+    glfw.terminate()
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,208 @@
+# Copyright (c) 2018-2024 William Emerison Six
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""The modelspace vertices of the ground, the axis, the NDC cube and the
+frustums, generated once.
+
+Each demo used to have its own copy of the loops which built these,
+one float at a time, into Python lists, before converting them to
+NumPy, and ran them on every launch.  The generators here build the
+same vertices with meshgrid and broadcasting, as float32 arrays of
+shape (number of vertices, 3).
+
+The arrays are shared by every caller with the same parameters, so
+they are read only.  Those which are large are also cached on the disk
+as .npy files, keyed by the generator and its parameters, and loaded as
+memory maps, so that only the pages that are read are loaded.  Set
+cache_directory to None to disable the disk cache.
+"""
+
+import functools
+import hashlib
+import inspect
+import os
+
+import numpy as np
+
+cache_directory = os.path.join(
+    os.path.expanduser("~"), ".cache", "modelviewprojection", "geometry"
+)
+
+# arrays smaller than this are faster to generate than to load
+smallest_cached_on_disk = 64 * 1024
+
+# (generator name, parameters) -> array, shared by every caller
+_arrays = {}
+
+# how many arrays were generated, loaded from the disk cache, or already
+# in _arrays, for the curious
+statistics = {"generated": 0, "loaded": 0, "shared": 0}
+
+
+def _cache_path(generator, parameters) -> str:
+    h = hashlib.sha256()
+    h.update(generator.__qualname__.encode())
+    h.update(repr(parameters).encode())
+    # a change to the generator invalidates what it generated before
+    h.update(generator.__code__.co_code)
+    h.update(repr(generator.__code__.co_consts).encode())
+    return os.path.join(cache_directory, h.hexdigest() + ".npy")
+
+
+def _load(path: str):
+    try:
+        return np.load(path, mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+
+
+def _save(path: str, array) -> None:
+    try:
+        os.makedirs(cache_directory, exist_ok=True)
+        # write then rename, so that another process never reads half a file
+        with open(path + ".tmp", "wb") as f:
+            np.save(f, array)
+        os.replace(path + ".tmp", path)
+    except OSError:
+        pass
+
+
+def cached(generator):
+    """Memoize the generator by its parameters, and cache its large
+    results on the disk."""
+    signature = inspect.signature(generator)
+
+    @functools.wraps(generator)
+    def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        parameters = tuple(bound.arguments.items())
+        key = (generator.__qualname__, parameters)
+        if key in _arrays:
+            statistics["shared"] += 1
+            return _arrays[key]
+
+        path = None if cache_directory is None else _cache_path(generator, parameters)
+        array = None if path is None else _load(path)
+        if array is not None:
+            statistics["loaded"] += 1
+        else:
+            array = np.ascontiguousarray(generator(*args, **kwargs), dtype=np.float32)
+            array.flags.writeable = False
+            statistics["generated"] += 1
+            if path is not None and array.nbytes >= smallest_cached_on_disk:
+                _save(path, array)
+
+        _arrays[key] = array
+        return array
+
+    return wrapper
+
+
+@cached
+def ground_grid(extent: int, spacing: int, y: float = -50.0):
+    """Lines across the ground, at every multiple of spacing from -extent
+    to extent, in the order that the demos always drew them: for each x
+    and z, a line from (-x, z) to (x, z), and one from (x, -z) to (x, z).
+
+    >>> ground_grid(20, 20)[:4].tolist()
+    [[20.0, -50.0, -20.0], [-20.0, -50.0, -20.0], [-20.0, -50.0, 20.0], [-20.0, -50.0, -20.0]]
+    >>> ground_grid(200, 20).shape
+    (1764, 3)
+    """
+    coordinates = np.arange(-extent, extent + 1, spacing, dtype=np.float32)
+    x, z = np.meshgrid(coordinates, coordinates, indexing="ij")
+    y = np.full_like(x, y)
+    vertices = np.stack(
+        [
+            np.stack([-x, y, z], axis=-1),
+            np.stack([x, y, z], axis=-1),
+            np.stack([x, y, -z], axis=-1),
+            np.stack([x, y, z], axis=-1),
+        ],
+        axis=2,
+    )
+    return vertices.reshape(-1, 3)
+
+
+@cached
+def axis_arrow():
+    """A line of length one up the y axis, with an arrow head.
+
+    >>> axis_arrow().shape
+    (6, 3)
+    """
+    return np.array(
+        [
+            [0.0, 0.0, 0.0],
+            [0.0, 1.0, 0.0],
+            # arrow
+            [0.0, 1.0, 0.0],
+            [0.25, 0.75, 0.0],
+            [0.0, 1.0, 0.0],
+            [-0.25, 0.75, 0.0],
+        ]
+    )
+
+
+# the corners of a square, in the order of a loop around it
+_square = np.array([[-1.0, -1.0], [1.0, -1.0], [1.0, 1.0], [-1.0, 1.0]])
+
+
+@cached
+def frustum_edges(
+    near_half_size: tuple, near_z: float, far_half_size: tuple, far_z: float
+):
+    """The twelve edges, as pairs of vertices for GL_LINES, of a frustum
+    between the rectangle at near_z and the one at far_z, each centered
+    on the z axis, with the given half width and half height.
+
+    >>> frustum_edges((50.0, 50.0), -5.0, (50.0, 50.0), -150.0)[:2].tolist()
+    [[-50.0, -50.0, -5.0], [50.0, -50.0, -5.0]]
+    >>> frustum_edges((1.0, 1.0), -1.0, (3.0, 3.0), -3.0)[-2:].tolist()
+    [[-1.0, 1.0, -1.0], [-3.0, 3.0, -3.0]]
+    """
+    half_sizes = np.array([near_half_size, far_half_size])
+    zs = np.array([near_z, far_z])
+
+    # (face, edge, end, xy), the edges around the near and the far face
+    loops = np.stack([_square, np.roll(_square, -1, axis=0)], axis=1)
+    faces = loops[np.newaxis] * half_sizes[:, np.newaxis, np.newaxis, :]
+    faces_z = np.broadcast_to(zs[:, np.newaxis, np.newaxis, np.newaxis], (2, 4, 2, 1))
+
+    # (corner, end, xy), the edges which connect the faces
+    sides = _square[:, np.newaxis, :] * half_sizes[np.newaxis]
+    sides_z = np.broadcast_to(zs[np.newaxis, :, np.newaxis], (4, 2, 1))
+
+    return np.concatenate(
+        [
+            np.concatenate([faces, faces_z], axis=-1).reshape(-1, 3),
+            np.concatenate([sides, sides_z], axis=-1).reshape(-1, 3),
+        ]
+    )
+
+
+def ndc_cube_edges():
+    """The edges of the cube of normalized device coordinates.
+
+    >>> ndc_cube_edges().shape
+    (24, 3)
+    """
+    return frustum_edges((1.0, 1.0), -1.0, (1.0, 1.0), 1.0)
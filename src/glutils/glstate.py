@@ -0,0 +1,152 @@
+# Copyright (c) 2018-2024 William Emerison Six
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Remember the OpenGL state which was last set, and don't set it again.
+
+Every renderable used to call glUseProgram and glBindVertexArray before
+drawing, and glBindVertexArray(0) after, whether or not the previous
+renderable had left the same state bound.  These functions take the
+same arguments as their OpenGL counterparts, but only call them when
+the state would change.
+
+The cache is only correct if every change to the state that it tracks
+goes through here.  Code which changes it behind the cache's back, such
+as imgui's renderer, has to be followed by invalidate.  begin_frame
+invalidates the cache too, so a frame starts from what OpenGL really
+has bound.
+"""
+
+from OpenGL.GL import (
+    GL_ELEMENT_ARRAY_BUFFER,
+    glBindBuffer,
+    glClearColor,
+    glDisable,
+    glEnable,
+    glIsEnabled,
+    glScissor,
+    glViewport,
+)
+
+import glutils.fastgl as fastgl
+
+_program = None
+_vertex_array = None
+# target -> buffer
+_buffers = {}
+_viewport = None
+_scissor = None
+_clear_color = None
+# capability -> enabled
+_capabilities = {}
+
+# the calls issued to OpenGL, and the calls dropped, this frame
+statistics = {"issued": 0, "elided": 0}
+# the same, for the previous frame
+last_frame = {"issued": 0, "elided": 0}
+
+
+def invalidate() -> None:
+    """Forget the cached state, so that the next call of each is issued."""
+    global _program, _vertex_array, _viewport, _scissor, _clear_color
+    _program = None
+    _vertex_array = None
+    _buffers.clear()
+    _viewport = None
+    _scissor = None
+    _clear_color = None
+    _capabilities.clear()
+
+
+def begin_frame() -> None:
+    last_frame.update(statistics)
+    statistics["issued"] = 0
+    statistics["elided"] = 0
+    invalidate()
+
+
+def _is_redundant(cached, value) -> bool:
+    if cached == value:
+        statistics["elided"] += 1
+        return True
+    statistics["issued"] += 1
+    return False
+
+
+def use_program(program) -> None:
+    global _program
+    if not _is_redundant(_program, int(program)):
+        fastgl.glUseProgram(int(program))
+        _program = int(program)
+
+
+def bind_vertex_array(vertex_array) -> None:
+    global _vertex_array
+    if not _is_redundant(_vertex_array, int(vertex_array)):
+        fastgl.glBindVertexArray(int(vertex_array))
+        _vertex_array = int(vertex_array)
+        # the element array buffer binding belongs to the vertex array
+        _buffers.pop(GL_ELEMENT_ARRAY_BUFFER, None)
+
+
+def bind_buffer(target: int, buffer) -> None:
+    if not _is_redundant(_buffers.get(target), int(buffer)):
+        glBindBuffer(target, buffer)
+        _buffers[target] = int(buffer)
+
+
+def viewport(x: int, y: int, width: int, height: int) -> None:
+    global _viewport
+    if not _is_redundant(_viewport, (x, y, width, height)):
+        glViewport(x, y, width, height)
+        _viewport = (x, y, width, height)
+
+
+def scissor(x: int, y: int, width: int, height: int) -> None:
+    global _scissor
+    if not _is_redundant(_scissor, (x, y, width, height)):
+        glScissor(x, y, width, height)
+        _scissor = (x, y, width, height)
+
+
+def clear_color(r: float, g: float, b: float, a: float) -> None:
+    global _clear_color
+    if not _is_redundant(_clear_color, (r, g, b, a)):
+        glClearColor(r, g, b, a)
+        _clear_color = (r, g, b, a)
+
+
+def enable(capability: int) -> None:
+    if not _is_redundant(_capabilities.get(capability), True):
+        glEnable(capability)
+        _capabilities[capability] = True
+
+
+def disable(capability: int) -> None:
+    if not _is_redundant(_capabilities.get(capability), False):
+        glDisable(capability)
+        _capabilities[capability] = False
+
+
+def is_enabled(capability: int) -> bool:
+    """Whether the capability is enabled, asking OpenGL only if the
+    cache doesn't know, such as after invalidate."""
+    if capability not in _capabilities:
+        _capabilities[capability] = bool(glIsEnabled(capability))
+    return _capabilities[capability]
@@ -1,4 +1,4 @@
-//Copyright (c) 2023 William Emerison Six
+//Copyright (c) 2018-2024 William Emerison Six
 //
 //Permission is hereby granted, free of charge, to any person obtaining a copy
 //of this software and associated documentation files (the "Software"), to deal
@@ -18,38 +18,15 @@
 //OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 //SOFTWARE.
 
-
 #version 330 core
 
-layout (lines) in;
-layout (triangle_strip, max_vertices = 4) out;
-
-uniform vec2 u_viewport_size;
+out vec4 color;
 
 in VS_OUT {
   vec4 color;
-  float thickness;
-} gs_in[];
-
-
-out vec4 fColor;
-
-void main(){
-     vec4 p1 = gl_in[0].gl_Position;
-     vec4 p2 = gl_in[1].gl_Position;
-
-     fColor = gs_in[0].color;
-     vec2 dir = normalize((p2.xy / p2.w - p1.xy/p1.w) * u_viewport_size);
-     vec2 offset = vec2(-dir.y, dir.x) * gs_in[0].thickness / u_viewport_size;
-
-     gl_Position = p1 + vec4(offset.xy * p1.w, 0.0, 0.0);
-     EmitVertex();
-     gl_Position = p1 - vec4(offset.xy * p1.w, 0.0, 0.0);
-     EmitVertex();
-     gl_Position = p2 + vec4(offset.xy * p2.w, 0.0, 0.0);
-     EmitVertex();
-     gl_Position = p2 - vec4(offset.xy * p2.w, 0.0, 0.0);
-     EmitVertex();
-     EndPrimitive();
+} fs_in;
 
-}
\ No newline at end of file
+void main()
+{
+   color = fs_in.color;
+}
@@ -0,0 +1,208 @@
+# Copyright (c) 2018-2024 William Emerison Six
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""glBegin, glVertex, glColor and glEnd, accumulated in Python.
+
+Through PyOpenGL, each glVertex2f is a call through ctypes into the
+driver, so a circle made of a thousand line segments costs thousands of
+calls per frame.  These functions take the same arguments as the ones
+in OpenGL.GL, but only append to lists, and glEnd draws the whole
+primitive with one glDrawArrays.
+
+On a compatibility profile the vertices are drawn from client side
+arrays, so the fixed function matrices still apply.  On a core profile,
+which has neither glBegin nor the fixed function matrices, they are
+drawn from a buffer with a small shader, whose matrix is set with
+set_matrix.  GL_QUADS, which the core profile doesn't have either, are
+split into triangles.
+
+To switch a demo over, import these four functions from here instead of
+from OpenGL.GL.
+"""
+
+import ctypes
+import os
+
+import numpy as np
+from OpenGL.GL import (
+    GL_ARRAY_BUFFER,
+    GL_COLOR_ARRAY,
+    GL_CONTEXT_CORE_PROFILE_BIT,
+    GL_CONTEXT_PROFILE_MASK,
+    GL_FLOAT,
+    GL_QUADS,
+    GL_STREAM_DRAW,
+    GL_TRIANGLES,
+    GL_VERSION,
+    GL_VERTEX_ARRAY,
+    glBufferData,
+    glColorPointer,
+    glDisableClientState,
+    glDrawArrays,
+    glEnableClientState,
+    glEnableVertexAttribArray,
+    glGenBuffers,
+    glGenVertexArrays,
+    glGetIntegerv,
+    glGetString,
+    glVertexAttribPointer,
+    glVertexPointer,
+)
+
+import glutils.fastgl as fastgl
+import glutils.glstate as glstate
+import glutils.programs as programs
+
+_mode = None
+_positions = []
+_colors = []
+# OpenGL's initial current color is white
+_current_color = (1.0, 1.0, 1.0, 1.0)
+
+# only used on a core profile
+_matrix = np.identity(4, dtype=np.float32)
+_core = None
+_program = None
+_vao = None
+_vbo = None
+
+# for the curious
+statistics = {"vertices": 0, "draw_calls": 0}
+
+
+def glBegin(mode: int) -> None:
+    global _mode
+    _mode = mode
+    _positions.clear()
+    _colors.clear()
+
+
+def glColor3f(r: float, g: float, b: float) -> None:
+    global _current_color
+    _current_color = (r, g, b, 1.0)
+
+
+def glColor4f(r: float, g: float, b: float, a: float) -> None:
+    global _current_color
+    _current_color = (r, g, b, a)
+
+
+def glVertex2f(x: float, y: float) -> None:
+    _positions.extend((x, y, 0.0))
+    _colors.extend(_current_color)
+
+
+def glVertex3f(x: float, y: float, z: float) -> None:
+    _positions.extend((x, y, z))
+    _colors.extend(_current_color)
+
+
+def set_matrix(matrix) -> None:
+    """The row major modelviewprojection matrix, on a core profile."""
+    global _matrix
+    _matrix = np.array(matrix, dtype=np.float32)
+
+
+def quads_to_triangles(vertices):
+    """Split each group of four vertices into two triangles, dropping any
+    vertices left over, as glBegin(GL_QUADS) would.
+
+    >>> quads_to_triangles(np.arange(9))
+    array([0, 1, 2, 0, 2, 3, 4, 5, 6, 4, 6, 7])
+    """
+    number_of_quads = len(vertices) // 4
+    first_of_each_quad = 4 * np.arange(number_of_quads)
+    indices = first_of_each_quad[:, np.newaxis] + np.array([0, 1, 2, 0, 2, 3])
+    return vertices[indices.reshape(-1)]
+
+
+def glEnd() -> None:
+    positions = np.array(_positions, dtype=np.float32).reshape(-1, 3)
+    colors = np.array(_colors, dtype=np.float32).reshape(-1, 4)
+    mode = _mode
+    if mode == GL_QUADS:
+        positions = quads_to_triangles(positions)
+        colors = quads_to_triangles(colors)
+        mode = GL_TRIANGLES
+    if len(positions) == 0:
+        return
+
+    if _is_core_profile():
+        _draw_core(mode, positions, colors)
+    else:
+        _draw_compatibility(mode, positions, colors)
+    statistics["vertices"] += len(positions)
+    statistics["draw_calls"] += 1
+
+
+def _is_core_profile() -> bool:
+    global _core
+    if _core is None:
+        version = glGetString(GL_VERSION).decode("utf-8", "replace")
+        major, minor = (int(n) for n in version.split()[0].split(".")[:2])
+        # profiles only exist as of OpenGL 3.2
+        _core = (major, minor) >= (3, 2) and bool(
+            glGetIntegerv(GL_CONTEXT_PROFILE_MASK) & GL_CONTEXT_CORE_PROFILE_BIT
+        )
+    return _core
+
+
+def _draw_compatibility(mode: int, positions, colors) -> None:
+    # with a buffer bound, the pointers would be offsets into it
+    glstate.bind_buffer(GL_ARRAY_BUFFER, 0)
+    glEnableClientState(GL_VERTEX_ARRAY)
+    glEnableClientState(GL_COLOR_ARRAY)
+    glVertexPointer(3, GL_FLOAT, 0, positions)
+    glColorPointer(4, GL_FLOAT, 0, colors)
+    glDrawArrays(mode, 0, len(positions))
+    glDisableClientState(GL_COLOR_ARRAY)
+    glDisableClientState(GL_VERTEX_ARRAY)
+
+
+def _draw_core(mode: int, positions, colors) -> None:
+    global _program, _vao, _vbo
+    if _program is None:
+        pwd = os.path.dirname(os.path.abspath(__file__))
+        _program = programs.get_program(
+            os.path.join(pwd, "immediate.vert"),
+            os.path.join(pwd, "immediate.frag"),
+        )
+        _vao = glGenVertexArrays(1)
+        _vbo = glGenBuffers(1)
+        glstate.bind_vertex_array(_vao)
+        glstate.bind_buffer(GL_ARRAY_BUFFER, _vbo)
+        stride = 4 * (3 + 4)
+        position = _program.attributes["position"][0]
+        glEnableVertexAttribArray(position)
+        glVertexAttribPointer(position, 3, GL_FLOAT, False, stride, ctypes.c_void_p(0))
+        color = _program.attributes["color_in"][0]
+        glEnableVertexAttribArray(color)
+        glVertexAttribPointer(color, 4, GL_FLOAT, False, stride, ctypes.c_void_p(12))
+        glstate.bind_vertex_array(0)
+        glstate.bind_buffer(GL_ARRAY_BUFFER, 0)
+
+    vertices = np.ascontiguousarray(np.hstack([positions, colors]))
+    glstate.bind_buffer(GL_ARRAY_BUFFER, _vbo)
+    glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STREAM_DRAW)
+
+    glstate.use_program(_program)
+    _program.set_mat4("mvpMatrix", _matrix)
+    glstate.bind_vertex_array(_vao)
+    fastgl.glDrawArrays(mode, 0, len(vertices))
@@ -1,4 +1,4 @@
-//Copyright (c) 2023 William Emerison Six
+//Copyright (c) 2018-2024 William Emerison Six
 //
 //Permission is hereby granted, free of charge, to any person obtaining a copy
 //of this software and associated documentation files (the "Software"), to deal
@@ -18,38 +18,20 @@
 //OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 //SOFTWARE.
 
-
 #version 330 core
 
-layout (lines) in;
-layout (triangle_strip, max_vertices = 4) out;
+layout (location = 0) in vec3 position;
+layout (location = 1) in vec4 color_in;
 
-uniform vec2 u_viewport_size;
-uniform float u_thickness;
+uniform mat4 mvpMatrix;
 
-in VS_OUT {
+out VS_OUT {
   vec4 color;
-} gs_in[];
-
-
-out vec4 fColor;
-
-void main(){
-     vec4 p1 = gl_in[0].gl_Position;
-     vec4 p2 = gl_in[1].gl_Position;
-
-     fColor = gs_in[0].color;
-     vec2 dir = normalize((p2.xy / p2.w - p1.xy/p1.w) * u_viewport_size);
-     vec2 offset = vec2(-dir.y, dir.x) * u_thickness / u_viewport_size;
+} vs_out;
 
-     gl_Position = p1 + vec4(offset.xy * p1.w, 0.0, 0.0);
-     EmitVertex();
-     gl_Position = p1 - vec4(offset.xy * p1.w, 0.0, 0.0);
-     EmitVertex();
-     gl_Position = p2 + vec4(offset.xy * p2.w, 0.0, 0.0);
-     EmitVertex();
-     gl_Position = p2 - vec4(offset.xy * p2.w, 0.0, 0.0);
-     EmitVertex();
-     EndPrimitive();
 
-}
\ No newline at end of file
+void main()
+{
+   gl_Position = mvpMatrix * vec4(position,1.0);
+   vs_out.color = color_in;
+}
@@ -0,0 +1,270 @@
+# Copyright (c) 2018-2024 William Emerison Six
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Record the input of a session, and replay it, to compare how fast
+different ways of drawing the same thing are.
+
+The input used to come only from the keyboard, the mouse and the
+joystick, as they were at the time, so no two runs of a demo drew the
+same frames, and timing a change meant flying the camera around by hand,
+differently each time.
+
+An InputLog records, for each frame, how many steps the FixedTimestep
+simulated, and the alpha to draw with, the InputState's keys, mouse
+buttons, cursor and joystick axes, and the values of the attributes,
+given as (object, name) as for an Interpolation, which the imgui
+widgets set.  When the window is closed, the frames are written to a
+compressed NumPy file, about 100 bytes per frame before compression,
+much less after, as most frames are the same as the one before.
+
+Set the environment variable MODELVIEWPROJECTION_RECORD_INPUT to the
+file to record to.  Set MODELVIEWPROJECTION_REPLAY_INPUT to a recorded
+file to replay it instead, which replaces the live input, and the
+number of steps per frame, with the recorded ones, so that every frame
+is the same as when it was recorded, however long it takes to draw.
+When the log runs out, the window is closed, and how long the frames
+took is printed.  Replay with MODELVIEWPROJECTION_FRAME_PACING=uncapped
+to measure how fast the frames can be drawn.
+"""
+
+import atexit
+import os
+import time
+
+import glfw
+import numpy as np
+
+default_record_path = os.environ.get("MODELVIEWPROJECTION_RECORD_INPUT")
+default_replay_path = os.environ.get("MODELVIEWPROJECTION_REPLAY_INPUT")
+
+
+def _attribute_name(obj, name: str) -> str:
+    # module level variables are named on their own
+    if type(obj).__name__ == "module":
+        return name
+    return type(obj).__name__ + "." + name
+
+
+def flatten(values) -> np.ndarray:
+    """Floats, bools and NumPy arrays, one after another, as float64.
+
+    >>> flatten([1.5, True, np.array([2.0, 3.0], dtype=np.float32)])
+    array([1.5, 1. , 2. , 3. ])
+    """
+    return np.concatenate([np.ravel(value) for value in values]).astype(np.float64)
+
+
+def unflatten(flat: np.ndarray, like) -> list:
+    """The values flatten was given, of the same types as those in like.
+
+    >>> unflatten(np.array([2.5, 0.0, 4.0, 5.0]), [1.5, True, np.zeros(2)])
+    [2.5, False, array([4., 5.])]
+    """
+    values = []
+    start = 0
+    for value in like:
+        size = np.size(value)
+        part = flat[start : start + size]
+        if isinstance(value, np.ndarray):
+            values.append(part.astype(value.dtype).reshape(value.shape))
+        else:
+            values.append(type(value)(part[0]))
+        start += size
+    return values
+
+
+class InputLog:
+    """Records, or replays, the input of input_state, the steps of
+    simulation, and the attributes set by the widgets.  Without a file to
+    record to, or to replay, it only calls simulation.advance."""
+
+    def __init__(
+        self,
+        input_state,
+        simulation,
+        *widgets,
+        record_path: str = None,
+        replay_path: str = None,
+    ) -> None:
+        self.input_state = input_state
+        self.simulation = simulation
+        self.widgets = widgets
+        self.record_path = default_record_path if record_path is None else record_path
+        self.replay_path = default_replay_path if replay_path is None else replay_path
+        self.replaying = bool(self.replay_path)
+        self.recording = bool(self.record_path) and not self.replaying
+
+        widget_values = [getattr(obj, name) for obj, name in widgets]
+        self._names = np.array([_attribute_name(obj, name) for obj, name in widgets])
+        self.dtype = np.dtype(
+            [
+                ("steps", np.uint8),
+                ("alpha", np.float32),
+                ("keys", np.uint8, ((len(input_state.keys) + 7) // 8,)),
+                (
+                    "mouse_buttons",
+                    np.uint8,
+                    ((len(input_state.mouse_buttons) + 7) // 8,),
+                ),
+                ("cursor", np.float64, (2,)),
+                ("ui_wants_mouse", np.bool_),
+                ("joystick_present", np.bool_),
+                ("joystick_axes", np.float32, (len(input_state.joystick_axes),)),
+                ("widgets", np.float64, (len(flatten(widget_values or [[]])),)),
+            ]
+        )
+        self._frame = np.zeros((), dtype=self.dtype)
+        self._frames = []
+        self._index = 0
+        self._time_of_previous_frame = None
+
+        # for the curious, and for comparing the replays
+        self.statistics = {"frames": 0, "seconds": 0.0, "worst_frame_ms": 0.0}
+
+        if self.replaying:
+            self._frames = self._load(self.replay_path)
+        if self.recording:
+            atexit.register(self.close)
+
+    def _load(self, path: str) -> np.ndarray:
+        with np.load(path) as log:
+            frames, names, dt = log["frames"], log["widgets"], float(log["dt"])
+        if frames.dtype != self.dtype or list(names) != list(self._names):
+            raise ValueError(
+                str.format(
+                    "{} was recorded with other inputs, or by another demo,"
+                    " with the widgets {}",
+                    path,
+                    names.tolist(),
+                )
+            )
+        if dt != self.simulation.dt:
+            raise ValueError(
+                str.format(
+                    "{} was recorded with steps of {} seconds, not {}",
+                    path,
+                    dt,
+                    self.simulation.dt,
+                )
+            )
+        return frames
+
+    def advance(self) -> int:
+        """Call instead of simulation.advance, after the events are
+        processed.  How many steps to simulate this frame."""
+        self._time_frame()
+        if not self.replaying:
+            steps = self.simulation.advance()
+            if self.recording:
+                self._record_input(steps)
+            return steps
+
+        if self._index == len(self._frames):
+            self._finish_replay()
+            return 0
+        self._frame = self._frames[self._index]
+        self._index += 1
+        self._replay_input()
+        self.simulation.alpha = float(self._frame["alpha"])
+        return int(self._frame["steps"])
+
+    def end_widgets(self) -> None:
+        """Call after the last imgui widget, before drawing.  Records the
+        values the widgets set, or sets them to the recorded ones."""
+        if self.replaying and self._index > 0:
+            like = [getattr(obj, name) for obj, name in self.widgets]
+            values = unflatten(self._frame["widgets"], like)
+            for (obj, name), value in zip(self.widgets, values):
+                if isinstance(value, np.ndarray):
+                    # the widgets change the arrays in place, so keep them
+                    getattr(obj, name)[...] = value
+                else:
+                    setattr(obj, name, value)
+        elif self.recording:
+            if self.widgets:
+                self._frame["widgets"] = flatten(
+                    [getattr(obj, name) for obj, name in self.widgets]
+                )
+            self._frames.append(self._frame.copy())
+
+    def _record_input(self, steps: int) -> None:
+        input_state = self.input_state
+        self._frame["steps"] = steps
+        self._frame["alpha"] = self.simulation.alpha
+        self._frame["keys"] = np.packbits(input_state.keys)
+        self._frame["mouse_buttons"] = np.packbits(input_state.mouse_buttons)
+        self._frame["cursor"] = input_state.cursor
+        self._frame["ui_wants_mouse"] = input_state.ui_wants_mouse
+        self._frame["joystick_present"] = input_state.joystick_present
+        self._frame["joystick_axes"] = input_state.joystick_axes
+
+    def _replay_input(self) -> None:
+        input_state = self.input_state
+        frame = self._frame
+        input_state.keys[:] = np.unpackbits(frame["keys"], count=len(input_state.keys))
+        input_state.mouse_buttons[:] = np.unpackbits(
+            frame["mouse_buttons"], count=len(input_state.mouse_buttons)
+        )
+        input_state.cursor[:] = frame["cursor"]
+        input_state.ui_wants_mouse = bool(frame["ui_wants_mouse"])
+        input_state.joystick_present = bool(frame["joystick_present"])
+        input_state.joystick_axes[:] = frame["joystick_axes"]
+
+    def _time_frame(self) -> None:
+        now = time.perf_counter()
+        if self._time_of_previous_frame is not None:
+            seconds = now - self._time_of_previous_frame
+            self.statistics["frames"] += 1
+            self.statistics["seconds"] += seconds
+            self.statistics["worst_frame_ms"] = max(
+                self.statistics["worst_frame_ms"], seconds * 1000.0
+            )
+        self._time_of_previous_frame = now
+
+    def _finish_replay(self) -> None:
+        if glfw.window_should_close(self.input_state.window):
+            return
+        glfw.set_window_should_close(self.input_state.window, True)
+        frames = max(self.statistics["frames"], 1)
+        print(
+            str.format(
+                "replayed {} frames of {} in {:.3f} s,"
+                " {:.3f} ms per frame, worst {:.3f} ms",
+                self.statistics["frames"],
+                self.replay_path,
+                self.statistics["seconds"],
+                self.statistics["seconds"] * 1000.0 / frames,
+                self.statistics["worst_frame_ms"],
+            )
+        )
+
+    def close(self) -> None:
+        """Write what was recorded, if anything.  Called at exit too."""
+        if not self.recording or not self._frames:
+            return
+        frames = np.stack(self._frames)
+        self._frames = []
+        # write to another file, and rename it, so that a log is never
+        # left half written
+        temporary_path = self.record_path + ".tmp.npz"
+        np.savez_compressed(
+            temporary_path, frames=frames, widgets=self._names, dt=self.simulation.dt
+        )
+        os.replace(temporary_path, self.record_path)
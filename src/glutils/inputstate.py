@@ -0,0 +1,138 @@
+# Copyright (c) 2018-2024 William Emerison Six
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""The state of the keyboard, the mouse and the joystick, kept up to date
+by the window's callbacks, and what the keys do, as a table.
+
+handle_inputs used to ask GLFW whether each key that it cares about was
+pressed, once per key, on every frame, plus the cursor and the mouse
+button, each through a ctypes call.
+
+An InputState adds to the window's callbacks, and keeps which keys and
+mouse buttons are down in arrays of booleans, indexed by GLFW's key and
+button numbers, along with the cursor's position.  The joystick, which
+has no callbacks, is polled once per frame by poll_joystick.  Whether
+imgui wants the mouse, instead of the scene, is kept with them.
+
+An ActionTable binds keys to named actions, each with a rate per
+second, such as moving a paddle up by 600 units per second while W is
+held down.  amounts sums the rates of the keys which are down, for all
+of the actions at once, and scales them by the length of the step.
+
+As every input is in these arrays, the input of a session can be
+recorded, and replayed, by saving, and later restoring, them.
+"""
+
+import glfw
+import numpy as np
+
+
+def chain_callback(window, set_callback, on_event) -> None:
+    """Call on_event from the window's callback, followed by the callback
+    which was already set, such as imgui's."""
+
+    def callback(*args):
+        on_event(*args)
+        if previous is not None:
+            previous(*args)
+
+    previous = set_callback(window, callback)
+
+
+class InputState:
+    """The input, as of the last events.  Create it after the window's
+    other callbacks are set."""
+
+    def __init__(self, window, number_of_joystick_axes: int = 6) -> None:
+        self.window = window
+        self.keys = np.zeros(glfw.KEY_LAST + 1, dtype=bool)
+        self.mouse_buttons = np.zeros(glfw.MOUSE_BUTTON_LAST + 1, dtype=bool)
+        self.cursor = np.array(glfw.get_cursor_pos(window), dtype=np.float64)
+        self.joystick_present = False
+        self.joystick_axes = np.zeros(number_of_joystick_axes, dtype=np.float32)
+        # whether imgui uses the mouse, such as to drag a slider, which the
+        # event loop sets from imgui's io once per frame
+        self.ui_wants_mouse = False
+
+        chain_callback(window, glfw.set_key_callback, self._on_key)
+        chain_callback(window, glfw.set_mouse_button_callback, self._on_mouse_button)
+        chain_callback(window, glfw.set_cursor_pos_callback, self._on_cursor_pos)
+
+    def _on_key(self, window, key, scancode, action, mods) -> None:
+        # keys which GLFW doesn't know have no number
+        if key == glfw.KEY_UNKNOWN:
+            return
+        if action == glfw.PRESS:
+            self.keys[key] = True
+        elif action == glfw.RELEASE:
+            self.keys[key] = False
+
+    def _on_mouse_button(self, window, button, action, mods) -> None:
+        self.mouse_buttons[button] = action == glfw.PRESS
+
+    def _on_cursor_pos(self, window, x, y) -> None:
+        self.cursor[:] = (x, y)
+
+    def poll_joystick(self) -> None:
+        self.joystick_present = bool(glfw.joystick_present(glfw.JOYSTICK_1))
+        self.joystick_axes[:] = 0.0
+        if self.joystick_present:
+            axes, number_of_axes = glfw.get_joystick_axes(glfw.JOYSTICK_1)
+            for index in range(min(number_of_axes, len(self.joystick_axes))):
+                self.joystick_axes[index] = axes[index]
+
+
+class ActionTable:
+    """Bindings of a key to an action, and how much of the action to do
+    per second while the key is down, as (key, action, rate).  Keys bound
+    to the same action add up.
+
+    >>> actions = ActionTable(
+    ...     [(87, "paddle1_y", 600.0), (83, "paddle1_y", -600.0), (69, "spin", 6.0)]
+    ... )
+    >>> keys = np.zeros(349, dtype=bool)
+    >>> keys[87] = True
+    >>> actions.amounts(keys, 0.5)
+    {'paddle1_y': 300.0, 'spin': 0.0}
+    >>> keys[83] = True
+    >>> actions.amounts(keys, 0.5)
+    {'paddle1_y': 0.0, 'spin': 0.0}
+    """
+
+    def __init__(self, bindings) -> None:
+        self.names = list(dict.fromkeys(action for _, action, _ in bindings))
+        self._keys = np.array([key for key, _, _ in bindings], dtype=np.intp)
+        self._actions = np.array(
+            [self.names.index(action) for _, action, _ in bindings], dtype=np.intp
+        )
+        self._rates = np.array([rate for _, _, rate in bindings], dtype=np.float64)
+
+    def rates(self, keys):
+        """Per action, in the order of names, the rate per second, given
+        which keys are down."""
+        return np.bincount(
+            self._actions,
+            weights=self._rates * keys[self._keys],
+            minlength=len(self.names),
+        )
+
+    def amounts(self, keys, dt: float) -> dict:
+        """How much of each action to do in a step of dt seconds."""
+        return dict(zip(self.names, (self.rates(keys) * dt).tolist()))
@@ -0,0 +1,392 @@
+# Copyright (c) 2018-2024 William Emerison Six
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Lines wider than a pixel, drawn as instanced quads.
+
+The core profile doesn't allow glLineWidth greater than 1, so the scripts
+in mvpVisualization turned each line into a quad in a geometry shader,
+which is a slow path on many drivers, especially on software OpenGL,
+such as llvmpipe.
+
+Instead, each line of a line list is an instance of a 4 vertex triangle
+strip.  The line's endpoints are per instance attributes, read from the
+line list's VBO with a stride of two vertices, and thicklines.vert moves
+each of the 4 vertices to a corner of the quad around the line, with the
+same math as the geometry shaders.
+
+A program for thick lines is linked from vertex_shader_path and the
+object's own vertex shader, which defines
+
+    vec4 clip_position(vec3 position);
+    vec4 line_color();
+    float line_thickness();
+
+and a fragment shader which takes the color as "fColor".
+
+Run python -m glutils.lines, from src, to compare the time per frame of
+the geometry shader and of the instanced quads.
+"""
+
+import ctypes
+import os
+
+import numpy as np
+from OpenGL.GL import (
+    GL_ARRAY_BUFFER,
+    GL_FLOAT,
+    GL_STATIC_DRAW,
+    GL_STREAM_DRAW,
+    GL_TRIANGLE_STRIP,
+    glBufferData,
+    glBufferSubData,
+    glDeleteBuffers,
+    glDeleteVertexArrays,
+    glEnableVertexAttribArray,
+    glGenBuffers,
+    glGenVertexArrays,
+    glVertexAttribDivisor,
+    glVertexAttribPointer,
+)
+
+import glutils.fastgl as fastgl
+import glutils.glstate as glstate
+import glutils.meshes as meshes
+
+vertex_shader_path = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "thicklines.vert"
+)
+
+glfloat_size = 4
+
+# the corners of the quad around a line
+vertices_per_line = 4
+
+
+def _point_at_endpoints(program, vbo: int) -> None:
+    # with the VAO bound, read line_start and line_end of each instance
+    # from the next two vertices of the line list
+    glstate.bind_buffer(GL_ARRAY_BUFFER, vbo)
+    for name, vertex in (("line_start", 0), ("line_end", 1)):
+        location = program.attributes[name][0]
+        glEnableVertexAttribArray(location)
+        glVertexAttribPointer(
+            location,
+            3,
+            GL_FLOAT,
+            False,
+            glfloat_size * 3 * 2,
+            ctypes.c_void_p(glfloat_size * 3 * vertex),
+        )
+        glVertexAttribDivisor(location, 1)
+
+
+class ThickLines:
+    """The lines of a line list, in a VBO shared through glutils.meshes."""
+
+    def __init__(self, vertices, program) -> None:
+        self.mesh = meshes.get_mesh(vertices)
+        self.program = program
+        self.number_of_lines = self.mesh.number_of_vertices // 2
+
+        self.vao = glGenVertexArrays(1)
+        glstate.bind_vertex_array(self.vao)
+        _point_at_endpoints(program, self.mesh.vbo)
+
+        # reset VAO/VBO to default
+        glstate.bind_vertex_array(0)
+        glstate.bind_buffer(GL_ARRAY_BUFFER, 0)
+
+    # destructor
+    def __del__(self):
+        glDeleteVertexArrays(1, [self.vao])
+
+    def submit(self, render_queue, uniforms: dict, depth: float = 0.0) -> None:
+        """Draw every line at render_queue.flush, with the uniforms."""
+        render_queue.submit(
+            self.program,
+            self.vao,
+            GL_TRIANGLE_STRIP,
+            vertices_per_line,
+            uniforms=uniforms,
+            depth=depth,
+            instances=self.number_of_lines,
+        )
+
+
+class InstancedThickLines:
+    """Every instance of a line list drawn with one program, each instance
+    with its own matrix and color, as meshes.InstancedMesh, drawn with one
+    call.
+
+    Each line of each instance is an instance of the quad, so the object's
+    matrix and color advance once per number_of_lines quads, and the line
+    list is repeated in the VBO once per object that can be drawn.
+    """
+
+    def __init__(
+        self,
+        vertices,
+        program,
+        matrix_attribute: str = "mMatrix",
+        color_attribute: str = "color",
+    ) -> None:
+        self.vertices = np.reshape(np.asarray(vertices, dtype=np.float32), (-1, 3))
+        self.program = program
+        self.number_of_lines = len(self.vertices) // 2
+
+        matrix_location = program.attributes[matrix_attribute][0]
+        color_location, _, color_type = program.attributes[color_attribute]
+        self.floats_per_color = meshes.components_of_type[color_type]
+        # column major matrix, then color
+        self.floats_per_instance = 16 + self.floats_per_color
+
+        self.instances = np.zeros((4, self.floats_per_instance), dtype=np.float32)
+        self.number_of_instances = 0
+        # how many copies of the line list are in the endpoint VBO
+        self.copies_of_lines = 0
+
+        self.vao = glGenVertexArrays(1)
+        glstate.bind_vertex_array(self.vao)
+
+        self.endpoint_vbo = glGenBuffers(1)
+        _point_at_endpoints(program, self.endpoint_vbo)
+
+        self.instance_vbo = glGenBuffers(1)
+        glstate.bind_buffer(GL_ARRAY_BUFFER, self.instance_vbo)
+        stride = glfloat_size * self.floats_per_instance
+        # a mat4 attribute takes four locations, one per column
+        for column in range(4):
+            glEnableVertexAttribArray(matrix_location + column)
+            glVertexAttribPointer(
+                matrix_location + column,
+                4,
+                GL_FLOAT,
+                False,
+                stride,
+                ctypes.c_void_p(glfloat_size * 4 * column),
+            )
+            glVertexAttribDivisor(matrix_location + column, self.number_of_lines)
+        glEnableVertexAttribArray(color_location)
+        glVertexAttribPointer(
+            color_location,
+            self.floats_per_color,
+            GL_FLOAT,
+            False,
+            stride,
+            ctypes.c_void_p(glfloat_size * 16),
+        )
+        glVertexAttribDivisor(color_location, self.number_of_lines)
+
+        # reset VAO/VBO to default
+        glstate.bind_vertex_array(0)
+        glstate.bind_buffer(GL_ARRAY_BUFFER, 0)
+
+    # destructor
+    def __del__(self):
+        glDeleteVertexArrays(1, [self.vao])
+        glDeleteBuffers(1, [self.endpoint_vbo, self.instance_vbo])
+
+    def add(self, matrix, color) -> None:
+        """Draw the lines with this row major matrix, such as those from
+        glutils.matrixstack, at the next call to draw."""
+        if self.number_of_instances == len(self.instances):
+            self.instances = np.resize(
+                self.instances, (2 * len(self.instances), self.floats_per_instance)
+            )
+        instance = self.instances[self.number_of_instances]
+        # OpenGL expects column major order
+        instance[:16] = np.ravel(matrix, order="F")
+        instance[16:] = color
+        self.number_of_instances += 1
+
+    def draw(self) -> None:
+        """Draw every instance added since the last draw, with one call."""
+        if self.number_of_instances == 0:
+            return
+        if self.number_of_instances > self.copies_of_lines:
+            self.copies_of_lines = len(self.instances)
+            endpoints = np.tile(self.vertices, (self.copies_of_lines, 1))
+            glstate.bind_buffer(GL_ARRAY_BUFFER, self.endpoint_vbo)
+            glBufferData(GL_ARRAY_BUFFER, endpoints.nbytes, endpoints, GL_STATIC_DRAW)
+
+        instances = self.instances[: self.number_of_instances]
+        glstate.bind_buffer(GL_ARRAY_BUFFER, self.instance_vbo)
+        # orphan last frame's storage, so that the driver doesn't have
+        # to wait for the GPU to finish reading it
+        glBufferData(GL_ARRAY_BUFFER, instances.nbytes, None, GL_STREAM_DRAW)
+        glBufferSubData(GL_ARRAY_BUFFER, 0, instances.nbytes, instances)
+
+        glstate.use_program(self.program)
+        glstate.bind_vertex_array(self.vao)
+        fastgl.glDrawArraysInstanced(
+            GL_TRIANGLE_STRIP,
+            0,
+            vertices_per_line,
+            self.number_of_instances * self.number_of_lines,
+        )
+        self.number_of_instances = 0
+
+
+_benchmark_vertex_shader = """
+#version 330 core
+uniform float u_thickness;
+vec4 clip_position(vec3 position) { return vec4(position, 1.0); }
+vec4 line_color() { return vec4(1.0); }
+float line_thickness() { return u_thickness; }
+"""
+
+_benchmark_geometry_path_vertex_shader = """
+#version 330 core
+layout (location = 0) in vec3 position;
+out VS_OUT { vec4 color; } vs_out;
+void main() { gl_Position = vec4(position, 1.0); vs_out.color = vec4(1.0); }
+"""
+
+# as the scripts in mvpVisualization had it
+_benchmark_geometry_shader = """
+#version 330 core
+layout (lines) in;
+layout (triangle_strip, max_vertices = 4) out;
+uniform vec2 u_viewport_size;
+uniform float u_thickness;
+in VS_OUT { vec4 color; } gs_in[];
+out vec4 fColor;
+void main(){
+     vec4 p1 = gl_in[0].gl_Position;
+     vec4 p2 = gl_in[1].gl_Position;
+     fColor = gs_in[0].color;
+     vec2 dir = normalize((p2.xy / p2.w - p1.xy/p1.w) * u_viewport_size);
+     vec2 offset = vec2(-dir.y, dir.x) * u_thickness / u_viewport_size;
+     gl_Position = p1 + vec4(offset.xy * p1.w, 0.0, 0.0);
+     EmitVertex();
+     gl_Position = p1 - vec4(offset.xy * p1.w, 0.0, 0.0);
+     EmitVertex();
+     gl_Position = p2 + vec4(offset.xy * p2.w, 0.0, 0.0);
+     EmitVertex();
+     gl_Position = p2 - vec4(offset.xy * p2.w, 0.0, 0.0);
+     EmitVertex();
+     EndPrimitive();
+}
+"""
+
+_benchmark_fragment_shader = """
+#version 330 core
+in vec4 fColor;
+out vec4 color;
+void main() { color = fColor; }
+"""
+
+
+def _benchmark(number_of_lines: int = 100_000, frames: int = 100) -> None:
+    import sys
+    import time
+
+    import glfw
+    import OpenGL.GL as GL
+    import OpenGL.GL.shaders as shaders
+
+    import glutils.programs as programs
+
+    if not glfw.init():
+        sys.exit()
+    glfw.window_hint(glfw.VISIBLE, False)
+    glfw.window_hint(glfw.CONTEXT_VERSION_MAJOR, 3)
+    glfw.window_hint(glfw.CONTEXT_VERSION_MINOR, 3)
+    glfw.window_hint(glfw.OPENGL_PROFILE, glfw.OPENGL_CORE_PROFILE)
+    glfw.window_hint(glfw.OPENGL_FORWARD_COMPAT, GL.GL_TRUE)
+    width, height = 1024, 768
+    window = glfw.create_window(width, height, "lines", None, None)
+    if not window:
+        glfw.terminate()
+        sys.exit()
+    glfw.make_context_current(window)
+    fastgl.load(glfw.get_proc_address)
+
+    vertices = (
+        np.random.default_rng(0)
+        .uniform(-1.0, 1.0, (2 * number_of_lines, 3))
+        .astype(np.float32)
+    )
+
+    with open(vertex_shader_path, "r") as f:
+        thick_lines_source = f.read()
+    quads_program = programs.ShaderProgram(
+        shaders.compileProgram(
+            shaders.compileShader(_benchmark_vertex_shader, GL.GL_VERTEX_SHADER),
+            shaders.compileShader(thick_lines_source, GL.GL_VERTEX_SHADER),
+            shaders.compileShader(_benchmark_fragment_shader, GL.GL_FRAGMENT_SHADER),
+            validate=False,
+        )
+    )
+    geometry_program = programs.ShaderProgram(
+        shaders.compileProgram(
+            shaders.compileShader(
+                _benchmark_geometry_path_vertex_shader, GL.GL_VERTEX_SHADER
+            ),
+            shaders.compileShader(_benchmark_geometry_shader, GL.GL_GEOMETRY_SHADER),
+            shaders.compileShader(_benchmark_fragment_shader, GL.GL_FRAGMENT_SHADER),
+            validate=False,
+        )
+    )
+
+    thick_lines = ThickLines(vertices, quads_program)
+    geometry_vao = glGenVertexArrays(1)
+    glstate.bind_vertex_array(geometry_vao)
+    glstate.bind_buffer(GL_ARRAY_BUFFER, thick_lines.mesh.vbo)
+    glEnableVertexAttribArray(0)
+    glVertexAttribPointer(0, 3, GL_FLOAT, False, 0, ctypes.c_void_p(0))
+    glstate.bind_vertex_array(0)
+
+    def draw_with_geometry_shader():
+        glstate.use_program(geometry_program)
+        glstate.bind_vertex_array(geometry_vao)
+        fastgl.glDrawArrays(GL.GL_LINES, 0, 2 * number_of_lines)
+
+    def draw_with_quads():
+        glstate.use_program(quads_program)
+        glstate.bind_vertex_array(thick_lines.vao)
+        fastgl.glDrawArraysInstanced(
+            GL_TRIANGLE_STRIP, 0, vertices_per_line, number_of_lines
+        )
+
+    print(str.format("{} lines, milliseconds per frame", number_of_lines))
+    for name, program, draw in (
+        ("geometry shader", geometry_program, draw_with_geometry_shader),
+        ("instanced quads", quads_program, draw_with_quads),
+    ):
+        glstate.use_program(program)
+        program.set_float("u_thickness", 3.0)
+        program.set_vec2("u_viewport_size", width, height)
+        # once, so that the driver's compilation isn't timed
+        draw()
+        GL.glFinish()
+        start = time.perf_counter()
+        for _ in range(frames):
+            GL.glClear(GL.GL_COLOR_BUFFER_BIT)
+            draw()
+        GL.glFinish()
+        milliseconds = 1e3 * (time.perf_counter() - start) / frames
+        print(str.format("{:<20}{:>10.3f}", name, milliseconds))
+
+    glfw.terminate()
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,258 @@
+# Copyright (c) 2018-2024 William Emerison Six
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""The model, view and projection matrix stacks, without allocating.
+
+The same functions as pyMatrixStack, meant to be imported as ms in its
+place.  pyMatrixStack makes a new 4x4 matrix for each translate, rotate
+and scale, copies one for each push, and multiplies the three stacks
+together for each get_current_matrix(MatrixStack.modelviewprojection).
+
+Here, each stack is one array of matrices, allocated up front, which
+the functions change in place.  The matrices are stored transposed, so
+that each one's bytes are in column major order, the order OpenGL
+expects.  get_current_matrix returns a view of the top of the stack,
+which is indexed the same as a row major matrix, and whose .T can be
+sent to OpenGL without a copy or a transpose.  The modelview and
+modelviewprojection products are only recomputed when one of the
+stacks they are made of has changed.
+
+Since it's a view, the matrix which get_current_matrix returns changes
+along with the stack.  Copy it to keep it.
+
+>>> set_to_identity_matrix(MatrixStack.model)
+>>> translate(MatrixStack.model, 1.0, 2.0, 3.0)
+>>> with push_matrix(MatrixStack.model):
+...     rotate_z(MatrixStack.model, math.radians(90.0))
+...     np.round(get_current_matrix(MatrixStack.model) @ [1.0, 0.0, 0.0, 1.0], 6)
+array([1., 3., 3., 1.])
+>>> get_current_matrix(MatrixStack.model) @ [1.0, 0.0, 0.0, 1.0]
+array([2., 2., 3., 1.])
+"""
+
+import enum
+import math
+
+import numpy as np
+
+
+class MatrixStack(enum.Enum):
+    model = 1
+    view = 2
+    projection = 3
+    modelview = 4
+    modelviewprojection = 5
+
+
+class _Stack:
+    def __init__(self, depth: int = 16) -> None:
+        # each matrix is stored transposed, so that matrices[i][j] is the
+        # jth column of the ith matrix
+        self.matrices = np.zeros((depth, 4, 4), dtype=np.float32)
+        self.matrices[0] = np.identity(4)
+        self.top = 0
+        # incremented on every change, to know when products are stale
+        self.version = 0
+
+    def current(self):
+        self.version += 1
+        return self.matrices[self.top]
+
+    def push(self) -> None:
+        if self.top + 1 == len(self.matrices):
+            self.matrices = np.concatenate(
+                [self.matrices, np.empty_like(self.matrices)]
+            )
+        self.matrices[self.top + 1] = self.matrices[self.top]
+        self.top += 1
+        self.version += 1
+
+    def pop(self) -> None:
+        self.top -= 1
+        self.version += 1
+
+
+_stacks = {
+    MatrixStack.model: _Stack(),
+    MatrixStack.view: _Stack(),
+    MatrixStack.projection: _Stack(),
+}
+
+# product -> (transposed product, versions of the stacks it was made from)
+_products = {
+    MatrixStack.modelview: [np.identity(4, dtype=np.float32), None],
+    MatrixStack.modelviewprojection: [np.identity(4, dtype=np.float32), None],
+}
+
+_identity = np.identity(4, dtype=np.float32)
+
+# scratch space, so that the in place updates don't allocate
+_row = np.empty(4, dtype=np.float32)
+_scaled_row = np.empty(4, dtype=np.float32)
+_xyz = np.empty(3, dtype=np.float32)
+
+
+def _top_transposed(matrix_stack: MatrixStack):
+    stack = _stacks[matrix_stack]
+    return stack.matrices[stack.top]
+
+
+def _modelview_transposed():
+    product, versions = _products[MatrixStack.modelview]
+    current_versions = (
+        _stacks[MatrixStack.model].version,
+        _stacks[MatrixStack.view].version,
+    )
+    if versions != current_versions:
+        # (view model)^T == model^T view^T
+        np.matmul(
+            _top_transposed(MatrixStack.model),
+            _top_transposed(MatrixStack.view),
+            out=product,
+        )
+        _products[MatrixStack.modelview][1] = current_versions
+    return product
+
+
+def _modelviewprojection_transposed():
+    product, versions = _products[MatrixStack.modelviewprojection]
+    current_versions = (
+        _stacks[MatrixStack.model].version,
+        _stacks[MatrixStack.view].version,
+        _stacks[MatrixStack.projection].version,
+    )
+    if versions != current_versions:
+        np.matmul(
+            _modelview_transposed(),
+            _top_transposed(MatrixStack.projection),
+            out=product,
+        )
+        _products[MatrixStack.modelviewprojection][1] = current_versions
+    return product
+
+
+def get_current_matrix(matrix_stack: MatrixStack):
+    """The matrix on top of the stack, or the product of the tops of the
+    stacks, as a view which is indexed as a row major matrix."""
+    if matrix_stack == MatrixStack.modelview:
+        return _modelview_transposed().T
+    if matrix_stack == MatrixStack.modelviewprojection:
+        return _modelviewprojection_transposed().T
+    return _top_transposed(matrix_stack).T
+
+
+def set_to_identity_matrix(matrix_stack: MatrixStack) -> None:
+    np.copyto(_stacks[matrix_stack].current(), _identity)
+
+
+class PushMatrix:
+    """Push a copy of the matrix on top of the stack, and pop it at the
+    end of the with statement."""
+
+    def __init__(self, matrix_stack: MatrixStack) -> None:
+        self.matrix_stack = matrix_stack
+
+    def __enter__(self) -> None:
+        _stacks[self.matrix_stack].push()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        _stacks[self.matrix_stack].pop()
+
+
+def push_matrix(matrix_stack: MatrixStack) -> PushMatrix:
+    return PushMatrix(matrix_stack)
+
+
+def _rotate_columns(columns, i: int, j: int, c: float, s: float) -> None:
+    # column i becomes c * i + s * j, and column j becomes c * j - s * i
+    np.copyto(_row, columns[i])
+    columns[i] *= c
+    np.multiply(columns[j], s, out=_scaled_row)
+    columns[i] += _scaled_row
+    columns[j] *= c
+    np.multiply(_row, s, out=_scaled_row)
+    columns[j] -= _scaled_row
+
+
+def rotate_x(matrix_stack: MatrixStack, angle_in_radians: float) -> None:
+    c, s = math.cos(angle_in_radians), math.sin(angle_in_radians)
+    _rotate_columns(_stacks[matrix_stack].current(), 1, 2, c, s)
+
+
+def rotate_y(matrix_stack: MatrixStack, angle_in_radians: float) -> None:
+    c, s = math.cos(angle_in_radians), math.sin(angle_in_radians)
+    _rotate_columns(_stacks[matrix_stack].current(), 2, 0, c, s)
+
+
+def rotate_z(matrix_stack: MatrixStack, angle_in_radians: float) -> None:
+    c, s = math.cos(angle_in_radians), math.sin(angle_in_radians)
+    _rotate_columns(_stacks[matrix_stack].current(), 0, 1, c, s)
+
+
+def translate(matrix_stack: MatrixStack, x: float, y: float, z: float) -> None:
+    columns = _stacks[matrix_stack].current()
+    _xyz[:] = (x, y, z)
+    np.dot(_xyz, columns[:3], out=_row)
+    columns[3] += _row
+
+
+def scale(matrix_stack: MatrixStack, x: float, y: float, z: float) -> None:
+    columns = _stacks[matrix_stack].current()
+    columns[0] *= x
+    columns[1] *= y
+    columns[2] *= z
+
+
+def _multiply_projection(matrix) -> None:
+    columns = _stacks[MatrixStack.projection].current()
+    # (projection matrix)^T == matrix^T projection^T
+    columns[:] = np.matmul(np.asarray(matrix, dtype=np.float32).T, columns)
+
+
+def perspective(fov: float, aspectRatio: float, nearZ: float, farZ: float) -> None:
+    """Multiply the projection by a perspective projection, as
+    gluPerspective does, with the field of view in degrees."""
+    top = nearZ * math.tan(math.radians(fov) / 2.0)
+    right = top * aspectRatio
+    depth = farZ - nearZ
+    _multiply_projection(
+        [
+            [nearZ / right, 0.0, 0.0, 0.0],
+            [0.0, nearZ / top, 0.0, 0.0],
+            [0.0, 0.0, -(farZ + nearZ) / depth, -2.0 * farZ * nearZ / depth],
+            [0.0, 0.0, -1.0, 0.0],
+        ]
+    )
+
+
+def ortho(
+    left: float, right: float, bottom: float, top: float, near: float, far: float
+) -> None:
+    """Multiply the projection by an orthographic projection, as glOrtho
+    does."""
+    width, height, depth = right - left, top - bottom, far - near
+    _multiply_projection(
+        [
+            [2.0 / width, 0.0, 0.0, -(right + left) / width],
+            [0.0, 2.0 / height, 0.0, -(top + bottom) / height],
+            [0.0, 0.0, -2.0 / depth, -(far + near) / depth],
+            [0.0, 0.0, 0.0, 1.0],
+        ]
+    )
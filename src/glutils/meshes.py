@@ -0,0 +1,269 @@
+# Copyright (c) 2018-2024 William Emerison Six
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Upload each distinct set of vertices once, and draw every object which
+uses it with one instanced draw call.
+
+Every paddle used to own a VAO and VBOs with its own copy of the same
+six vertices, and issued its own draw call.  get_mesh hands back one
+Mesh per distinct vertex data, and an InstancedMesh collects the model
+matrix and the color of each object that is drawn with a mesh during
+the frame, so that draw sends all of them with one glDrawArraysInstanced.
+"""
+
+import ctypes
+import hashlib
+
+import numpy as np
+from OpenGL.GL import (
+    GL_ARRAY_BUFFER,
+    GL_FLOAT,
+    GL_FLOAT_VEC3,
+    GL_FLOAT_VEC4,
+    GL_STATIC_DRAW,
+    GL_STREAM_DRAW,
+    glBufferData,
+    glBufferSubData,
+    glDeleteBuffers,
+    glDeleteVertexArrays,
+    glEnableVertexAttribArray,
+    glGenBuffers,
+    glGenVertexArrays,
+    glVertexAttribDivisor,
+    glVertexAttribPointer,
+)
+
+import glutils.fastgl as fastgl
+import glutils.glstate as glstate
+
+glfloat_size = 4
+
+components_of_type = {GL_FLOAT_VEC3: 3, GL_FLOAT_VEC4: 4}
+
+# key -> Mesh, shared by every object with the same vertices
+_meshes = {}
+
+# (mesh key, program, primitive) -> InstancedMesh
+_instanced_meshes = {}
+
+# how many meshes were uploaded or shared, and how many draw calls and
+# instances were issued, for the curious
+statistics = {"uploaded": 0, "shared": 0, "draw_calls": 0, "instances": 0}
+
+
+def mesh_key(vertices) -> str:
+    """Hash of the vertex data, independent of where it came from.
+
+    >>> mesh_key([[0.0, 1.0, 0.0]]) == mesh_key(np.array([0.0, 1.0, 0.0]))
+    True
+    >>> mesh_key([0.0, 1.0, 0.0]) == mesh_key([0.0, -1.0, 0.0])
+    False
+    """
+    vertices = np.ascontiguousarray(vertices, dtype=np.float32)
+    return hashlib.sha256(vertices.tobytes()).hexdigest()
+
+
+class Mesh:
+    """Modelspace positions in a VBO on the GPU."""
+
+    def __init__(self, vertices, floats_per_vertex: int = 3) -> None:
+        vertices = np.ascontiguousarray(vertices, dtype=np.float32)
+        self.key = mesh_key(vertices)
+        self.floats_per_vertex = floats_per_vertex
+        self.number_of_vertices = np.size(vertices) // floats_per_vertex
+
+        self.vbo = glGenBuffers(1)
+        glstate.bind_buffer(GL_ARRAY_BUFFER, self.vbo)
+        glBufferData(
+            GL_ARRAY_BUFFER, glfloat_size * np.size(vertices), vertices, GL_STATIC_DRAW
+        )
+        glstate.bind_buffer(GL_ARRAY_BUFFER, 0)
+
+    # destructor
+    def __del__(self):
+        glDeleteBuffers(1, [self.vbo])
+
+
+def get_mesh(vertices, floats_per_vertex: int = 3) -> Mesh:
+    key = mesh_key(vertices)
+    if key in _meshes:
+        statistics["shared"] += 1
+        return _meshes[key]
+    mesh = Mesh(vertices, floats_per_vertex)
+    _meshes[key] = mesh
+    statistics["uploaded"] += 1
+    return mesh
+
+
+class InstancedMesh:
+    """Every instance of a mesh drawn with one program, each instance with
+    its own matrix and color.
+
+    The program's vertex shader takes the vertices as "position", and
+    each instance's matrix and color as attributes instead of uniforms,
+    named by matrix_attribute and color_attribute.
+    """
+
+    def __init__(
+        self,
+        mesh: Mesh,
+        program,
+        primitive: int,
+        matrix_attribute: str = "mMatrix",
+        color_attribute: str = "color",
+    ) -> None:
+        self.mesh = mesh
+        self.program = program
+        self.primitive = primitive
+
+        matrix_location = program.attributes[matrix_attribute][0]
+        color_location, _, color_type = program.attributes[color_attribute]
+        self.floats_per_color = components_of_type[color_type]
+        # column major matrix, then color
+        self.floats_per_instance = 16 + self.floats_per_color
+
+        self.instances = np.zeros((16, self.floats_per_instance), dtype=np.float32)
+        self.number_of_instances = 0
+
+        self.vao = glGenVertexArrays(1)
+        glstate.bind_vertex_array(self.vao)
+
+        glstate.bind_buffer(GL_ARRAY_BUFFER, mesh.vbo)
+        position = program.attributes["position"][0]
+        glEnableVertexAttribArray(position)
+        glVertexAttribPointer(
+            position,
+            mesh.floats_per_vertex,
+            GL_FLOAT,
+            False,
+            0,
+            ctypes.c_void_p(0),
+        )
+
+        self.instance_vbo = glGenBuffers(1)
+        glstate.bind_buffer(GL_ARRAY_BUFFER, self.instance_vbo)
+        stride = glfloat_size * self.floats_per_instance
+        # a mat4 attribute takes four locations, one per column
+        for column in range(4):
+            glEnableVertexAttribArray(matrix_location + column)
+            glVertexAttribPointer(
+                matrix_location + column,
+                4,
+                GL_FLOAT,
+                False,
+                stride,
+                ctypes.c_void_p(glfloat_size * 4 * column),
+            )
+            # advance once per instance, instead of once per vertex
+            glVertexAttribDivisor(matrix_location + column, 1)
+        glEnableVertexAttribArray(color_location)
+        glVertexAttribPointer(
+            color_location,
+            self.floats_per_color,
+            GL_FLOAT,
+            False,
+            stride,
+            ctypes.c_void_p(glfloat_size * 16),
+        )
+        glVertexAttribDivisor(color_location, 1)
+
+        # reset VAO/VBO to default
+        glstate.bind_vertex_array(0)
+        glstate.bind_buffer(GL_ARRAY_BUFFER, 0)
+
+    # destructor
+    def __del__(self):
+        glDeleteVertexArrays(1, [self.vao])
+        glDeleteBuffers(1, [self.instance_vbo])
+
+    def add(self, matrix, color) -> None:
+        """Draw the mesh with this row major matrix, such as those from
+        glutils.matrixstack, at the next call to draw."""
+        if self.number_of_instances == len(self.instances):
+            self.instances = np.resize(
+                self.instances, (2 * len(self.instances), self.floats_per_instance)
+            )
+        instance = self.instances[self.number_of_instances]
+        # OpenGL expects column major order
+        instance[:16] = np.ravel(matrix, order="F")
+        instance[16:] = color
+        self.number_of_instances += 1
+
+    def add_instances(self, matrices, colors) -> None:
+        """add, for an array of row major matrices, and an array of colors
+        with at least as many components as the program's color."""
+        count = len(matrices)
+        needed = self.number_of_instances + count
+        if needed > len(self.instances):
+            capacity = max(needed, 2 * len(self.instances))
+            self.instances = np.resize(
+                self.instances, (capacity, self.floats_per_instance)
+            )
+        instances = self.instances[self.number_of_instances : needed]
+        # OpenGL expects column major order
+        instances[:, :16] = np.transpose(matrices, (0, 2, 1)).reshape(count, 16)
+        instances[:, 16:] = np.asarray(colors)[:, : self.floats_per_color]
+        self.number_of_instances = needed
+
+    def draw(self) -> None:
+        """Draw every instance added since the last draw, with one call."""
+        if self.number_of_instances == 0:
+            return
+        instances = self.instances[: self.number_of_instances]
+
+        glstate.bind_buffer(GL_ARRAY_BUFFER, self.instance_vbo)
+        # orphan last frame's storage, so that the driver doesn't have
+        # to wait for the GPU to finish reading it
+        glBufferData(GL_ARRAY_BUFFER, instances.nbytes, None, GL_STREAM_DRAW)
+        glBufferSubData(GL_ARRAY_BUFFER, 0, instances.nbytes, instances)
+
+        glstate.use_program(self.program)
+        glstate.bind_vertex_array(self.vao)
+        fastgl.glDrawArraysInstanced(
+            self.primitive, 0, self.mesh.number_of_vertices, self.number_of_instances
+        )
+
+        statistics["draw_calls"] += 1
+        statistics["instances"] += self.number_of_instances
+        self.number_of_instances = 0
+
+
+def get_instanced_mesh(
+    vertices,
+    program,
+    primitive: int,
+    matrix_attribute: str = "mMatrix",
+    color_attribute: str = "color",
+) -> InstancedMesh:
+    """The InstancedMesh shared by every object which draws these vertices
+    with this program."""
+    mesh = get_mesh(vertices)
+    key = (mesh.key, int(program), primitive)
+    if key not in _instanced_meshes:
+        _instanced_meshes[key] = InstancedMesh(
+            mesh, program, primitive, matrix_attribute, color_attribute
+        )
+    return _instanced_meshes[key]
+
+
+def draw_instances() -> None:
+    """Draw every instance added to every shared InstancedMesh this frame."""
+    for instanced_mesh in _instanced_meshes.values():
+        instanced_mesh.draw()
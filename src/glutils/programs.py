@@ -0,0 +1,299 @@
+# Copyright (c) 2018-2024 William Emerison Six
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Compile each shader program once per process, and keep the linked
+binaries on disk so that later launches don't have to compile GLSL at all.
+
+Every renderable used to read its own .vert and .frag files and call
+shaders.compileProgram, so two paddles and a square made three identical
+programs.  get_program hands back one program per distinct set of sources.
+
+The programs are ShaderPrograms, which know their uniforms' locations
+from link time, and which don't send a uniform's value to the GPU again if
+it has not changed since the last upload.  Uniform blocks that a program
+declares are bound to the binding points in uniformblocks.
+"""
+
+import hashlib
+import os
+import struct
+
+import numpy as np
+import OpenGL.GL.shaders as shaders
+from OpenGL.error import GLError
+from OpenGL.GL import (
+    GL_ACTIVE_ATTRIBUTES,
+    GL_ACTIVE_UNIFORMS,
+    GL_FALSE,
+    GL_FRAGMENT_SHADER,
+    GL_GEOMETRY_SHADER,
+    GL_INVALID_INDEX,
+    GL_NUM_PROGRAM_BINARY_FORMATS,
+    GL_RENDERER,
+    GL_VENDOR,
+    GL_VERSION,
+    GL_TRUE,
+    GL_VERTEX_SHADER,
+    glCreateProgram,
+    glDeleteProgram,
+    glGetActiveAttrib,
+    glGetActiveUniform,
+    glGetAttribLocation,
+    glGetIntegerv,
+    glGetProgramiv,
+    glGetString,
+    glGetUniformBlockIndex,
+    glGetUniformLocation,
+    glUniform2f,
+    glUniformBlockBinding,
+)
+
+import glutils.fastgl as fastgl
+import glutils.glstate as glstate
+import glutils.uniformblocks as uniformblocks
+
+# set to None to only share programs within the process
+cache_directory = os.path.join(
+    os.path.expanduser("~"), ".cache", "modelviewprojection", "programs"
+)
+
+stage_of_extension = {
+    ".vert": GL_VERTEX_SHADER,
+    ".geom": GL_GEOMETRY_SHADER,
+    ".frag": GL_FRAGMENT_SHADER,
+}
+
+# key -> linked program, shared by every renderable which asks for it
+_programs = {}
+
+# how many programs were compiled from source, loaded from the disk
+# cache, or already in _programs, for the curious
+statistics = {"compiled": 0, "loaded": 0, "shared": 0}
+
+
+class ShaderProgram(shaders.ShaderProgram):
+    """A linked program, which is still the int that OpenGL calls take,
+    with the active uniforms and attributes reflected once, at link time.
+
+    The setters are meant to be called while the program is in use, the
+    same as the glUniform functions.  Uniforms are part of the program's
+    state, so a value equal to the last one uploaded is skipped, even if
+    other programs were used in between.
+    """
+
+    def __init__(self, program) -> None:
+        # name -> (location, size, type)
+        self.uniforms = {}
+        for index in range(int(glGetProgramiv(self, GL_ACTIVE_UNIFORMS))):
+            name, size, uniform_type = glGetActiveUniform(self, index)
+            name = _name_without_index(name)
+            location = int(glGetUniformLocation(self, name))
+            # members of uniform blocks are active, but have no location
+            if location != -1:
+                self.uniforms[name] = (location, size, uniform_type)
+
+        for block_name, binding_point in uniformblocks.binding_points.items():
+            block_index = glGetUniformBlockIndex(self, block_name)
+            if block_index != GL_INVALID_INDEX:
+                glUniformBlockBinding(self, block_index, binding_point)
+
+        self.attributes = {}
+        for index in range(int(glGetProgramiv(self, GL_ACTIVE_ATTRIBUTES))):
+            name, size, attribute_type = glGetActiveAttrib(self, index)
+            name = _name_without_index(name)
+            self.attributes[name] = (
+                glGetAttribLocation(self, name),
+                size,
+                attribute_type,
+            )
+
+        self._last_uploaded = {}
+        self.uploads_issued = 0
+        self.uploads_skipped = 0
+
+    def use(self) -> None:
+        glstate.use_program(self)
+
+    def _needs_upload(self, name: str, value) -> bool:
+        # uniforms which the compiler optimized away have no location
+        if name not in self.uniforms:
+            return False
+        if name in self._last_uploaded and np.array_equal(
+            self._last_uploaded[name], value
+        ):
+            self.uploads_skipped += 1
+            return False
+        self._last_uploaded[name] = value
+        self.uploads_issued += 1
+        return True
+
+    def set_float(self, name: str, x: float) -> None:
+        if self._needs_upload(name, x):
+            fastgl.glUniform1f(self.uniforms[name][0], float(x))
+
+    def set_vec2(self, name: str, x: float, y: float) -> None:
+        if self._needs_upload(name, (x, y)):
+            glUniform2f(self.uniforms[name][0], x, y)
+
+    def set_vec3(self, name: str, x: float, y: float, z: float) -> None:
+        if self._needs_upload(name, (x, y, z)):
+            fastgl.glUniform3f(self.uniforms[name][0], float(x), float(y), float(z))
+
+    def set_mat4(self, name: str, matrix) -> None:
+        """Upload a row major matrix, such as those from glutils.matrixstack."""
+        if (
+            isinstance(matrix, np.ndarray)
+            and matrix.dtype == np.float32
+            and matrix.flags.f_contiguous
+        ):
+            # already in column major order in memory, as glutils.matrixstack
+            # stores them, so it's sent as is.  The copy is only to compare
+            # with next time, since the matrix may be a view of a stack.
+            if self._needs_upload(name, matrix.copy()):
+                fastgl.glUniformMatrix4fv(self.uniforms[name][0], 1, GL_FALSE, matrix.T)
+            return
+        matrix = np.array(matrix, dtype=np.float32)
+        if self._needs_upload(name, matrix):
+            # transpose, since OpenGL expects column major order
+            fastgl.glUniformMatrix4fv(self.uniforms[name][0], 1, GL_TRUE, matrix)
+
+
+def _name_without_index(name) -> str:
+    # arrays are reported as "name[0]"
+    if isinstance(name, bytes):
+        name = name.decode()
+    return name.split("[")[0]
+
+
+def upload_statistics():
+    """The number of uniform uploads issued and skipped by every program."""
+    issued = sum(program.uploads_issued for program in _programs.values())
+    skipped = sum(program.uploads_skipped for program in _programs.values())
+    return issued, skipped
+
+
+def program_key(stages) -> str:
+    """Hash of each stage's type and source, independent of the file names.
+
+    >>> program_key([(35633, "void main(){}"), (35632, "void main(){}")]) == (
+    ...     program_key([(35632, "void main(){}"), (35633, "void main(){}")]))
+    True
+    >>> program_key([(35633, "void main(){}")]) == (
+    ...     program_key([(35632, "void main(){}")]))
+    False
+    """
+    h = hashlib.sha256()
+    for stage, source in sorted(stages):
+        h.update(str(stage).encode())
+        h.update(b"\0")
+        h.update(source.encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _driver_key() -> str:
+    # a binary is only valid for the exact driver which produced it
+    return "\n".join(
+        glGetString(name).decode("utf-8", "replace")
+        for name in (GL_VENDOR, GL_RENDERER, GL_VERSION)
+    )
+
+
+def _binary_cache_path(key: str) -> str:
+    h = hashlib.sha256()
+    h.update(key.encode())
+    h.update(_driver_key().encode())
+    return os.path.join(cache_directory, h.hexdigest() + ".bin")
+
+
+def _binary_cache_usable() -> bool:
+    return (
+        cache_directory is not None
+        and int(glGetIntegerv(GL_NUM_PROGRAM_BINARY_FORMATS)) > 0
+    )
+
+
+def _load_binary(path: str):
+    try:
+        with open(path, "rb") as f:
+            (binary_format,) = struct.unpack("<I", f.read(4))
+            binary = f.read()
+    except OSError:
+        return None
+
+    program = shaders.ShaderProgram(glCreateProgram())
+    try:
+        return ShaderProgram(program.load(binary_format, binary))
+    except (RuntimeError, GLError):
+        # a driver update can reject old binaries without changing the
+        # version string; fall back to compiling, which rewrites the file
+        glDeleteProgram(program)
+        return None
+
+
+def _save_binary(path: str, program) -> None:
+    binary_format, binary = program.retrieve()
+    try:
+        os.makedirs(cache_directory, exist_ok=True)
+        # write then rename, so that another process never reads half a file
+        with open(path + ".tmp", "wb") as f:
+            f.write(struct.pack("<I", binary_format))
+            f.write(bytes(binary))
+        os.replace(path + ".tmp", path)
+    except OSError:
+        pass
+
+
+def get_program(*paths: str):
+    """Return the linked program for the shader source files in paths.
+
+    The stage of each file is determined by its extension, .vert, .geom, or
+    .frag.  The program is owned by this module, so don't glDeleteProgram it.
+    """
+    stages = []
+    for path in paths:
+        with open(path, "r") as f:
+            stages.append((stage_of_extension[os.path.splitext(path)[1]], f.read()))
+    key = program_key(stages)
+
+    if key in _programs:
+        statistics["shared"] += 1
+        return _programs[key]
+
+    use_binary_cache = _binary_cache_usable()
+    program = None
+    if use_binary_cache:
+        program = _load_binary(_binary_cache_path(key))
+        if program is not None:
+            statistics["loaded"] += 1
+
+    if program is None:
+        program = ShaderProgram(
+            shaders.compileProgram(
+                *[shaders.compileShader(source, stage) for stage, source in stages],
+                retrievable=use_binary_cache,
+            )
+        )
+        statistics["compiled"] += 1
+        if use_binary_cache:
+            _save_binary(_binary_cache_path(key), program)
+
+    _programs[key] = program
+    return program
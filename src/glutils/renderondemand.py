@@ -0,0 +1,238 @@
+# Copyright (c) 2018-2024 William Emerison Six
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Only draw a frame when something could have changed.
+
+With the animation paused, and nobody touching the keyboard, the mouse
+or the joystick, the event loops still rebuilt the imgui windows,
+recomputed every matrix, and redrew every object, 60 times a second,
+to draw the same picture.
+
+A RenderOnDemand adds to the window's callbacks, keeping those which
+were set before it, such as imgui's, and marks the frame as dirty on
+any input, or when the window is resized, uncovered, focused or
+restored.  wait_for_events polls the events, as glfw.poll_events did,
+but if the frame isn't dirty, it blocks in glfw.wait_events_timeout
+until it is.  A few frames are drawn after each event, as imgui takes
+more than one frame to show the result of a click.
+
+Nothing is drawn while the window is iconified, and while it isn't
+focused, at most unfocused_framerate frames are drawn per second.
+wait_for_events returns how long it waited with nothing to draw, for
+the FixedTimestep to skip.  The time waited between unfocused frames
+isn't skipped, so an animation keeps its speed, drawn in fewer frames.
+
+Frames are drawn continuously while a key, a mouse button or a joystick
+axis is held, or when request_frame is called every frame, such as while
+an animation is running.  Set the environment variable
+MODELVIEWPROJECTION_RENDER_ON_DEMAND to 0 to draw every frame.
+"""
+
+import os
+import time
+
+import glfw
+
+import glutils.inputstate as inputstate
+
+default_enabled = os.environ.get("MODELVIEWPROJECTION_RENDER_ON_DEMAND", "1") != "0"
+
+# a joystick axis beyond this is held, as in the demos' dead zones
+joystick_dead_zone = 0.1
+
+
+def next_wait(
+    should_draw: bool,
+    focused: bool,
+    now: float,
+    time_of_last_frame: float,
+    unfocused_framerate: float,
+    idle_timeout: float,
+):
+    """How long to wait for events before drawing, or None to draw now,
+    and whether it's an idle wait, with nothing to draw, whose time the
+    simulation should skip.  Waiting only to draw fewer frames while
+    unfocused isn't idle, as whatever is moving keeps moving meanwhile.
+
+    >>> next_wait(True, True, 10.0, 9.875, 8.0, 0.25)
+    (None, False)
+    >>> next_wait(False, True, 10.0, 9.875, 8.0, 0.25)
+    (0.25, True)
+    >>> next_wait(True, False, 9.9375, 9.875, 8.0, 0.25)
+    (0.0625, False)
+
+    Unfocused, with a frame requested every frame, for two seconds of a
+    fake clock, none of the time is skipped.
+
+    >>> now, time_of_last_frame, idle = 0.0, 0.0, 0.0
+    >>> while now < 2.0:
+    ...     timeout, is_idle = next_wait(True, False, now, time_of_last_frame, 8.0, 0.25)
+    ...     if timeout is None:
+    ...         time_of_last_frame = now
+    ...     else:
+    ...         now += timeout
+    ...         idle += timeout if is_idle else 0.0
+    >>> now, idle
+    (2.0, 0.0)
+    """
+    if not should_draw:
+        return idle_timeout, True
+    if not focused:
+        next_frame = time_of_last_frame + 1.0 / unfocused_framerate
+        if now < next_frame:
+            return next_frame - now, False
+    return None, False
+
+
+class RenderOnDemand:
+    """Create it after every other callback of the window is set."""
+
+    def __init__(
+        self,
+        window,
+        enabled: bool = None,
+        frames_after_input: int = 3,
+        unfocused_framerate: float = 10.0,
+        idle_timeout: float = 0.1,
+    ) -> None:
+        self.window = window
+        self.enabled = default_enabled if enabled is None else enabled
+        self.frames_after_input = frames_after_input
+        self.unfocused_framerate = unfocused_framerate
+        # how often to check the joystick, which has no events, while idle
+        self.idle_timeout = idle_timeout
+
+        self.focused = bool(glfw.get_window_attrib(window, glfw.FOCUSED))
+        self.iconified = bool(glfw.get_window_attrib(window, glfw.ICONIFIED))
+        self._frames_to_draw = frames_after_input
+        self._held_keys = set()
+        self._held_buttons = set()
+        self._joystick_state = None
+        self._time_of_last_frame = 0.0
+
+        # for the curious
+        self.statistics = {"frames_drawn": 0, "seconds_idle": 0.0}
+
+        inputstate.chain_callback(window, glfw.set_key_callback, self._on_key)
+        inputstate.chain_callback(window, glfw.set_char_callback, self._on_input)
+        inputstate.chain_callback(
+            window, glfw.set_mouse_button_callback, self._on_mouse_button
+        )
+        inputstate.chain_callback(window, glfw.set_cursor_pos_callback, self._on_input)
+        inputstate.chain_callback(window, glfw.set_scroll_callback, self._on_input)
+        inputstate.chain_callback(
+            window, glfw.set_framebuffer_size_callback, self._on_input
+        )
+        inputstate.chain_callback(
+            window, glfw.set_window_refresh_callback, self._on_input
+        )
+        inputstate.chain_callback(
+            window, glfw.set_window_focus_callback, self._on_focus
+        )
+        inputstate.chain_callback(
+            window, glfw.set_window_iconify_callback, self._on_iconify
+        )
+
+    def _on_input(self, *args) -> None:
+        self.request_frame(self.frames_after_input)
+
+    def _on_key(self, window, key, scancode, action, mods) -> None:
+        if action == glfw.PRESS:
+            self._held_keys.add(key)
+        elif action == glfw.RELEASE:
+            self._held_keys.discard(key)
+        self._on_input()
+
+    def _on_mouse_button(self, window, button, action, mods) -> None:
+        if action == glfw.PRESS:
+            self._held_buttons.add(button)
+        elif action == glfw.RELEASE:
+            self._held_buttons.discard(button)
+        self._on_input()
+
+    def _on_focus(self, window, focused) -> None:
+        self.focused = bool(focused)
+        # keys released while unfocused never report their release
+        self._held_keys.clear()
+        self._held_buttons.clear()
+        self._on_input()
+
+    def _on_iconify(self, window, iconified) -> None:
+        self.iconified = bool(iconified)
+        self._on_input()
+
+    def _poll_joystick(self) -> None:
+        if not glfw.joystick_present(glfw.JOYSTICK_1):
+            return
+        axes, number_of_axes = glfw.get_joystick_axes(glfw.JOYSTICK_1)
+        buttons, number_of_buttons = glfw.get_joystick_buttons(glfw.JOYSTICK_1)
+        axes = tuple(axes[index] for index in range(number_of_axes))
+        buttons = tuple(buttons[index] for index in range(number_of_buttons))
+        if (axes, buttons) != self._joystick_state or any(
+            abs(axis) > joystick_dead_zone for axis in axes
+        ):
+            self._joystick_state = (axes, buttons)
+            self._on_input()
+
+    def request_frame(self, frames: int = 1) -> None:
+        """Draw at least this many more frames, such as when an animation
+        moved something."""
+        self._frames_to_draw = max(self._frames_to_draw, frames)
+
+    def _should_draw(self) -> bool:
+        if self.iconified:
+            return False
+        if self._held_keys or self._held_buttons:
+            return True
+        return self._frames_to_draw > 0
+
+    def wait_for_events(self) -> float:
+        """Process the pending events, then block until a frame should be
+        drawn, or the window should close.  How many seconds it waited
+        with nothing to draw, which the simulation should skip.  The time
+        waited to draw fewer frames while unfocused isn't included."""
+        glfw.poll_events()
+        if not self.enabled:
+            return 0.0
+
+        self._poll_joystick()
+        seconds_idle = 0.0
+        while not glfw.window_should_close(self.window):
+            started_waiting = time.perf_counter()
+            timeout, idle = next_wait(
+                self._should_draw(),
+                self.focused,
+                started_waiting,
+                self._time_of_last_frame,
+                self.unfocused_framerate,
+                self.idle_timeout,
+            )
+            if timeout is None:
+                break
+            glfw.wait_events_timeout(timeout)
+            if idle:
+                seconds_idle += time.perf_counter() - started_waiting
+            self._poll_joystick()
+
+        self.statistics["seconds_idle"] += seconds_idle
+        self._frames_to_draw = max(self._frames_to_draw - 1, 0)
+        self._time_of_last_frame = time.perf_counter()
+        self.statistics["frames_drawn"] += 1
+        return seconds_idle
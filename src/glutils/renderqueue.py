@@ -0,0 +1,231 @@
+# Copyright (c) 2018-2024 William Emerison Six
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Draw calls, collected during the frame, and issued in the order which
+changes the least OpenGL state.
+
+Objects used to be drawn in the order that the frame loop reached them,
+so programs and vertex arrays were switched back and forth.  Instead,
+render submits a DrawPacket, with everything the draw call needs, and
+flush sorts the packets by a 64 bit key before drawing them.
+
+The key puts the opaque packets before the translucent ones.  Opaque
+packets are grouped by program, then by vertex array, then drawn front
+to back, so that the depth test rejects hidden fragments early.
+Translucent packets are drawn back to front, as blending requires, then
+grouped by program and vertex array.
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+from OpenGL.GL import (
+    GL_BLEND,
+    GL_FLOAT,
+    GL_FLOAT_MAT4,
+    GL_FLOAT_VEC2,
+    GL_FLOAT_VEC3,
+)
+
+import glutils.fastgl as fastgl
+import glutils.glstate as glstate
+
+depth_bits = 24
+id_bits = 12
+
+# uniform type -> how to set it on a ShaderProgram
+_setters = {
+    GL_FLOAT: lambda program, name, value: program.set_float(name, value),
+    GL_FLOAT_VEC2: lambda program, name, value: program.set_vec2(name, *value),
+    GL_FLOAT_VEC3: lambda program, name, value: program.set_vec3(name, *value),
+    GL_FLOAT_MAT4: lambda program, name, value: program.set_mat4(name, value),
+}
+
+
+def sort_key(
+    translucent: bool, program_id: int, mesh_id: int, depth: float, far: float
+) -> int:
+    """Pack the state of a draw call into 64 bits, which sort in the order
+    that the draw calls should be issued.
+
+    >>> sort_key(False, 1, 2, 10.0, 100.0) < sort_key(False, 1, 2, 50.0, 100.0)
+    True
+    >>> sort_key(False, 1, 9, 99.0, 100.0) < sort_key(False, 2, 0, 0.0, 100.0)
+    True
+    >>> sort_key(False, 9, 9, 99.0, 100.0) < sort_key(True, 0, 0, 0.0, 100.0)
+    True
+    >>> sort_key(True, 1, 2, 50.0, 100.0) < sort_key(True, 1, 2, 10.0, 100.0)
+    True
+    """
+    largest_depth = (1 << depth_bits) - 1
+    quantized_depth = int(min(max(depth / far, 0.0), 1.0) * largest_depth)
+    if translucent:
+        return (
+            (1 << 63)
+            | ((largest_depth - quantized_depth) << 39)
+            | (program_id << 27)
+            | (mesh_id << 15)
+        )
+    return (program_id << 51) | (mesh_id << 39) | (quantized_depth << 15)
+
+
+def view_depth(modelview) -> float:
+    """How far in front of the camera the origin of the modelspace is,
+    given the row major modelview matrix."""
+    return -float(modelview[2][3])
+
+
+@dataclass
+class DrawPacket:
+    program: any
+    vertex_array: int
+    primitive: int
+    count: int
+    first: int = 0
+    # name -> value, set by the uniform's type
+    uniforms: dict = field(default_factory=dict)
+    blend: bool = False
+    depth: float = 0.0
+    # drawn with glDrawArraysInstanced, if more than one
+    instances: int = 1
+
+
+class RenderQueue:
+    """DrawPackets submitted during the frame, drawn at flush.
+
+    far is the distance from the camera beyond which packets are
+    considered to be at the same depth.  Blending is expected to be
+    disabled outside of flush, as it is left disabled afterwards.
+    """
+
+    def __init__(self, far: float = 10000.0) -> None:
+        self.far = far
+        self.packets = []
+        # small ids for the programs and vertex arrays, to fit in the key
+        self._program_ids = {}
+        self._mesh_ids = {}
+
+        # for the curious, the state changes since begin_frame, and those
+        # of the whole previous frame
+        self.statistics = {
+            "draw_calls": 0,
+            "program_changes": 0,
+            "vertex_array_changes": 0,
+            "blend_changes": 0,
+        }
+        self.last_frame = dict(self.statistics)
+
+    def begin_frame(self) -> None:
+        self.last_frame.update(self.statistics)
+        for name in self.statistics:
+            self.statistics[name] = 0
+
+    def submit(
+        self,
+        program,
+        vertex_array: int,
+        primitive: int,
+        count: int,
+        first: int = 0,
+        uniforms: dict = None,
+        blend: bool = False,
+        depth: float = 0.0,
+        instances: int = 1,
+    ) -> None:
+        """Queue glDrawArrays(primitive, first, count), or
+        glDrawArraysInstanced if there's more than one instance, with the
+        uniforms set on the program, and the vertex array bound.
+
+        The uniforms are copied, as the matrices from glutils.matrixstack
+        change along with the stack.
+        """
+        uniforms = {
+            name: np.array(value) if isinstance(value, np.ndarray) else value
+            for name, value in (uniforms or {}).items()
+        }
+        self.packets.append(
+            DrawPacket(
+                program,
+                int(vertex_array),
+                primitive,
+                count,
+                first,
+                uniforms,
+                blend,
+                depth,
+                instances,
+            )
+        )
+
+    def _id(self, ids: dict, key: int) -> int:
+        if key not in ids:
+            ids[key] = len(ids) % (1 << id_bits)
+        return ids[key]
+
+    def flush(self) -> None:
+        """Draw every packet submitted since the last flush, sorted."""
+        keys = np.array(
+            [
+                sort_key(
+                    packet.blend,
+                    self._id(self._program_ids, int(packet.program)),
+                    self._id(self._mesh_ids, packet.vertex_array),
+                    packet.depth,
+                    self.far,
+                )
+                for packet in self.packets
+            ],
+            dtype=np.uint64,
+        )
+
+        program = vertex_array = blend = None
+        for index in np.argsort(keys, kind="stable"):
+            packet = self.packets[index]
+            if packet.blend != blend:
+                blend = packet.blend
+                if blend:
+                    glstate.enable(GL_BLEND)
+                else:
+                    glstate.disable(GL_BLEND)
+                self.statistics["blend_changes"] += 1
+            if int(packet.program) != program:
+                program = int(packet.program)
+                glstate.use_program(packet.program)
+                self.statistics["program_changes"] += 1
+            if packet.vertex_array != vertex_array:
+                vertex_array = packet.vertex_array
+                glstate.bind_vertex_array(vertex_array)
+                self.statistics["vertex_array_changes"] += 1
+
+            for name, value in packet.uniforms.items():
+                if name in packet.program.uniforms:
+                    uniform_type = packet.program.uniforms[name][2]
+                    _setters[uniform_type](packet.program, name, value)
+
+            if packet.instances == 1:
+                fastgl.glDrawArrays(packet.primitive, packet.first, packet.count)
+            else:
+                fastgl.glDrawArraysInstanced(
+                    packet.primitive, packet.first, packet.count, packet.instances
+                )
+            self.statistics["draw_calls"] += 1
+
+        glstate.disable(GL_BLEND)
+        self.packets.clear()
@@ -0,0 +1,198 @@
+# Copyright (c) 2018-2024 William Emerison Six
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""A hierarchy of transformations, which are only recomputed when they change.
+
+With the matrix stack, the whole hierarchy is multiplied out again on
+every frame, even the parts which didn't move.  Here, each node of the
+scene, such as a paddle, the square or the camera, has a translation,
+a rotation and a scale relative to its parent, and the graph keeps each
+node's matrix relative to world space.
+
+The nodes are stored in flat arrays, indexed by node, with the index of
+each node's parent.  update recomputes the local matrices of the nodes
+which changed since the last update, then the world matrices of those
+nodes and of everything below them, one level of the hierarchy at a
+time, with one batched matrix multiplication per level.  A frame in
+which nothing moved costs one check.
+
+A node's local matrix is translate, rotate_y, rotate_x, rotate_z, then
+scale, in the same order as they would be applied to the model stack,
+so that a camera is a node whose rotation is (rot_x, rot_y, 0).
+
+>>> scene = SceneGraph()
+>>> paddle = scene.add(translation=(-90.0, 0.0, 0.0))
+>>> square = scene.add(parent=paddle, translation=(20.0, 0.0, 0.0))
+>>> scene.update()
+2
+>>> scene.world_matrix(square) @ [0.0, 0.0, 0.0, 1.0]
+array([-70.,   0.,   0.,   1.])
+>>> scene.set_translation(paddle, -90.0, 10.0, 0.0)
+>>> scene.update()
+2
+>>> scene.update()
+0
+"""
+
+import numpy as np
+
+
+class SceneGraph:
+    def __init__(self, capacity: int = 16) -> None:
+        self.parents = np.full(capacity, -1, dtype=np.int32)
+        self.translations = np.zeros((capacity, 3), dtype=np.float32)
+        self.rotations = np.zeros((capacity, 3), dtype=np.float32)
+        self.scales = np.ones((capacity, 3), dtype=np.float32)
+        # row major, such as those from glutils.matrixstack
+        self.local_matrices = np.zeros((capacity, 4, 4), dtype=np.float32)
+        self.world_matrices = np.zeros((capacity, 4, 4), dtype=np.float32)
+        self.dirty = np.zeros(capacity, dtype=bool)
+        self.number_of_nodes = 0
+        # level -> the nodes at that depth of the hierarchy
+        self._nodes_at_level = []
+
+        # for the curious, how many world matrices the last update computed
+        self.nodes_updated = 0
+
+    def _grow(self) -> None:
+        capacity = 2 * len(self.parents)
+        for name in (
+            "parents",
+            "translations",
+            "rotations",
+            "scales",
+            "local_matrices",
+            "world_matrices",
+            "dirty",
+        ):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[: len(old)] = old
+            setattr(self, name, new)
+
+    def add(
+        self,
+        parent: int = -1,
+        translation=(0.0, 0.0, 0.0),
+        rotation=(0.0, 0.0, 0.0),
+        scale=(1.0, 1.0, 1.0),
+    ) -> int:
+        """Add a node below parent, or below the world if it's -1, and
+        return its index.  A parent has to be added before its children."""
+        if self.number_of_nodes == len(self.parents):
+            self._grow()
+        node = self.number_of_nodes
+        self.number_of_nodes += 1
+
+        self.parents[node] = parent
+        self.translations[node] = translation
+        self.rotations[node] = rotation
+        self.scales[node] = scale
+        self.dirty[node] = True
+
+        level = 0
+        ancestor = parent
+        while ancestor != -1:
+            level += 1
+            ancestor = self.parents[ancestor]
+        if level == len(self._nodes_at_level):
+            self._nodes_at_level.append(np.empty(0, dtype=np.int32))
+        self._nodes_at_level[level] = np.append(self._nodes_at_level[level], node)
+        return node
+
+    def _set(self, values, node: int, x: float, y: float, z: float) -> None:
+        new = np.array((x, y, z), dtype=np.float32)
+        if (values[node] != new).any():
+            values[node] = new
+            self.dirty[node] = True
+
+    def set_translation(self, node: int, x: float, y: float, z: float) -> None:
+        self._set(self.translations, node, x, y, z)
+
+    def set_rotation(self, node: int, x: float, y: float, z: float) -> None:
+        """Angles in radians, around the x, y and z axes."""
+        self._set(self.rotations, node, x, y, z)
+
+    def set_scale(self, node: int, x: float, y: float, z: float) -> None:
+        self._set(self.scales, node, x, y, z)
+
+    def _compose_local_matrices(self, nodes) -> None:
+        cos = np.cos(self.rotations[nodes])
+        sin = np.sin(self.rotations[nodes])
+        count = len(nodes)
+        zeros, ones = np.zeros(count), np.ones(count)
+
+        def rotation(c, s, axis: int):
+            # the rows of a 3x3 rotation about the axis, for each node
+            rows = {
+                0: [[ones, zeros, zeros], [zeros, c, -s], [zeros, s, c]],
+                1: [[c, zeros, s], [zeros, ones, zeros], [-s, zeros, c]],
+                2: [[c, -s, zeros], [s, c, zeros], [zeros, zeros, ones]],
+            }[axis]
+            return np.moveaxis(np.array(rows), -1, 0)
+
+        rotations = (
+            rotation(cos[:, 1], sin[:, 1], 1)
+            @ rotation(cos[:, 0], sin[:, 0], 0)
+            @ rotation(cos[:, 2], sin[:, 2], 2)
+        )
+        local = np.zeros((count, 4, 4), dtype=np.float32)
+        # scaling first scales the columns of the rotation
+        local[:, :3, :3] = rotations * self.scales[nodes][:, np.newaxis, :]
+        local[:, :3, 3] = self.translations[nodes]
+        local[:, 3, 3] = 1.0
+        self.local_matrices[nodes] = local
+
+    def update(self) -> int:
+        """Recompute the world matrices of the nodes which changed, and of
+        their descendants.  Returns how many were recomputed."""
+        dirty = self.dirty[: self.number_of_nodes]
+        if not dirty.any():
+            self.nodes_updated = 0
+            return 0
+        self._compose_local_matrices(np.flatnonzero(dirty))
+
+        for level, nodes in enumerate(self._nodes_at_level):
+            if level > 0:
+                # a node moves when its parent does
+                dirty[nodes] |= dirty[self.parents[nodes]]
+            changed = nodes[dirty[nodes]]
+            if len(changed) == 0:
+                continue
+            if level == 0:
+                self.world_matrices[changed] = self.local_matrices[changed]
+            else:
+                self.world_matrices[changed] = np.matmul(
+                    self.world_matrices[self.parents[changed]],
+                    self.local_matrices[changed],
+                )
+
+        self.nodes_updated = int(np.count_nonzero(dirty))
+        dirty[:] = False
+        return self.nodes_updated
+
+    def world_matrix(self, node: int):
+        """The node's row major matrix from its space to world space, as of
+        the last update."""
+        return self.world_matrices[node]
+
+    def view_matrix(self, camera: int):
+        """The matrix from world space to the space of the camera node."""
+        return np.linalg.inv(self.world_matrices[camera])
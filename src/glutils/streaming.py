@@ -0,0 +1,193 @@
+# Copyright (c) 2018-2024 William Emerison Six
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""A buffer for vertex data which is rewritten every frame.
+
+Calling glBufferData on every frame makes the driver allocate new
+storage, and writing into storage that the GPU is still reading from
+makes the CPU wait.  StreamingBuffer allocates one buffer, split into a
+region per frame in flight.  Each frame writes only into its own region,
+and a fence sync records when the GPU is done with a region, so that it
+is only reused after that.
+
+Where glBufferStorage is available (OpenGL 4.4, or ARB_buffer_storage),
+the buffer stays mapped, persistently and coherently, for its whole
+life, and is exposed as a NumPy array, so that writing vertices is one
+copy straight into memory which the GPU reads.  Otherwise, the buffer is
+orphaned at the start of each frame, and written with glBufferSubData.
+"""
+
+import ctypes
+import time
+
+import numpy as np
+from OpenGL.GL import (
+    GL_ALREADY_SIGNALED,
+    GL_ARRAY_BUFFER,
+    GL_CONDITION_SATISFIED,
+    GL_MAP_COHERENT_BIT,
+    GL_MAP_PERSISTENT_BIT,
+    GL_MAP_WRITE_BIT,
+    GL_STREAM_DRAW,
+    GL_SYNC_FLUSH_COMMANDS_BIT,
+    GL_SYNC_GPU_COMMANDS_COMPLETE,
+    GL_WAIT_FAILED,
+    glBufferData,
+    glBufferStorage,
+    glBufferSubData,
+    glClientWaitSync,
+    glDeleteBuffers,
+    glDeleteSync,
+    glFenceSync,
+    glGenBuffers,
+    glMapBufferRange,
+    glUnmapBuffer,
+)
+
+import glutils.glstate as glstate
+
+# how long to wait on a fence at a time, in nanoseconds
+fence_timeout = 1_000_000
+
+
+def aligned(offset: int, alignment: int) -> int:
+    """Round offset up to a multiple of alignment.
+
+    >>> aligned(0, 24), aligned(1, 24), aligned(24, 24), aligned(25, 24)
+    (0, 24, 24, 48)
+    """
+    return -(-offset // alignment) * alignment
+
+
+class StreamingBuffer:
+    """A GL_ARRAY_BUFFER with a region for each of the frames in flight.
+
+    Call begin_frame before the first write of a frame, write the vertex
+    data, draw from the offsets that write returns, and call end_frame
+    after the last draw call that reads from the buffer.
+    """
+
+    def __init__(self, bytes_per_frame: int, frames: int = 3) -> None:
+        self.bytes_per_frame = bytes_per_frame
+        self.frames = frames
+        self.size = bytes_per_frame * frames
+
+        self.vbo = glGenBuffers(1)
+        glstate.bind_buffer(GL_ARRAY_BUFFER, self.vbo)
+
+        self.persistent = bool(glBufferStorage)
+        if self.persistent:
+            flags = GL_MAP_WRITE_BIT | GL_MAP_PERSISTENT_BIT | GL_MAP_COHERENT_BIT
+            glBufferStorage(GL_ARRAY_BUFFER, self.size, None, flags)
+            pointer = glMapBufferRange(GL_ARRAY_BUFFER, 0, self.size, flags)
+            address = getattr(pointer, "value", pointer)
+            # a view of the mapped memory, not a copy of it
+            self.mapped = np.ctypeslib.as_array(
+                (ctypes.c_ubyte * self.size).from_address(address)
+            )
+        else:
+            glBufferData(GL_ARRAY_BUFFER, self.size, None, GL_STREAM_DRAW)
+            self.mapped = None
+        glstate.bind_buffer(GL_ARRAY_BUFFER, 0)
+
+        self.fences = [None] * frames
+        self.region = frames - 1
+        self.offset = 0
+        self.end = 0
+
+        # for the curious
+        self.bytes_streamed = 0  # in the current, or the last, frame
+        self.fence_waits = 0  # frames which had to wait on the GPU, in total
+        self.fence_wait_seconds = 0.0
+
+    # destructor
+    def __del__(self):
+        for fence in self.fences:
+            if fence is not None:
+                glDeleteSync(fence)
+        if self.persistent:
+            glstate.bind_buffer(GL_ARRAY_BUFFER, self.vbo)
+            glUnmapBuffer(GL_ARRAY_BUFFER)
+            glstate.bind_buffer(GL_ARRAY_BUFFER, 0)
+        glDeleteBuffers(1, [self.vbo])
+
+    def begin_frame(self) -> None:
+        self.region = (self.region + 1) % self.frames
+        self.offset = self.region * self.bytes_per_frame
+        self.end = self.offset + self.bytes_per_frame
+        self.bytes_streamed = 0
+
+        fence = self.fences[self.region]
+        if fence is not None:
+            self._wait_for(fence)
+            glDeleteSync(fence)
+            self.fences[self.region] = None
+
+        if not self.persistent:
+            # orphan the storage, the GPU keeps reading the old one
+            glstate.bind_buffer(GL_ARRAY_BUFFER, self.vbo)
+            glBufferData(GL_ARRAY_BUFFER, self.size, None, GL_STREAM_DRAW)
+
+    def _wait_for(self, fence) -> None:
+        result = glClientWaitSync(fence, GL_SYNC_FLUSH_COMMANDS_BIT, 0)
+        if result in (GL_ALREADY_SIGNALED, GL_CONDITION_SATISFIED):
+            return
+        self.fence_waits += 1
+        start = time.perf_counter()
+        while result not in (GL_ALREADY_SIGNALED, GL_CONDITION_SATISFIED):
+            if result == GL_WAIT_FAILED:
+                break
+            result = glClientWaitSync(fence, 0, fence_timeout)
+        self.fence_wait_seconds += time.perf_counter() - start
+
+    def write(self, array) -> int:
+        """Copy the array into this frame's region, and return its offset
+        in bytes from the start of the buffer.
+
+        The offset is a multiple of the size of the array's rows, so that
+        offset // stride is the index of its first vertex, for glDrawArrays.
+        """
+        array = np.ascontiguousarray(array)
+        stride = array.itemsize * int(np.prod(array.shape[1:], dtype=int))
+        offset = aligned(self.offset, stride)
+        if offset + array.nbytes > self.end:
+            raise ValueError(
+                str.format(
+                    "{} bytes doesn't fit in the {} bytes streamed per frame",
+                    self.bytes_streamed + array.nbytes,
+                    self.bytes_per_frame,
+                )
+            )
+
+        if self.persistent:
+            self.mapped[offset : offset + array.nbytes] = array.reshape(-1).view(
+                np.uint8
+            )
+        else:
+            glstate.bind_buffer(GL_ARRAY_BUFFER, self.vbo)
+            glBufferSubData(GL_ARRAY_BUFFER, offset, array.nbytes, array)
+
+        self.offset = offset + array.nbytes
+        self.bytes_streamed += array.nbytes
+        return offset
+
+    def end_frame(self) -> None:
+        if self.persistent:
+            self.fences[self.region] = glFenceSync(GL_SYNC_GPU_COMMANDS_COMPLETE, 0)
@@ -0,0 +1,56 @@
+//Copyright (c) 2018-2024 William Emerison Six
+//
+//Permission is hereby granted, free of charge, to any person obtaining a copy
+//of this software and associated documentation files (the "Software"), to deal
+//in the Software without restriction, including without limitation the rights
+//to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+//copies of the Software, and to permit persons to whom the Software is
+//furnished to do so, subject to the following conditions:
+//
+//The above copyright notice and this permission notice shall be included in all
+//copies or substantial portions of the Software.
+//
+//THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+//IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+//FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+//AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+//LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+//OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+//SOFTWARE.
+
+#version 330 core
+
+// Thick lines, without a geometry shader.  Each line is an instance of a
+// 4 vertex triangle strip, and each vertex is moved to one corner of the
+// quad around the line, with the same math the geometry shaders used.
+//
+// This is linked with the vertex shader of whatever is drawn, which
+// defines where a point is in clip space, the line's color, and how many
+// pixels wide the line is.
+vec4 clip_position(vec3 position);
+vec4 line_color();
+float line_thickness();
+
+// one per instance, the endpoints of the line
+in vec3 line_start;
+in vec3 line_end;
+
+uniform vec2 u_viewport_size;
+
+out vec4 fColor;
+
+void main()
+{
+     vec4 p1 = clip_position(line_start);
+     vec4 p2 = clip_position(line_end);
+
+     vec2 dir = normalize((p2.xy / p2.w - p1.xy/p1.w) * u_viewport_size);
+     vec2 offset = vec2(-dir.y, dir.x) * line_thickness() / u_viewport_size;
+
+     // in the order the geometry shaders emitted them, p1 + offset,
+     // p1 - offset, p2 + offset, p2 - offset
+     vec4 p = gl_VertexID < 2 ? p1 : p2;
+     float side = gl_VertexID % 2 == 0 ? 1.0 : -1.0;
+     gl_Position = p + vec4(side * offset.xy * p.w, 0.0, 0.0);
+     fColor = line_color();
+}
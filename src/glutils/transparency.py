@@ -0,0 +1,101 @@
+# Copyright (c) 2018-2024 William Emerison Six
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Translucent objects, drawn from the farthest to the nearest.
+
+With blending, each fragment is mixed with what's already in the frame
+buffer, so the result depends on the order of the draws.  The paddles
+and the square used to be drawn in the order of the code, so a paddle
+behind the square could be blended over it.
+
+A TransparentPass collects the instances of meshes drawn during the
+frame, and draw sorts them back to front by their depth, the clip space
+w of their origin, which for a perspective projection is the distance
+in front of the camera.  Consecutive instances of the same mesh are
+still drawn with one instanced draw call.
+"""
+
+import numpy as np
+
+
+def sorted_back_to_front(depths):
+    """The indices of depths from the farthest to the nearest.
+
+    >>> sorted_back_to_front(np.array([1.0, 3.0, 2.0]))
+    array([1, 2, 0])
+    """
+    return np.argsort(-depths)
+
+
+class TransparentPass:
+    def __init__(self, capacity: int = 16) -> None:
+        # per instance, in the order they were added this frame
+        self.matrices = np.zeros((capacity, 4, 4), dtype=np.float32)
+        self.colors = np.zeros((capacity, 4), dtype=np.float32)
+        self.mesh_indices = np.zeros(capacity, dtype=np.int32)
+        self.number_of_instances = 0
+
+        # the InstancedMeshes which instances were added to, and their
+        # index in mesh_indices
+        self._instanced_meshes = []
+        self._index_of_mesh = {}
+
+        # for the curious, how many draw calls the sorted instances took
+        self.draw_calls = 0
+
+    def add(self, instanced_mesh, matrix, color) -> None:
+        """Draw the InstancedMesh with this row major model-view-projection
+        matrix, and color, at the next call to draw."""
+        if self.number_of_instances == len(self.mesh_indices):
+            capacity = 2 * len(self.mesh_indices)
+            self.matrices = np.resize(self.matrices, (capacity, 4, 4))
+            self.colors = np.resize(self.colors, (capacity, 4))
+            self.mesh_indices = np.resize(self.mesh_indices, capacity)
+        if id(instanced_mesh) not in self._index_of_mesh:
+            self._index_of_mesh[id(instanced_mesh)] = len(self._instanced_meshes)
+            self._instanced_meshes.append(instanced_mesh)
+
+        instance = self.number_of_instances
+        self.matrices[instance] = matrix
+        self.colors[instance] = color
+        self.mesh_indices[instance] = self._index_of_mesh[id(instanced_mesh)]
+        self.number_of_instances += 1
+
+    def draw(self) -> None:
+        """Draw every instance added since the last draw, back to front."""
+        count = self.number_of_instances
+        # the clip space w of each instance's origin
+        depths = self.matrices[:count, 3, 3]
+        order = sorted_back_to_front(depths)
+
+        # one draw call per run of instances of the same mesh
+        mesh_indices = self.mesh_indices[order]
+        starts = np.flatnonzero(np.diff(mesh_indices, prepend=-1))
+        ends = np.append(starts[1:], count)
+        for start, end in zip(starts, ends):
+            instances = order[start:end]
+            instanced_mesh = self._instanced_meshes[mesh_indices[start]]
+            instanced_mesh.add_instances(
+                self.matrices[instances], self.colors[instances]
+            )
+            instanced_mesh.draw()
+
+        self.draw_calls = len(starts)
+        self.number_of_instances = 0
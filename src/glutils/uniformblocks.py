@@ -0,0 +1,101 @@
+# Copyright (c) 2018-2024 William Emerison Six
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Uniforms which are the same for every draw call of a frame.
+
+The view and projection matrices, and the parameters of the virtual
+camera, used to be sent to every program before every draw call.  Instead,
+they live in one uniform buffer, which is filled once per frame, and
+which every program that declares the block reads from.
+"""
+
+import numpy as np
+from OpenGL.GL import (
+    GL_DYNAMIC_DRAW,
+    GL_UNIFORM_BUFFER,
+    glBindBufferBase,
+    glBufferData,
+    glBufferSubData,
+    glDeleteBuffers,
+    glGenBuffers,
+)
+
+import glutils.glstate as glstate
+
+# block name -> binding point.  programs.ShaderProgram binds each block
+# that a program declares to its binding point when the program is linked
+binding_points = {"FrameUniforms": 0}
+
+
+class FrameUniforms:
+    """The uniform buffer behind the block which the vertex shaders declare as
+
+        layout (std140) uniform FrameUniforms {
+          mat4 vMatrix;
+          mat4 pMatrix;
+          float fov;
+          float aspectRatio;
+          float nearZ;
+          float farZ;
+          float time;
+        };
+
+    In std140 a mat4 is four vec4 columns, and the floats after the
+    matrices are packed tightly, so the block is 37 floats, padded out
+    to a multiple of a vec4.
+    """
+
+    size_in_floats: int = 40
+
+    def __init__(self) -> None:
+        self.data = np.zeros(self.size_in_floats, dtype=np.float32)
+        self.ubo = glGenBuffers(1)
+        glstate.bind_buffer(GL_UNIFORM_BUFFER, self.ubo)
+        glBufferData(GL_UNIFORM_BUFFER, self.data.nbytes, None, GL_DYNAMIC_DRAW)
+        # which also binds it to GL_UNIFORM_BUFFER, as the cache expects
+        glBindBufferBase(GL_UNIFORM_BUFFER, binding_points["FrameUniforms"], self.ubo)
+        self.uploads = 0
+
+    # destructor
+    def __del__(self):
+        glDeleteBuffers(1, [self.ubo])
+
+    def upload(
+        self,
+        view,
+        projection,
+        fov: float = 45.0,
+        aspect_ratio: float = 1.0,
+        near_z: float = -5.0,
+        far_z: float = -150.0,
+        time: float = 0.0,
+    ) -> None:
+        """Send the frame's values to the GPU, with one call.
+
+        view and projection are row major, such as those from glutils.matrixstack.
+        """
+        # OpenGL expects column major order
+        self.data[0:16] = np.ravel(view, order="F")
+        self.data[16:32] = np.ravel(projection, order="F")
+        self.data[32:37] = (fov, aspect_ratio, near_z, far_z, time)
+
+        glstate.bind_buffer(GL_UNIFORM_BUFFER, self.ubo)
+        glBufferSubData(GL_UNIFORM_BUFFER, 0, self.data.nbytes, self.data)
+        self.uploads += 1